@@ -5,13 +5,12 @@ from typing import Optional
 from langchain_core.tools import tool
 from langchain.agents import create_agent
 from omniflow.agents.langchain_based_agents.base import get_llm, get_system_prompt, mcp_manager
-from omniflow.caredesk.services import (
-    get_latest_ticket_for_user,
-    get_messages_for_ticket,
-)
+from omniflow.mcp_servers.harness import register_local_servers
+from omniflow.caredesk import services as caredesk_services
 from omniflow.agents.input_data import input_tickets_db
 import asyncio
-from asgiref.sync import sync_to_async
+from omniflow.core.db.executor import run_db
+from django.db import transaction
 
 from omniflow.caredesk.models import Ticket, TicketMessage
 
@@ -29,20 +28,26 @@ async def auto_create_refund_ticket(
     Creates a CareDesk ticket automatically after refund initiation.
     """
 
-    ticket = await sync_to_async(Ticket.objects.create)(
-        user_id=user_id,
-        reference_id=order_id,
-        issue_type="Refund Request",
-    )
-
-    await sync_to_async(TicketMessage.objects.create)(
-        ticket=ticket,
-        sender="Agent",
-        content=(
-            f"A refund has been initiated for shipment {tracking_number}. "
-            f"Current refund status: {refund_status}."
-        ),
-    )
+    def _create():
+        # One transaction, so the ticket, its message and their outbox
+        # events commit together.
+        with transaction.atomic(using="caredesk"):
+            ticket = Ticket.objects.using("caredesk").create(
+                user_id=user_id,
+                reference_id=str(order_id),
+                issue_type="Refund Request",
+            )
+            TicketMessage.objects.using("caredesk").create(
+                ticket=ticket,
+                sender="Agent",
+                content=(
+                    f"A refund has been initiated for shipment {tracking_number}. "
+                    f"Current refund status: {refund_status}."
+                ),
+            )
+        return ticket
+
+    ticket = await run_db("caredesk", _create)
 
     return {
         "ticket_id": ticket.id,
@@ -60,36 +65,7 @@ async def auto_create_refund_ticket(
     )
 )
 async def latest_ticket_status(user_id: int, order_id: Optional[int] = None) -> dict:
-    order_ref = str(order_id) if order_id is not None else None
-
-    def _db_lookup():
-        qs = Ticket.objects.using("caredesk").filter(user_id=user_id)
-        if order_ref:
-            qs = qs.filter(reference_id=order_ref)
-        t = qs.order_by("-created_at", "-id").first()
-        if not t:
-            return {
-                "found": False,
-                "reason": "ticket_not_found",
-                "user_id": user_id,
-                "order_id": order_id,
-            }
-
-        status = (t.status or "").strip()
-        status_key = status.lower().replace("-", " ").replace("_", " ").strip()
-        assigned = status_key in {"assigned", "in progress", "inprogress"}
-
-        return {
-            "found": True,
-            "ticket_id": t.id,
-            "status": status,
-            "issue_type": t.issue_type,
-            "created_at": str(t.created_at),
-            "reference_id": t.reference_id,
-            "assigned": assigned,
-        }
-
-    return await sync_to_async(_db_lookup)()
+    return await run_db("caredesk", caredesk_services.latest_ticket_status, user_id, order_id)
 
 @tool
 def ticket_lookup(user_id: int) -> dict:
@@ -127,75 +103,83 @@ async def mcp_ticket_lookup(user_id: int) -> dict:
     Lookup ticket information via MCP server if available.
     Falls back to local database if MCP is not available.
     """
-    try:
-        # Try to get ticket info from MCP server
-        result = await mcp_manager.call_tool("support_service", "get_ticket", {"user_id": user_id})
-        return result.content if hasattr(result, 'content') else result
-    except:
-        # Fallback to local database
-        return ticket_lookup(user_id)
+    if mcp_manager.supports("support_service", "get_ticket"):
+        try:
+            # Try to get ticket info from MCP server
+            result = await mcp_manager.call_tool("support_service", "get_ticket", {"user_id": user_id})
+            return result.content if hasattr(result, 'content') else result
+        except Exception:
+            pass
+    # Fallback to local database
+    return await run_db("caredesk", caredesk_services.ticket_with_messages, user_id)
 
 @tool
 async def mcp_create_ticket(user_id: int, issue_type: str, description: str) -> dict:
     """
     Create a new support ticket via MCP server if available.
     """
-    try:
-        result = await mcp_manager.call_tool("support_service", "create_ticket", {
-            "user_id": user_id,
-            "issue_type": issue_type,
-            "description": description
-        })
-        return result.content if hasattr(result, 'content') else result
-    except Exception as e:
-        return {"error": str(e)}
+    if mcp_manager.supports("support_service", "create_ticket"):
+        try:
+            result = await mcp_manager.call_tool("support_service", "create_ticket", {
+                "user_id": user_id,
+                "issue_type": issue_type,
+                "description": description
+            })
+            return result.content if hasattr(result, 'content') else result
+        except Exception:
+            pass
+    return await run_db("caredesk", caredesk_services.create_ticket, user_id, issue_type, description)
 
 @tool
 async def mcp_add_message(ticket_id: int, sender: str, content: str) -> dict:
     """
     Add a message to a support ticket via MCP server if available.
     """
-    try:
-        result = await mcp_manager.call_tool("support_service", "add_message", {
-            "ticket_id": ticket_id,
-            "sender": sender,
-            "content": content
-        })
-        return result.content if hasattr(result, 'content') else result
-    except Exception as e:
-        return {"error": str(e)}
+    if mcp_manager.supports("support_service", "add_message"):
+        try:
+            result = await mcp_manager.call_tool("support_service", "add_message", {
+                "ticket_id": ticket_id,
+                "sender": sender,
+                "content": content
+            })
+            return result.content if hasattr(result, 'content') else result
+        except Exception:
+            pass
+    return await run_db("caredesk", caredesk_services.add_message, ticket_id, sender, content)
 
 @tool
 async def mcp_escalate_ticket(ticket_id: int, reason: str) -> dict:
     """
     Escalate a support ticket via MCP server if available.
     """
-    try:
-        result = await mcp_manager.call_tool("support_service", "escalate_ticket", {
-            "ticket_id": ticket_id,
-            "reason": reason
-        })
-        return result.content if hasattr(result, 'content') else result
-    except Exception as e:
-        return {"error": str(e)}
+    if mcp_manager.supports("support_service", "escalate_ticket"):
+        try:
+            result = await mcp_manager.call_tool("support_service", "escalate_ticket", {
+                "ticket_id": ticket_id,
+                "reason": reason
+            })
+            return result.content if hasattr(result, 'content') else result
+        except Exception:
+            pass
+    return await run_db("caredesk", caredesk_services.escalate_ticket, ticket_id, reason)
 
 @tool
 async def mcp_knowledge_base_search(query: str) -> dict:
     """
     Search knowledge base via MCP server if available.
     """
-    try:
-        result = await mcp_manager.call_tool("knowledge_service", "search", {"query": query})
-        return result.content if hasattr(result, 'content') else result
-    except Exception as e:
-        return {"error": str(e)}
+    if mcp_manager.supports("knowledge_service", "search"):
+        try:
+            result = await mcp_manager.call_tool("knowledge_service", "search", {"query": query})
+            return result.content if hasattr(result, 'content') else result
+        except Exception:
+            pass
+    return await run_db("caredesk", caredesk_services.search_messages, query)
 
 async def initialize_mcp_connections():
     """Initialize MCP connections for caredesk agent"""
     # Connect to relevant MCP servers for customer support operations
-    await mcp_manager.connect_to_server("support_service", ["python", "-m", "support_mcp_server"])
-    await mcp_manager.connect_to_server("knowledge_service", ["python", "-m", "knowledge_mcp_server"])
-    await mcp_manager.connect_to_server("notification_service", ["python", "-m", "notification_mcp_server"])
+    register_local_servers(mcp_manager, ["support_service", "knowledge_service"])
 
 def build_caredesk_agent():
     llm = get_llm()
@@ -6,7 +6,7 @@ from typing import Optional
 
 from langchain_core.tools import tool
 from langchain.agents import create_agent
-from asgiref.sync import sync_to_async
+from omniflow.core.db.executor import run_db
 
 from omniflow.agents.langchain_based_agents.base import (
     get_llm,
@@ -14,8 +14,8 @@ from omniflow.agents.langchain_based_agents.base import (
     mcp_manager,
 )
 
-from omniflow.payguard.models import Wallet, PaymentMethod, Transaction
-from omniflow.payguard.services import get_transactions_for_order
+from omniflow.payguard.models import Wallet, Transaction
+from omniflow.payguard.services import order_transactions, payment_methods, wallet_summary
 
 # --------------------------------------------------
 # WALLET LOOKUP (MCP → DB FALLBACK)
@@ -33,30 +33,19 @@ async def wallet_lookup(user_id: int) -> dict:
     """
 
     # ---------- MCP (authoritative if available) ----------
-    try:
-        result = await mcp_manager.call_tool(
-            "payment_service",
-            "get_wallet",
-            {"user_id": user_id},
-        )
-        return result.content if hasattr(result, "content") else result
-    except Exception:
-        pass
+    if mcp_manager.supports("payment_service", "get_wallet"):
+        try:
+            result = await mcp_manager.call_tool(
+                "payment_service",
+                "get_wallet",
+                {"user_id": user_id},
+            )
+            return result.content if hasattr(result, "content") else result
+        except Exception:
+            pass
 
     # ---------- DB fallback (deterministic) ----------
-    wallet = await sync_to_async(
-        lambda: Wallet.objects.filter(user_id=user_id).first()
-    )()
-
-    if not wallet:
-        return {}
-
-    return {
-        "wallet_id": wallet.id,
-        "user_id": wallet.user_id,
-        "balance": str(wallet.balance),
-        "currency": wallet.currency,
-    }
+    return await run_db("payguard", wallet_summary, user_id)
 
 
 @tool(
@@ -65,9 +54,7 @@ async def wallet_lookup(user_id: int) -> dict:
     )
 )
 async def wallet_by_id(wallet_id: int) -> dict:
-    wallet = await sync_to_async(
-        lambda: Wallet.objects.using("payguard").filter(id=int(wallet_id)).first()
-    )()
+    wallet = await run_db("payguard", Wallet.objects.using("payguard").filter(id=int(wallet_id)).first)
     if not wallet:
         return {}
     return {
@@ -84,36 +71,8 @@ async def wallet_by_id(wallet_id: int) -> dict:
     )
 )
 async def payment_methods_lookup(user_id: Optional[int] = None, wallet_id: Optional[int] = None, limit: int = 20) -> dict:
-    resolved_wallet_id = wallet_id
-    if resolved_wallet_id is None and user_id is not None:
-        wallet = await sync_to_async(
-            lambda: Wallet.objects.using("payguard").filter(user_id=int(user_id)).first()
-        )()
-        resolved_wallet_id = wallet.id if wallet else None
-
-    if resolved_wallet_id is None:
-        return {"payment_methods": []}
-
-    methods = await sync_to_async(
-        lambda: list(
-            PaymentMethod.objects.using("payguard")
-            .filter(wallet_id=int(resolved_wallet_id))
-            .order_by("id")[: max(1, int(limit))]
-        )
-    )()
-
-    return {
-        "wallet_id": int(resolved_wallet_id),
-        "payment_methods": [
-            {
-                "method_id": m.id,
-                "wallet_id": m.wallet_id,
-                "provider": m.provider,
-                "expiry_date": str(m.expiry_date),
-            }
-            for m in methods
-        ],
-    }
+    # Wallet resolution and the method query share one offloaded call.
+    return await run_db("payguard", payment_methods, user_id, wallet_id, limit)
 
 
 # --------------------------------------------------
@@ -132,34 +91,19 @@ async def transaction_lookup(order_id: int) -> dict:
     """
 
     # ---------- MCP ----------
-    try:
-        result = await mcp_manager.call_tool(
-            "payment_service",
-            "get_transactions",
-            {"order_id": order_id},
-        )
-        return result.content if hasattr(result, "content") else result
-    except Exception:
-        pass
+    if mcp_manager.supports("payment_service", "get_transactions"):
+        try:
+            result = await mcp_manager.call_tool(
+                "payment_service",
+                "get_transactions",
+                {"order_id": order_id},
+            )
+            return result.content if hasattr(result, "content") else result
+        except Exception:
+            pass
 
     # ---------- DB fallback ----------
-    txs = await sync_to_async(
-        lambda: list(get_transactions_for_order(order_id))
-    )()
-
-    return {
-        "transactions": [
-            {
-                "id": tx.id,
-                "wallet_id": tx.wallet_id,
-                "order_id": tx.order_id,
-                "amount": str(tx.amount),
-                "type": tx.type,
-                "timestamp": str(tx.timestamp),
-            }
-            for tx in txs
-        ]
-    }
+    return await run_db("payguard", order_transactions, order_id)
 
 
 @tool(
@@ -185,7 +129,7 @@ async def transactions_by_wallet(wallet_id: int, tx_type: Optional[str] = None,
             for t in rows
         ]
 
-    txs = await sync_to_async(_db_lookup)()
+    txs = await run_db("payguard", _db_lookup)
     return {"wallet_id": int(wallet_id), "transactions": txs}
 
 
@@ -195,9 +139,7 @@ async def transactions_by_wallet(wallet_id: int, tx_type: Optional[str] = None,
     )
 )
 async def transaction_by_id(transaction_id: int) -> dict:
-    tx = await sync_to_async(
-        lambda: Transaction.objects.using("payguard").filter(id=int(transaction_id)).first()
-    )()
+    tx = await run_db("payguard", Transaction.objects.using("payguard").filter(id=int(transaction_id)).first)
     if not tx:
         return {}
     return {
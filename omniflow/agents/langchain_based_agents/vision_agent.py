@@ -3,10 +3,10 @@
 from langchain_core.tools import tool
 from langchain.agents import create_agent
 from omniflow.agents.langchain_based_agents.base import get_llm, get_system_prompt, mcp_manager
-import base64
-import re
-from PIL import Image
-import io
+from omniflow.core.db.executor import run_db
+from omniflow.agents.langchain_based_agents.shopcore_agent import lookup_order_for_user_product
+from omniflow.core.vision import service as vision_service
+import asyncio
 
 def analyze_image_func(image_data: str, query: str = "What do you see in this image?") -> dict:
     """
@@ -14,28 +14,7 @@ def analyze_image_func(image_data: str, query: str = "What do you see in this im
     image_data should be base64 encoded string.
     """
     try:
-        # Extract base64 data from data URL
-        if image_data.startswith('data:image'):
-            # Remove data URL prefix
-            base64_string = re.sub(r'^data:image/.+;base64,', '', image_data)
-        else:
-            base64_string = image_data
-        
-        # Decode base64 to bytes
-        image_bytes = base64.b64decode(base64_string)
-        
-        # For now, return basic image info
-        # In a real implementation, you'd use OpenAI Vision API or similar
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        return {
-            "description": f"This appears to be a {image.format} image with dimensions {image.size[0]}x{image.size[1]} pixels. Mode: {image.mode}.",
-            "format": image.format,
-            "size": image.size,
-            "mode": image.mode,
-            "query_response": f"Based on the image and your query '{query}', I can see this is an image that needs further analysis with a proper vision model."
-        }
-        
+        return vision_service.analyze_image(image_data, query)
     except Exception as e:
         return {
             "error": f"Failed to analyze image: {str(e)}",
@@ -44,41 +23,11 @@ def analyze_image_func(image_data: str, query: str = "What do you see in this im
 
 def identify_product_from_image_func(image_data: str) -> dict:
     """
-    Try to identify products from an image using visual cues.
+    Try to identify products from an image by matching it against
+    product reference images (see core/vision/backends.py).
     """
     try:
-        # Extract base64 data
-        if image_data.startswith('data:image'):
-            base64_string = re.sub(r'^data:image/.+;base64,', '', image_data)
-        else:
-            base64_string = image_data
-        
-        image_bytes = base64.b64decode(base64_string)
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Mock product identification based on image characteristics
-        # In real implementation, use computer vision models
-        width, height = image.size
-        
-        # Simple heuristics for demo
-        if width > 1000 and height > 1000:
-            product_type = "Large Electronic Device"
-            confidence = 0.7
-        elif width > 500 and height > 500:
-            product_type = "Medium Electronic Device"
-            confidence = 0.6
-        else:
-            product_type = "Small Electronic Device"
-            confidence = 0.5
-            
-        return {
-            "product_type": product_type,
-            "confidence": confidence,
-            "image_size": f"{width}x{height}",
-            "suggested_products": ["Gaming Monitor", "Laptop", "Smartphone"],
-            "note": "This is a mock implementation. Real product identification would require trained vision models."
-        }
-        
+        return vision_service.identify_product(image_data)
     except Exception as e:
         return {
             "error": f"Failed to identify product: {str(e)}",
@@ -86,25 +35,77 @@ def identify_product_from_image_func(image_data: str) -> dict:
             "confidence": 0.0
         }
 
+async def identify_products_from_images_func(images: list[str]) -> list[dict]:
+    """
+    Identify the products in several images at once (base64 strings),
+    in the same order. Images are processed in parallel on the vision worker pool.
+    """
+    return await vision_service.identify_products_batch(images)
+
 # Create LangChain tools
 analyze_image = tool(analyze_image_func)
 identify_product_from_image = tool(identify_product_from_image_func)
+identify_products_from_images = tool(identify_products_from_images_func)
+
+@tool(
+    description=(
+        "Match a product photo to the customer's own orders using the product image index, "
+        "then resolve the order. Returns the same fields as lookup_order_for_user_product plus image_match."
+    )
+)
+async def match_order_from_image(image_data: str, user_email: str) -> dict:
+    user_email = (user_email or "").strip().lower()
+    if not image_data or not user_email:
+        return {"found": False, "reason": "missing_image_or_user"}
+
+    from omniflow.shopcore.models import Order
+
+    ordered_product_ids = await run_db(
+        "shopcore",
+        list,
+        Order.objects.using("shopcore")
+        .filter(user__email__iexact=user_email, product_id__isnull=False)
+        .values_list("product_id", flat=True)
+        .distinct(),
+    )
+
+    try:
+        # Only the customer's own products can resolve to an order; customers
+        # with no orders yet are matched against the whole catalog instead.
+        candidates = await asyncio.to_thread(
+            vision_service.match_products, image_data, 3, ordered_product_ids or None
+        )
+    except Exception as e:
+        return {"found": False, "reason": "unreadable_image", "error": str(e)}
+
+    if not candidates or not vision_service.is_confident_match(candidates[0]):
+        return {"found": False, "reason": "no_confident_image_match", "image_match": candidates}
+
+    shop = await lookup_order_for_user_product.ainvoke({
+        "user_email": user_email,
+        "product_name": candidates[0]["product_name"],
+    })
+    if not isinstance(shop, dict):
+        shop = {"found": False}
+    return {**shop, "image_match": candidates}
 
 @tool
 async def mcp_vision_analysis(image_data: str, query: str) -> dict:
     """
     Analyze image via MCP server if available.
     """
-    try:
-        # Try to get vision analysis from MCP server
-        result = await mcp_manager.call_tool("vision_service", "analyze_image", {
-            "image_data": image_data,
-            "query": query
-        })
-        return result.content if hasattr(result, 'content') else result
-    except:
-        # Fallback to local analysis
-        return analyze_image_func(image_data, query)
+    if mcp_manager.supports("vision_service", "analyze_image"):
+        try:
+            # Try to get vision analysis from MCP server
+            result = await mcp_manager.call_tool("vision_service", "analyze_image", {
+                "image_data": image_data,
+                "query": query
+            })
+            return result.content if hasattr(result, 'content') else result
+        except Exception:
+            pass
+    # Fallback to local analysis
+    return analyze_image_func(image_data, query)
 
 def build_vision_agent():
     llm = get_llm()
@@ -112,7 +113,7 @@ def build_vision_agent():
 
     agent = create_agent(
         model=llm,
-        tools=[analyze_image, identify_product_from_image, mcp_vision_analysis],
+        tools=[analyze_image, identify_product_from_image, identify_products_from_images, match_order_from_image, mcp_vision_analysis],
         system_prompt=prompt
     )
 
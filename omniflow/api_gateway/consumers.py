@@ -1,9 +1,14 @@
 import json
+import logging
+import time
 import uuid
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from omniflow.core.orchestration.supervisor_graph import run_supervisor
-from omniflow.utils.logging import get_logger
+from omniflow.core.telemetry.metrics import count_ws_request, publish_process_stats, ws_connected
+from omniflow.utils.config import settings as pydantic_settings
+from .views import parse_media_ids
+from omniflow.utils.logging import bind_request_id, get_logger
 
 from django.db import connections
 from django.db import close_old_connections
@@ -16,19 +21,32 @@ logger = get_logger(__name__)
 class QueryConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         await self.accept()
+        self._counted = pydantic_settings.METRICS_ENABLED
+        if self._counted:
+            ws_connected(1)
         logger.info("WebSocket client connected")
 
+    async def disconnect(self, code):
+        if getattr(self, "_counted", False):
+            ws_connected(-1)
+
     async def receive(self, text_data=None):
         payload = json.loads(text_data)
+        request_id = payload.get("request_id") or str(uuid.uuid4())
+        with bind_request_id(request_id):
+            await self._handle(payload, request_id)
 
+    async def _handle(self, payload: dict, request_id: str):
         query = payload.get("query")
         user_email = payload.get("user_email")
         image_frames = payload.get("image_frames")
-        request_id = payload.get("request_id") or str(uuid.uuid4())
+        media_ids = parse_media_ids(payload)
+        started = time.perf_counter()
 
-        logger.info(f"WebSocket request - User: {user_email}, Query: {query[:50] if query else 'None'}...")
+        logger.debug("websocket request received", extra={"query_chars": len(query or ""), "media": len(media_ids or [])})
 
         if not query or not user_email:
+            self._count_request("invalid")
             await self.send(json.dumps({
                 "type": "error",
                 "request_id": request_id,
@@ -37,15 +55,25 @@ class QueryConsumer(AsyncWebsocketConsumer):
             return
 
         try:
-            await self._log_db_health(request_id=request_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                await self._log_db_health(request_id=request_id)
 
             await self.send(json.dumps({
                 "type": "started",
                 "request_id": request_id,
             }))
 
-            result = await self._run_supervisor_safe(query=query, user_email=user_email, image_frames=image_frames)
-            logger.info("WebSocket request completed successfully")
+            result = await self._run_supervisor_safe(
+                query=query,
+                user_email=user_email,
+                image_frames=image_frames,
+                media_ids=media_ids,
+            )
+            logger.info("websocket request completed", extra={
+                "sampled": True,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            })
+            self._count_request("ok")
 
             trace = (result or {}).get("decision_trace") or []
             for step in trace:
@@ -62,17 +90,27 @@ class QueryConsumer(AsyncWebsocketConsumer):
             }))
         except Exception as e:
             logger.error(f"WebSocket request failed: {e}")
+            self._count_request("error")
             await self.send(json.dumps({
                 "type": "error",
                 "request_id": request_id,
                 "error": str(e),
             }))
 
-    @database_sync_to_async
-    def _run_supervisor_safe(self, query: str, user_email: str, image_frames=None):
+    def _count_request(self, status: str) -> None:
+        if pydantic_settings.METRICS_ENABLED:
+            count_ws_request(status)
+            publish_process_stats()
+
+    async def _run_supervisor_safe(self, query: str, user_email: str, image_frames=None, media_ids=None):
         # Ensure stale DB connections in long-running Daphne workers don't interfere.
-        close_old_connections()
-        return run_supervisor(query=query, user_email=user_email, image_frames=image_frames)
+        await database_sync_to_async(close_old_connections)()
+        return await run_supervisor(
+            query=query,
+            user_email=user_email,
+            image_frames=image_frames,
+            media_ids=media_ids,
+        )
 
     @database_sync_to_async
     def _log_db_health(self, request_id: str):
@@ -86,4 +124,4 @@ class QueryConsumer(AsyncWebsocketConsumer):
             logger.error(f"WS db_health failed request_id={request_id} db={db_name}: {e}")
             return
 
-        logger.info(f"WS db_health request_id={request_id} shipstream_db={db_name} shipment_count={count}")
+        logger.debug(f"WS db_health request_id={request_id} shipstream_db={db_name} shipment_count={count}")
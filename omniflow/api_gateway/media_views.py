@@ -0,0 +1,193 @@
+# api_gateway/media_views.py
+import mimetypes
+import uuid
+
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from omniflow.core.media.storage import MediaTooLarge, StoredBlob, return_media_store
+from omniflow.shipstream.models import ReturnMedia
+from omniflow.shipstream.services import get_shipment_by_tracking_number
+from omniflow.utils.config import settings as pydantic_settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+ALLOWED_MIME_PREFIXES = ("image/", "video/")
+
+
+def _iter_request_body(request, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    while True:
+        chunk = request.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _guess_mime(content_type: str | None, filename: str | None) -> str:
+    content_type = (content_type or "").lower()
+    if content_type and content_type != "application/octet-stream":
+        return content_type
+    return (mimetypes.guess_type(filename or "")[0] or content_type).lower()
+
+
+class UnsupportedMediaType(Exception):
+    pass
+
+
+def _check_mime(mime_type: str) -> str:
+    if not mime_type.startswith(ALLOWED_MIME_PREFIXES):
+        raise UnsupportedMediaType(f"Unsupported media type: {mime_type or 'unknown'}")
+    return mime_type
+
+
+class ReturnMediaUploadHandler(FileUploadHandler):
+    """
+    Multipart upload handler that hashes and writes each `file` part into the
+    media store while Django's parser reads it, instead of buffering parts in
+    memory or temp files first. Other file fields are skipped.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.blobs: list[tuple[str, StoredBlob]] = []
+        self.error: Exception | None = None
+        self._writer = None
+        self._mime_type = ""
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        if field_name != "file":
+            raise SkipFile()
+        try:
+            self._mime_type = _check_mime(_guess_mime(content_type, file_name))
+        except UnsupportedMediaType as e:
+            self.error = e
+            raise StopUpload(connection_reset=False)
+        self._writer = return_media_store.writer(max_bytes=pydantic_settings.RETURN_MEDIA_MAX_BYTES)
+
+    def receive_data_chunk(self, raw_data, start):
+        try:
+            self._writer.write(raw_data)
+        except MediaTooLarge as e:
+            self.error = e
+            self.upload_interrupted()
+            raise StopUpload(connection_reset=False)
+        return None
+
+    def file_complete(self, file_size):
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            self.blobs.append((self._mime_type, writer.finish()))
+        # Nothing for request.FILES: the part is already in the store.
+        return None
+
+    def upload_interrupted(self):
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.abort()
+
+
+def _receive(request, created_blobs: list) -> list[tuple[str, StoredBlob]]:
+    """Store the request's media as it is read; returns (mime_type, blob) per part."""
+    content_type = (request.content_type or "").lower()
+    if not content_type.startswith("multipart/"):
+        _check_mime(content_type)
+        blob = return_media_store.save_stream(
+            _iter_request_body(request), max_bytes=pydantic_settings.RETURN_MEDIA_MAX_BYTES,
+        )
+        if blob.created:
+            created_blobs.append(blob.storage_path)
+        return [(content_type, blob)]
+
+    handler = ReturnMediaUploadHandler(request)
+    request.upload_handlers = [handler]
+    try:
+        request.POST  # runs the multipart parser, which feeds every part to `handler`
+    finally:
+        handler.upload_interrupted()  # a part left open by a parser error
+        created_blobs.extend(blob.storage_path for _, blob in handler.blobs if blob.created)
+    if handler.error is not None:
+        raise handler.error
+    return handler.blobs
+
+
+def _create_media(tracking: str, user_email: str | None, mime_type: str, blob: StoredBlob) -> ReturnMedia:
+    return ReturnMedia.objects.using("shipstream").create(
+        media_id=f"MED-{uuid.uuid4().hex[:12].upper()}",
+        tracking_number=tracking,
+        user_email=user_email,
+        sha256=blob.sha256,
+        size_bytes=blob.size_bytes,
+        mime_type=mime_type,
+        storage_path=blob.storage_path,
+    )
+
+
+def _discard(stored: list, created_blobs: list) -> None:
+    """Undo a partly stored upload: its rows, and the blobs it added that nothing else references."""
+    ReturnMedia.objects.using("shipstream").filter(pk__in=[m.pk for m in stored]).delete()
+    for storage_path in created_blobs:
+        if not ReturnMedia.objects.using("shipstream").filter(storage_path=storage_path).exists():
+            return_media_store.delete(storage_path)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def upload_return_media(request, tracking_number: str):
+    """
+    Stream return-proof media straight to storage.
+
+    Accepts either multipart/form-data (one or more `file` parts) or a raw
+    binary body with the media type in Content-Type. Both are hashed and
+    written chunk by chunk as the body is read. Returns media IDs that the
+    conversational request passes as `media_ids` instead of base64 payloads.
+    """
+    tracking = (tracking_number or "").strip().upper()
+    user_email = (request.GET.get("user_email") or request.headers.get("X-User-Email") or "").strip().lower() or None
+
+    if get_shipment_by_tracking_number(tracking) is None:
+        return JsonResponse({"error": f"Unknown shipment {tracking}"}, status=404)
+
+    # Rows are only created once the whole body is in, so a rejected part
+    # (wrong type, too large) leaves nothing behind.
+    stored = []
+    created_blobs = []
+    try:
+        blobs = _receive(request, created_blobs)
+        for mime_type, blob in blobs:
+            if blob.size_bytes:
+                stored.append(_create_media(tracking, user_email, mime_type, blob))
+    except UnsupportedMediaType as e:
+        _discard(stored, created_blobs)
+        return JsonResponse({"error": str(e)}, status=415)
+    except MediaTooLarge as e:
+        _discard(stored, created_blobs)
+        return JsonResponse({"error": str(e)}, status=413)
+    except BaseException:
+        _discard(stored, created_blobs)
+        raise
+
+    if not blobs:
+        return JsonResponse({"error": "No media provided"}, status=400)
+    if not stored:
+        _discard(stored, created_blobs)
+        return JsonResponse({"error": "Empty upload"}, status=400)
+
+    logger.info(f"Stored {len(stored)} return media item(s) for {tracking}")
+    return JsonResponse({
+        "tracking_number": tracking,
+        "media_ids": [m.media_id for m in stored],
+        "media": [
+            {
+                "media_id": m.media_id,
+                "mime_type": m.mime_type,
+                "size_bytes": m.size_bytes,
+                "sha256": m.sha256,
+            }
+            for m in stored
+        ],
+    }, status=201)
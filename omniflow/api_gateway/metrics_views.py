@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_http_methods
+
+from omniflow.core.telemetry.metrics import CONTENT_TYPE_LATEST, render_metrics
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """Prometheus scrape endpoint (merges every worker when PROMETHEUS_MULTIPROC_DIR is set)."""
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,77 @@
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from omniflow.core.telemetry.metrics import observe_request, publish_process_stats
+from omniflow.utils.config import settings as pydantic_settings
+from omniflow.utils.logging import bind_request_id
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+def _route(request) -> str:
+    # The URL pattern, not the path, so tracking numbers don't become labels.
+    match = getattr(request, "resolver_match", None)
+    return f"/{match.route}" if match is not None else "unmatched"
+
+
+def _record(request, status: int, started: float) -> None:
+    observe_request(_route(request), request.method, status, time.perf_counter() - started)
+    publish_process_stats()
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """Request count and latency per route for the /metrics endpoint."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not pydantic_settings.METRICS_ENABLED:
+                return await get_response(request)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await get_response(request)
+                status = response.status_code
+                return response
+            finally:
+                _record(request, status, started)
+    else:
+        def middleware(request):
+            if not pydantic_settings.METRICS_ENABLED:
+                return get_response(request)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = get_response(request)
+                status = response.status_code
+                return response
+            finally:
+                _record(request, status, started)
+    return middleware
+
+
+def _incoming_request_id(request):
+    # Accept the caller's id (proxies, the UI) so log lines can be joined end to end.
+    value = (request.headers.get(REQUEST_ID_HEADER) or "").strip()
+    return value[:64] or None
+
+
+@sync_and_async_middleware
+def request_id_middleware(get_response):
+    """Bind a request id for the duration of the request and echo it back."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with bind_request_id(_incoming_request_id(request)) as request_id:
+                request.request_id = request_id
+                response = await get_response(request)
+                response[REQUEST_ID_HEADER] = request_id
+                return response
+    else:
+        def middleware(request):
+            with bind_request_id(_incoming_request_id(request)) as request_id:
+                request.request_id = request_id
+                response = get_response(request)
+                response[REQUEST_ID_HEADER] = request_id
+                return response
+    return middleware
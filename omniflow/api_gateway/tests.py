@@ -1,3 +1,69 @@
-from django.test import TestCase
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from omniflow.shipstream.models import ReturnMedia, Shipment
+
+
+class ReturnMediaUploadTests(TransactionTestCase):
+    databases = {"default", "shopcore", "shipstream", "payguard", "caredesk"}
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=tmp.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.store_root = Path(tmp.name) / "return_media"
+
+        Shipment.objects.using("shipstream").create(order_id=1, tracking_number="FWD-UP1", status="Delivered")
+        self.url = reverse("return-media-upload", args=["FWD-UP1"])
+
+        # Parts must go straight to the media store, never through Django's buffers.
+        for handler in (MemoryFileUploadHandler, TemporaryFileUploadHandler):
+            patcher = mock.patch.object(handler, "receive_data_chunk", side_effect=AssertionError(f"{handler.__name__} buffered the upload"))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stored_blobs(self):
+        tmp_dir = str(self.store_root / "tmp")
+        return sum(len(files) for d, _, files in os.walk(self.store_root) if d != tmp_dir)
+
+    def post_files(self, *files):
+        return self.client.post(self.url, data={"file": list(files)})
+
+    def test_multipart_parts_are_streamed_to_the_store(self):
+        response = self.post_files(
+            SimpleUploadedFile("a.jpg", os.urandom(300 * 1024), "image/jpeg"),
+            SimpleUploadedFile("b.mp4", b"video" * 100, "video/mp4"),
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["media_ids"]), 2)
+        self.assertEqual(ReturnMedia.objects.using("shipstream").count(), 2)
+        self.assertEqual(self.stored_blobs(), 2)
+
+    def test_unsupported_part_leaves_nothing_behind(self):
+        response = self.post_files(
+            SimpleUploadedFile("a.jpg", os.urandom(1024), "image/jpeg"),
+            SimpleUploadedFile("notes.txt", b"hello", "text/plain"),
+        )
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(ReturnMedia.objects.using("shipstream").count(), 0)
+        self.assertEqual(self.stored_blobs(), 0)
+
+    def test_oversized_part_leaves_nothing_behind(self):
+        with mock.patch("omniflow.api_gateway.media_views.pydantic_settings.RETURN_MEDIA_MAX_BYTES", 64 * 1024):
+            response = self.post_files(
+                SimpleUploadedFile("a.jpg", os.urandom(1024), "image/jpeg"),
+                SimpleUploadedFile("b.jpg", os.urandom(128 * 1024), "image/jpeg"),
+            )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(ReturnMedia.objects.using("shipstream").count(), 0)
+        self.assertEqual(self.stored_blobs(), 0)
+        self.assertEqual(os.listdir(self.store_root / "tmp"), [])
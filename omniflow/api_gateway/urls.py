@@ -2,6 +2,7 @@ from django.urls import path, include
 from .views import QueryAPIView, omni_ui
 from .whisper_views import whisper_transcribe, whisper_status, whisper_fallback
 from .tts_views import tts_speak
+from .media_views import upload_return_media
 from django.http import JsonResponse
 
 def api_root(request):
@@ -15,6 +16,8 @@ def api_root(request):
                 "ui": "/api/ui/",
                 "websocket": "ws://127.0.0.1:8000/ws/query/",
                 "tts": "/api/tts/",
+                "return_media": "/api/returns/<tracking_number>/media/",
+                "metrics": "/metrics",
                 "whisper": {
                     "transcribe": "/api/whisper/transcribe/",
                     "status": "/api/whisper/status/",
@@ -25,6 +28,8 @@ def api_root(request):
                 "query": "POST",
                 "ui": "GET",
                 "tts": "POST",
+                "return_media": "POST",
+                "metrics": "GET",
                 "whisper_transcribe": "POST",
                 "whisper_status": "GET",
                 "whisper_fallback": "POST"
@@ -37,6 +42,7 @@ urlpatterns = [
     path("query/", QueryAPIView.as_view(), name="query"),
     path("ui/", omni_ui, name="omni-ui"),
     path("tts/", tts_speak, name="tts-speak"),
+    path("returns/<str:tracking_number>/media/", upload_return_media, name="return-media-upload"),
     path("whisper/transcribe/", whisper_transcribe, name="whisper-transcribe"),
     path("whisper/status/", whisper_status, name="whisper-status"),
     path("whisper/fallback/", whisper_fallback, name="whisper-fallback"),
@@ -1,6 +1,5 @@
 # api_gateway/views.py
 import asyncio
-import json
 import re
 import sys
 
@@ -17,13 +16,16 @@ from rest_framework import status
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from omniflow.core.orchestration.supervisor_graph import run_supervisor
+from omniflow.core.orchestration.facts import render_facts
 from omniflow.agents.langchain_based_agents.base import get_llm
 from omniflow.utils.logging import get_logger
 from omniflow.utils.prompts import get_ask_name_prompt, get_response_synthesizer_prompt
 
 from omniflow.shopcore.models import User
-from omniflow.payguard.models import Wallet
-from omniflow.shipstream.models import Shipment
+from omniflow.shopcore.services import get_user_by_email
+from omniflow.payguard.services import get_wallet_by_user_id
+from omniflow.shipstream.services import get_latest_shipment_for_order
+from omniflow.core.cache.identity import unit_of_work
 from omniflow.agents.input_data import input_orders_db
 
 logger = get_logger(__name__)
@@ -130,8 +132,19 @@ def extract_name_candidate(text: str) -> str:
     return t
 
 
+def parse_media_ids(data) -> list[str] | None:
+    """Accept `media_ids` (list) or a single `media_id` from the request payload."""
+    raw = data.get("media_ids")
+    if raw is None and data.get("media_id"):
+        raw = [data.get("media_id")]
+    if not isinstance(raw, list):
+        return None
+    ids = [str(m).strip() for m in raw if str(m or "").strip()]
+    return ids or None
+
+
 def get_user(email: str) -> User | None:
-    return User.objects.filter(email=email).first()
+    return get_user_by_email(email)
 
 
 # ---------------------------------------------------------------------
@@ -141,6 +154,7 @@ def get_user(email: str) -> User | None:
 @method_decorator(csrf_exempt, name="dispatch")
 class QueryAPIView(APIView):
 
+    @unit_of_work()
     def post(self, request):
         close_old_connections()
 
@@ -149,6 +163,7 @@ class QueryAPIView(APIView):
         reference_id = request.data.get("reference_id")
         image = request.data.get("image")
         image_frames = request.data.get("image_frames")
+        media_ids = parse_media_ids(request.data)
         user_email = request.data.get("user_email")
 
         if not user_email:
@@ -168,21 +183,21 @@ class QueryAPIView(APIView):
                 extracted_order_id = derive_order_id_from_tracking(str(shipment_id))
 
         if not extracted_tracking and extracted_order_id:
-            shipment = (
-                Shipment.objects.using("shipstream")
-                .filter(order_id=int(extracted_order_id))
-                .order_by("-id")
-                .first()
-            )
+            shipment = get_latest_shipment_for_order(extracted_order_id)
             if shipment and shipment.tracking_number:
                 extracted_tracking = shipment.tracking_number
 
         if extracted_order_id is None and extracted_tracking:
             extracted_order_id = derive_order_id_from_tracking(extracted_tracking)
 
-        logger.info(
-            f"[QUERY] {query!r} | extracted_tracking={extracted_tracking} | extracted_order_ref={extracted_order_ref} | extracted_order_id={extracted_order_id}"
-        )
+        # The query text itself stays out of the logs; its length is enough to spot outliers.
+        logger.info("query received", extra={
+            "sampled": True,
+            "query_chars": len(query),
+            "tracking_number": extracted_tracking,
+            "order_ref": extracted_order_ref,
+            "order_id": extracted_order_id,
+        })
 
         # --------------------------------------------------
         # Session keys
@@ -255,7 +270,7 @@ class QueryAPIView(APIView):
         # Greeting
         # --------------------------------------------------
 
-        if not query and not image and not image_frames and not reference_id:
+        if not query and not image and not image_frames and not media_ids and not reference_id:
             request.session[name_key] = None
             request.session[name_pending_key] = False
             request.session.save()
@@ -287,7 +302,7 @@ class QueryAPIView(APIView):
                 "USER_MESSAGE:\n"
                 f"{query}\n\n"
                 "FACTS_JSON:\n"
-                f"{json.dumps({}, ensure_ascii=False)}"
+                f"{render_facts({})}"
             )
             answer = _llm_reply(prompt, msg)
             return Response({
@@ -321,7 +336,7 @@ class QueryAPIView(APIView):
         if is_account_query(query) and any(k in query.lower() for k in ["wallet", "balance"]):
             user = get_user(user_email)
             wallet = (
-                Wallet.objects.using("payguard").filter(user_id=user.id).first()
+                get_wallet_by_user_id(user.id)
                 if user
                 else None
             )
@@ -339,7 +354,7 @@ class QueryAPIView(APIView):
                     "USER_MESSAGE:\n"
                     f"{query}\n\n"
                     "FACTS_JSON:\n"
-                    f"{json.dumps(facts, ensure_ascii=False)}"
+                    f"{render_facts(facts, 'payguard')}"
                 )
 
                 answer = _llm_reply(prompt, msg)
@@ -416,6 +431,7 @@ class QueryAPIView(APIView):
                     image=image,
                     image_frames=image_frames,
                     reference_id=reference_id,
+                    media_ids=media_ids,
                 ))
             except RuntimeError as e:
                 msg = str(e) if e else ""
@@ -428,6 +444,7 @@ class QueryAPIView(APIView):
                         image=image,
                         image_frames=image_frames,
                         reference_id=reference_id,
+                        media_ids=media_ids,
                     )
                 else:
                     raise
@@ -12,6 +12,7 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from api_gateway.routing import websocket_urlpatterns
+from omniflow.agents.langchain_based_agents.base import mcp_manager
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
@@ -21,3 +22,6 @@ application = ProtocolTypeRouter({
         URLRouter(websocket_urlpatterns)
     ),
 })
+
+# Discover MCP tools in the background before the first request arrives.
+mcp_manager.start_discovery()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import statistics
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+
+from omniflow.caredesk import services as caredesk_services
+from omniflow.core.mcp.client import create_manager
+from omniflow.mcp_servers.harness import LOCAL_SERVERS, register_local_servers
+from omniflow.payguard import services as payguard_services
+from omniflow.shipstream import services as shipstream_services
+from omniflow.shipstream.models import Shipment
+from omniflow.shopcore import services as shopcore_services
+from omniflow.shopcore.models import Order, User
+
+
+class Command(BaseCommand):
+    help = "Benchmark local MCP servers against direct ORM calls at increasing concurrency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50, help="Calls per case and concurrency level")
+        parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+        parser.add_argument("--pool-size", type=int, default=None, help="MCP sessions per server (default: MCP_POOL_SIZE)")
+        parser.add_argument("--servers", default=None, help="Comma-separated subset of servers to benchmark")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [max(1, int(c)) for c in str(options["concurrency"]).split(",") if c.strip()]
+        except ValueError:
+            raise CommandError("--concurrency must be a comma-separated list of integers")
+
+        cases = self._cases()
+        if options.get("servers"):
+            wanted = {s.strip() for s in options["servers"].split(",")}
+            unknown = wanted - set(LOCAL_SERVERS)
+            if unknown:
+                raise CommandError(f"Unknown servers: {', '.join(sorted(unknown))}")
+            cases = [c for c in cases if c["server"] in wanted]
+        if not cases:
+            raise CommandError("No benchmark cases (is the database seeded?)")
+
+        results = asyncio.run(self._run(cases, levels, options["iterations"], options.get("pool_size")))
+
+        if options.get("json"):
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'case':<46}{'mode':<6}{'conc':>5}{'p50 ms':>9}{'p95 ms':>9}{'calls/s':>10}")
+        for r in results["runs"]:
+            self.stdout.write(
+                f"{r['case']:<46}{r['mode']:<6}{r['concurrency']:>5}"
+                f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['throughput']:>10.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ MCP server stats: {json.dumps(results['mcp_stats'])}"))
+
+    def _cases(self) -> list:
+        user = User.objects.using("shopcore").exclude(email=None).order_by("id").first()
+        order = Order.objects.using("shopcore").exclude(product=None).select_related("product").order_by("id").first()
+        shipment = Shipment.objects.using("shipstream").order_by("id").first()
+
+        cases = []
+        if user:
+            cases += [
+                {"server": "user_service", "tool": "get_user", "args": {"email": user.email},
+                 "direct": lambda: shopcore_services.user_summary(user.email)},
+                {"server": "payment_service", "tool": "get_wallet", "args": {"user_id": user.id},
+                 "direct": lambda: payguard_services.wallet_summary(user.id)},
+                {"server": "support_service", "tool": "get_ticket", "args": {"user_id": user.id},
+                 "direct": lambda: caredesk_services.ticket_with_messages(user.id)},
+            ]
+        if order:
+            cases += [
+                {"server": "product_service", "tool": "get_product", "args": {"name": order.product.name},
+                 "direct": lambda: shopcore_services.product_summary(order.product.name)},
+                {"server": "order_service", "tool": "get_order",
+                 "args": {"user_id": order.user_id, "product_id": order.product_id},
+                 "direct": lambda: shopcore_services.order_summary(order.user_id, order.product_id)},
+                {"server": "tracking_service", "tool": "get_order_tracking", "args": {"order_id": order.id},
+                 "direct": lambda: shipstream_services.tracking_for_order(order.id)},
+            ]
+        if shipment:
+            tn = shipment.tracking_number
+            cases += [
+                {"server": "tracking_service", "tool": "get_tracking", "args": {"tracking_number": tn},
+                 "direct": lambda: shipstream_services.shipment_summary(tn)},
+                {"server": "logistics_service", "tool": "check_return_eligibility", "args": {"tracking_number": tn},
+                 "direct": lambda: shipstream_services.return_eligibility(tn)},
+            ]
+        return cases
+
+    async def _run(self, cases: list, levels: list, iterations: int, pool_size) -> dict:
+        manager = create_manager(pool_size=pool_size or max(levels), ping_interval=0)
+        servers = sorted({c["server"] for c in cases})
+        register_local_servers(manager, servers)
+
+        try:
+            for server in servers:
+                started = time.perf_counter()
+                await manager.warm_up(server)
+                self.stderr.write(f"Started {server} in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+            runs = []
+            for case in cases:
+                name = f"{case['server']}.{case['tool']}"
+                direct = sync_to_async(case["direct"], thread_sensitive=False)
+                for level in levels:
+                    runs.append(await self._measure(name, "orm", level, iterations, direct))
+                    runs.append(await self._measure(
+                        name, "mcp", level, iterations,
+                        lambda case=case: manager.call_tool(case["server"], case["tool"], case["args"]),
+                    ))
+            return {"runs": runs, "mcp_stats": manager.stats()}
+        finally:
+            await asyncio.to_thread(manager.shutdown)
+
+    async def _measure(self, name: str, mode: str, concurrency: int, iterations: int, call) -> dict:
+        latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                await call()
+                latencies.append(time.perf_counter() - started)
+
+        await call()  # warm caches/connections for this mode
+        started = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(iterations)])
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "case": name,
+            "mode": mode,
+            "concurrency": concurrency,
+            "iterations": iterations,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+            "throughput": iterations / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref import sync as asgiref_sync
+from django.core.management.base import BaseCommand, CommandError
+
+from omniflow.agents.langchain_based_agents.caredesk_agent import latest_ticket_status
+from omniflow.agents.langchain_based_agents.payguard_agent import (
+    payment_methods_lookup,
+    transaction_lookup,
+    wallet_lookup,
+)
+from omniflow.agents.langchain_based_agents.shipstream_agent import shipment_lookup, tracking_for_order
+from omniflow.agents.langchain_based_agents.shopcore_agent import (
+    lookup_order_for_user_product,
+    verify_order_ownership,
+)
+from omniflow.core.cache.entity import clear_entity_caches
+from omniflow.core.cache.identity import unit_of_work
+from omniflow.core.db.executor import db_executor_stats
+from omniflow.shipstream.models import Shipment
+from omniflow.shopcore.models import Order
+
+
+@contextmanager
+def count_thread_hops():
+    """
+    Count every sync_to_async dispatch (including Django's own a* queryset
+    methods). Dispatches to the per-alias DB executors are counted from
+    `db_executor_stats()` instead.
+    """
+    counts = Counter()
+    lock = threading.Lock()
+    original = asgiref_sync.SyncToAsync.__call__
+
+    async def counting_call(self, *args, **kwargs):
+        with lock:
+            counts["thread_sensitive" if self._thread_sensitive else "thread_pool"] += 1
+        return await original(self, *args, **kwargs)
+
+    asgiref_sync.SyncToAsync.__call__ = counting_call
+    try:
+        yield counts
+    finally:
+        asgiref_sync.SyncToAsync.__call__ = original
+
+
+class Command(BaseCommand):
+    help = "Run concurrent conversations through the agent tools' DB paths and count thread hops per conversation"
+    def add_arguments(self, parser):
+        parser.add_argument("--conversations", type=int, default=100, help="Concurrent conversations (default: 100)")
+        parser.add_argument("--rounds", type=int, default=3, help="Measured rounds; entity caches are cleared before each")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        order = (
+            Order.objects.using("shopcore")
+            .exclude(product=None)
+            .exclude(user__email=None)
+            .select_related("user", "product")
+            .order_by("id")
+            .first()
+        )
+        if order is None:
+            raise CommandError("No order with a user email and product (is the database seeded?)")
+        shipment = Shipment.objects.using("shipstream").filter(order_id=order.id).first()
+
+        steps = [
+            (verify_order_ownership, {"order_id": order.id, "user_email": order.user.email}),
+            (lookup_order_for_user_product, {"user_email": order.user.email, "product_name": order.product.name}),
+            (tracking_for_order, {"order_id": order.id}),
+            (wallet_lookup, {"user_id": order.user_id}),
+            (payment_methods_lookup, {"user_id": order.user_id}),
+            (transaction_lookup, {"order_id": order.id}),
+            (latest_ticket_status, {"user_id": order.user_id, "order_id": order.id}),
+        ]
+        if shipment:
+            steps.append((shipment_lookup, {"query": shipment.tracking_number}))
+
+        results = asyncio.run(self._run(steps, options["conversations"], options["rounds"]))
+
+        if options.get("json"):
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for r in results["rounds"]:
+            self.stdout.write(
+                f"round {r['round']}: {r['conversations']} conversations in {r['wall_ms']:.0f} ms, "
+                f"p50 {r['p50_ms']:.1f} ms, p95 {r['p95_ms']:.1f} ms, "
+                f"{r['hops_per_conversation']:.1f} hops/conversation "
+                f"({r['thread_sensitive_hops']} thread-sensitive, {sum(r['db_executor_hops'].values())} on DB executors)"
+            )
+        self.stdout.write(f"DB executors: {json.dumps(results['db_executors'])}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(steps)} tool calls per conversation"))
+
+    async def _run(self, steps: list, conversations: int, rounds: int) -> dict:
+        async def conversation(latencies: list):
+            started = time.perf_counter()
+            with unit_of_work():
+                for tool, args in steps:
+                    await tool.ainvoke(args)
+            latencies.append(time.perf_counter() - started)
+
+        await conversation([])  # open connections and import lazily-loaded code
+
+        out = []
+        for n in range(1, rounds + 1):
+            clear_entity_caches()
+            latencies: list = []
+            before = {alias: s["submitted"] for alias, s in db_executor_stats().items()}
+            with count_thread_hops() as hops:
+                started = time.perf_counter()
+                await asyncio.gather(*[conversation(latencies) for _ in range(conversations)])
+                wall = time.perf_counter() - started
+            executor_hops = {
+                alias: s["submitted"] - before.get(alias, 0) for alias, s in db_executor_stats().items()
+            }
+            latencies.sort()
+            total = sum(hops.values()) + sum(executor_hops.values())
+            out.append({
+                "round": n,
+                "conversations": conversations,
+                "wall_ms": wall * 1000,
+                "p50_ms": statistics.median(latencies) * 1000,
+                "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+                "hops": total,
+                "hops_per_conversation": total / conversations,
+                "thread_sensitive_hops": hops["thread_sensitive"],
+                "thread_pool_hops": hops["thread_pool"],
+                "db_executor_hops": executor_hops,
+            })
+        return {"tool_calls_per_conversation": len(steps), "rounds": out, "db_executors": db_executor_stats()}
@@ -0,0 +1,67 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from omniflow.customer360 import projector
+from omniflow.loadtest.dataset import DatasetGenerator, DatasetSpec
+
+# Order counts for --scale; users and products follow from DatasetSpec's ratios.
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate consistent synthetic users, orders, shipments, tracking events, wallets, transactions "
+        "and tickets across the domain databases (seeded, bulk inserted)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(SCALES), default=None, help="Preset order count")
+        parser.add_argument("--orders", type=int, default=None, help="Orders to generate (default: 10k)")
+        parser.add_argument("--users", type=int, default=0, help="Users to generate (default: orders / 4)")
+        parser.add_argument("--products", type=int, default=0, help="Products to generate (default: orders / 200, 20..5000)")
+        parser.add_argument("--warehouses", type=int, default=40, help="Warehouses to generate (default: 40)")
+        parser.add_argument("--seed", type=int, default=42, help="RNG seed; the same seed and sizes give the same rows")
+        parser.add_argument("--as-of", default=None, help="Date orders are aged against, YYYY-MM-DD (default: today)")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT (default: 5000)")
+        parser.add_argument("--chunk-orders", type=int, default=200_000, help="Orders generated per chunk, bounds memory (default: 200000)")
+        parser.add_argument("--outbox", action="store_true", help="Also record outbox events for every row (when OUTBOX_ENABLED)")
+        parser.add_argument("--skip-customer360", action="store_true", help="Do not project the new orders into customer360")
+
+    def handle(self, *args, **options):
+        orders = options["orders"] or SCALES.get(options["scale"] or "10k")
+        if orders <= 0:
+            raise CommandError("--orders must be positive")
+        try:
+            as_of = date.fromisoformat(options["as_of"]) if options["as_of"] else date.today()
+        except ValueError as e:
+            raise CommandError(f"Invalid --as-of: {e}")
+
+        spec = DatasetSpec(
+            orders=orders,
+            users=options["users"],
+            products=options["products"],
+            warehouses=options["warehouses"],
+            seed=options["seed"],
+            as_of=as_of,
+            batch_size=options["batch_size"],
+            chunk_orders=options["chunk_orders"],
+        )
+        self.stdout.write(
+            f"Generating {spec.orders} orders for {spec.users} users over {spec.products} products (seed {spec.seed})"
+        )
+        generator = DatasetGenerator(spec, emit_events=options["outbox"], progress=lambda m: self.stdout.write(f"  {m}"))
+        counts = generator.run()
+        for label, n in counts.items():
+            if label != "elapsed_s":
+                self.stdout.write(f"  {label:<28}{n:>12}")
+        self.stdout.write(f"  generated in {counts['elapsed_s']} s")
+
+        if not options["skip_customer360"]:
+            first, last = generator.order_range
+            total = 0
+            for start in range(first, last + 1, 500):
+                total += projector.refresh_orders(range(start, min(start + 500, last + 1)))
+            self.stdout.write(f"  {total} orders projected into customer360")
+
+        self.stdout.write(self.style.SUCCESS("✅ Synthetic dataset generated"))
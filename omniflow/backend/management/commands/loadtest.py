@@ -0,0 +1,145 @@
+import asyncio
+import json
+import logging
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from omniflow.core.cache.entity import clear_entity_caches
+from omniflow.core.db.executor import shutdown_db_executors
+from omniflow.loadtest.databases import drop_scratch_databases, row_counts, use_scratch_databases
+from omniflow.loadtest.fake_llm import install_fake_llm
+from omniflow.loadtest.runner import compare, replay, summarize
+from omniflow.loadtest.scenarios import WorkloadBuilder, parse_mix
+from omniflow.utils.config import settings as pydantic_settings
+
+TRANSPORTS = ("http", "ws")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a mix of intents through /api/query/ and /ws/query/ against scratch copies of the "
+        "databases, with a fake LLM, and save throughput and latency percentiles as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--conversations", type=int, default=200, help="Conversations per transport (default: 200)")
+        parser.add_argument("--concurrency", type=int, default=16, help="Conversations in flight (default: 16)")
+        parser.add_argument("--transport", default="http,ws", help="Comma-separated: http, ws (default: both)")
+        parser.add_argument("--mix", default=None, help="Scenario weights, e.g. tracking=40,wallet=20,paid_amount=15,complex_query=15,return_flow=10")
+        parser.add_argument("--warmup", type=int, default=5, help="Unmeasured conversations per transport")
+        parser.add_argument("--seed", type=int, default=42, help="Workload RNG seed")
+        parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Fake LLM latency per call")
+        parser.add_argument("--llm-jitter-ms", type=float, default=100.0, help="Extra per-prompt latency, 0..N ms")
+        parser.add_argument("--dataset", default=None, help="Directory with the SQLite files to copy (default: the configured databases)")
+        parser.add_argument("--mcp", action="store_true", help="Route agent tools through the local MCP servers")
+        parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+        parser.add_argument("--output", default=None, help="Results file (default: loadtest-<timestamp>.json)")
+        parser.add_argument("--baseline", default=None, help="Earlier results file to compare p95 and throughput against")
+        parser.add_argument("--verbose", action="store_true", help="Keep INFO logging during the run")
+
+    def handle(self, *args, **options):
+        transports = [t.strip() for t in options["transport"].split(",") if t.strip()]
+        unknown = set(transports) - set(TRANSPORTS)
+        if unknown:
+            raise CommandError(f"Unknown transports: {', '.join(sorted(unknown))}")
+        try:
+            mix = parse_mix(options.get("mix"))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        baseline = None
+        if options.get("baseline"):
+            baseline = json.loads(Path(options["baseline"]).read_text())
+
+        try:
+            scratch = use_scratch_databases(options.get("dataset"))
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"Scratch databases in {scratch}")
+
+        if not options.get("verbose"):
+            logging.getLogger().setLevel(logging.WARNING)
+
+        # Node/tool/DB/LLM spans come back in each response's decision_trace.
+        pydantic_settings.TRACE_ENABLED = True
+        pydantic_settings.TRACE_DEBUG = True
+        install_fake_llm(options["llm_latency_ms"], options["llm_jitter_ms"])
+        if options.get("mcp"):
+            from omniflow.agents.langchain_based_agents.base import mcp_manager
+            from omniflow.mcp_servers.harness import register_local_servers
+
+            pydantic_settings.MCP_ENABLED = True
+            register_local_servers(mcp_manager)
+
+        from backend.asgi import application
+
+        try:
+            dataset = row_counts()
+            builder = WorkloadBuilder(seed=options["seed"])
+            warmup = builder.build(options["warmup"], mix) if options["warmup"] > 0 else []
+            conversations = builder.build(options["conversations"], mix)
+        except ValueError as e:
+            drop_scratch_databases(scratch)
+            raise CommandError(str(e))
+
+        results = {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "config": {
+                "conversations": options["conversations"],
+                "concurrency": options["concurrency"],
+                "mix": mix,
+                "seed": options["seed"],
+                "llm_latency_ms": options["llm_latency_ms"],
+                "llm_jitter_ms": options["llm_jitter_ms"],
+                "mcp": bool(options.get("mcp")),
+                "dataset": options.get("dataset") or "configured",
+            },
+            "dataset": dataset,
+            "transports": {},
+        }
+
+        try:
+            for transport in transports:
+                clear_entity_caches()
+                if warmup:
+                    asyncio.run(replay(application, transport, warmup, options["concurrency"], options["timeout"]))
+                run = asyncio.run(replay(application, transport, conversations, options["concurrency"], options["timeout"]))
+                results["transports"][transport] = summarize(run["samples"], run["wall_s"])
+        finally:
+            shutdown_db_executors()
+            if options.get("mcp"):
+                from omniflow.agents.langchain_based_agents.base import mcp_manager
+
+                mcp_manager.shutdown()
+            drop_scratch_databases(scratch)
+
+        output = Path(options.get("output") or f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+        output.write_text(json.dumps(results, indent=2))
+
+        for transport, summary in results["transports"].items():
+            self.stdout.write(
+                f"{transport}: {summary['requests']} requests in {summary['wall_s']:.1f} s "
+                f"({summary['throughput_rps']} req/s), {summary['errors']} errors"
+            )
+            self.stdout.write(f"  {'intent':<15}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+            for intent, stats in summary["intents"].items():
+                self.stdout.write(
+                    f"  {intent:<15}{stats['count']:>6}{stats['p50'] or 0:>10.1f}{stats['p95'] or 0:>10.1f}{stats['p99'] or 0:>10.1f}"
+                )
+        if baseline:
+            for line in compare(results, baseline):
+                self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f"✅ Results written to {output}"))
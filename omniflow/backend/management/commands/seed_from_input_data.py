@@ -3,8 +3,11 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from functools import reduce
+from operator import or_
+
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from omniflow.agents.input_data import (
@@ -30,6 +33,8 @@ from omniflow.shipstream.models import (
 )
 from omniflow.caredesk.models import Ticket, TicketMessage
 from omniflow.payguard.models import Wallet, PaymentMethod, Transaction
+from omniflow.core.db.bulk import BulkLoader, chunked
+from omniflow.customer360 import projector
 
 
 def _parse_date(value: str | None):
@@ -62,323 +67,292 @@ def _derive_ticket_pk(ticket_key: str) -> int | None:
 class Command(BaseCommand):
     help = "Seed all domain databases from omniflow/agents/input_data.py"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT (default: 5000)")
+
     def handle(self, *args, **options):
         now = timezone.now()
+        self.batch_size = options["batch_size"]
+        self._seed_shopcore(now)
+        self._seed_shipstream(now)
+        self._seed_caredesk()
+        self._seed_payguard(now)
+        # Bulk writes skip the signals that keep customer360 current.
+        projector.refresh_orders(
+            _derive_order_id_from_shipment_id(o.get("shipment_id")) for o in (input_orders_db or {}).values()
+        )
+        self.stdout.write(self.style.SUCCESS("✅ Seeded all domain DBs from input_data.py"))
 
-        # -----------------------------
-        # ShopCore
-        # -----------------------------
-        with transaction.atomic(using="shopcore"):
-            for _, row in (input_users_db or {}).items():
-                uid = row.get("id")
-                email = (row.get("email") or "").strip().lower() or None
-                name = (row.get("name") or "").strip()
-                if not uid:
-                    continue
-
-                User.objects.using("shopcore").update_or_create(
-                    id=int(uid),
-                    defaults={
-                        "name": name or f"User {uid}",
-                        "email": email,
-                        "premium_status": bool(row.get("premium_status") or False),
-                    },
-                )
-
-            for _, row in (input_products_db or {}).items():
-                pid = row.get("id")
-                if not pid:
-                    continue
-
-                price = row.get("price")
-                try:
-                    price_dec = Decimal(str(price)) if price is not None else Decimal("0.00")
-                except Exception:
-                    price_dec = Decimal("0.00")
-
-                Product.objects.using("shopcore").update_or_create(
-                    id=int(pid),
-                    defaults={
-                        "name": (row.get("name") or "").strip() or f"Product {pid}",
-                        "category": (row.get("category") or "").strip() or "Unknown",
-                        "price": price_dec,
-                    },
-                )
-
-            for _, row in (input_orders_db or {}).items():
-                shipment_id = row.get("shipment_id")
-                oid = _derive_order_id_from_shipment_id(shipment_id)
-                if not oid:
-                    continue
-
-                user_id = row.get("user_id")
-                product_id = row.get("product_id")
-                order_date = _parse_date(row.get("order_date")) or now.date()
-                status = (row.get("status") or "Processing").strip() or "Processing"
-
-                Order.objects.using("shopcore").update_or_create(
-                    id=int(oid),
-                    defaults={
-                        "user_id": int(user_id) if user_id is not None else None,
-                        "product_id": int(product_id) if product_id is not None else None,
-                        "order_date": order_date,
-                        "status": status,
-                    },
-                )
-
-                if user_id is not None and product_id is not None:
-                    qs = (
-                        Order.objects.using("shopcore")
-                        .filter(user_id=int(user_id), product_id=int(product_id))
-                        .exclude(id=int(oid))
-                    )
-                    try:
-                        qs._raw_delete(using="shopcore")
-                    except Exception:
-                        from django.db import connections
-
-                        with connections["shopcore"].cursor() as cursor:
-                            cursor.execute(
-                                "DELETE FROM shopcore_order WHERE user_id = ? AND product_id = ? AND id <> ?",
-                                [int(user_id), int(product_id), int(oid)],
-                            )
-
-        # -----------------------------
-        # ShipStream
-        # -----------------------------
-        with transaction.atomic(using="shipstream"):
-            # Warehouses used for tracking events
-            wh_origin, _ = Warehouse.objects.using("shipstream").get_or_create(
-                location="Origin Hub",
-                defaults={"manager_name": "Manager Origin"},
-            )
-            wh_transit, _ = Warehouse.objects.using("shipstream").get_or_create(
-                location="Transit Hub",
-                defaults={"manager_name": "Manager Transit"},
+    # -----------------------------
+    # ShopCore
+    # -----------------------------
+    def _seed_shopcore(self, now):
+        users = []
+        for _, row in (input_users_db or {}).items():
+            uid = row.get("id")
+            if not uid:
+                continue
+            users.append(User(
+                id=int(uid),
+                name=(row.get("name") or "").strip() or f"User {uid}",
+                email=(row.get("email") or "").strip().lower() or None,
+                premium_status=bool(row.get("premium_status") or False),
+            ))
+
+        products = []
+        for _, row in (input_products_db or {}).items():
+            pid = row.get("id")
+            if not pid:
+                continue
+            price = row.get("price")
+            try:
+                price_dec = Decimal(str(price)) if price is not None else Decimal("0.00")
+            except Exception:
+                price_dec = Decimal("0.00")
+            products.append(Product(
+                id=int(pid),
+                name=(row.get("name") or "").strip() or f"Product {pid}",
+                category=(row.get("category") or "").strip() or "Unknown",
+                price=price_dec,
+            ))
+
+        # One order per (user, product): a later row replaces an earlier one.
+        orders = {}
+        for _, row in (input_orders_db or {}).items():
+            oid = _derive_order_id_from_shipment_id(row.get("shipment_id"))
+            if not oid:
+                continue
+            user_id = row.get("user_id")
+            product_id = row.get("product_id")
+            order = Order(
+                id=int(oid),
+                user_id=int(user_id) if user_id is not None else None,
+                product_id=int(product_id) if product_id is not None else None,
+                order_date=_parse_date(row.get("order_date")) or now.date(),
+                status=(row.get("status") or "Processing").strip() or "Processing",
             )
-            wh_dest, _ = Warehouse.objects.using("shipstream").get_or_create(
-                location="Destination Hub",
-                defaults={"manager_name": "Manager Destination"},
-            )
-
+            key = (order.user_id, order.product_id) if user_id is not None and product_id is not None else ("id", oid)
+            orders[key] = order
+
+        with BulkLoader("shopcore", batch_size=self.batch_size) as loader:
+            loader.upsert(User, users, unique_fields=["id"])
+            loader.upsert(Product, products, unique_fields=["id"])
+            loader.upsert(Order, orders.values(), unique_fields=["id"])
+
+            # Drop other orders for the same user+product, so "my latest Gaming Monitor order" is the seeded one.
+            pairs = [(o.user_id, o.product_id) for key, o in orders.items() if key[0] != "id"]
+            keep = [o.id for o in orders.values()]
+            for batch in chunked(pairs, 200):
+                match = reduce(or_, (Q(user_id=u, product_id=p) for u, p in batch))
+                Order.objects.using("shopcore").filter(match).exclude(id__in=keep)._raw_delete(using="shopcore")
+
+    # -----------------------------
+    # ShipStream
+    # -----------------------------
+    def _seed_shipstream(self, now):
+        with BulkLoader("shipstream", batch_size=self.batch_size) as loader:
+            # Warehouses used for tracking events
+            hubs = loader.key_map(Warehouse, "location", location__in=["Origin Hub", "Transit Hub", "Destination Hub"])
+            missing = [
+                Warehouse(location=location, manager_name=f"Manager {location.split()[0]}")
+                for location in ("Origin Hub", "Transit Hub", "Destination Hub")
+                if location not in hubs
+            ]
+            if missing:
+                loader.insert(Warehouse, missing)
+                hubs = loader.key_map(Warehouse, "location", location__in=["Origin Hub", "Transit Hub", "Destination Hub"])
+
+            shipments = []
             for tracking_number, row in (input_forward_shipments_db or {}).items():
                 tn = (tracking_number or "").strip().upper()
                 if not tn:
                     continue
 
                 shipment_date = _parse_date(row.get("date"))
-                eta = shipment_date + timedelta(days=4) if shipment_date else None
-
                 amount = row.get("amount")
                 try:
                     amount_dec = Decimal(str(amount)) if amount is not None else Decimal("0.00")
                 except Exception:
                     amount_dec = Decimal("0.00")
-
                 order_id = _derive_order_id_from_shipment_id(tn)
 
-                shipment, _ = Shipment.objects.using("shipstream").update_or_create(
+                shipments.append(Shipment(
                     tracking_number=tn,
-                    defaults={
-                        "order_id": int(order_id) if order_id is not None else None,
-                        "shipment_date": shipment_date,
-                        "estimated_arrival": eta,
-                        "customer_name": (row.get("customer") or "").strip(),
-                        "status": (row.get("status") or "").strip(),
-                        "amount": amount_dec,
-                        "notes": (row.get("notes") or "").strip(),
-                    },
-                )
-
-                # Minimal tracking timeline for current-location support.
-                # Idempotent: remove previous synthetic events for this shipment.
+                    order_id=int(order_id) if order_id is not None else None,
+                    shipment_date=shipment_date,
+                    estimated_arrival=shipment_date + timedelta(days=4) if shipment_date else None,
+                    customer_name=(row.get("customer") or "").strip(),
+                    status=(row.get("status") or "").strip(),
+                    amount=amount_dec,
+                    notes=(row.get("notes") or "").strip(),
+                ))
+            loader.upsert(Shipment, shipments, unique_fields=["tracking_number"])
+
+            # Minimal tracking timeline for current-location support.
+            # Idempotent: replace previous synthetic events for these shipments.
+            ids = loader.key_map(Shipment, "tracking_number", tracking_number__in=[s.tracking_number for s in shipments])
+            synthetic = ["Created", "In Transit", "Delivered", "RTO_Initiated", "Exchanged"]
+            for batch in chunked(list(ids.values()), 900):
                 TrackingEvent.objects.using("shipstream").filter(
-                    shipment_id=shipment.id,
-                    status_update__in=["Created", "In Transit", "Delivered", "RTO_Initiated", "Exchanged"],
-                ).delete()
-
-                status = (shipment.status or "").strip()
-                if status == "Delivered":
-                    wid = wh_dest.id
-                elif status == "RTO_Initiated":
-                    wid = wh_transit.id
-                elif status == "Exchanged":
-                    wid = wh_dest.id
-                else:
-                    wid = wh_transit.id
-
-                TrackingEvent.objects.using("shipstream").create(
-                    shipment_id=shipment.id,
-                    warehouse_id=int(wid),
+                    shipment_id__in=batch, status_update__in=synthetic,
+                )._raw_delete(using="shipstream")
+            hub_for_status = {"Delivered": "Destination Hub", "Exchanged": "Destination Hub"}
+            loader.insert(TrackingEvent, [
+                TrackingEvent(
+                    shipment_id=ids[s.tracking_number],
+                    warehouse_id=hubs[hub_for_status.get(s.status, "Transit Hub")],
                     timestamp=now,
-                    status_update=status or "In Transit",
+                    status_update=s.status or "In Transit",
                 )
+                for s in shipments
+            ])
 
+            reverse, ndr, exchange = [], [], []
             for reverse_number, row in (input_reverse_shipments_db or {}).items():
                 rn = (reverse_number or "").strip().upper()
                 original_awb = (row.get("original_awb") or "").strip().upper()
                 if not rn or not original_awb:
                     continue
-
-                Shipment.objects.using("shipstream").get_or_create(tracking_number=original_awb)
-
-                ReverseShipment.objects.using("shipstream").update_or_create(
+                reverse.append(ReverseShipment(
                     reverse_number=rn,
-                    defaults={
-                        "original_shipment_id": original_awb,
-                        "return_date": _parse_date(row.get("return_date")) or now.date(),
-                        "reason": (row.get("reason") or "").strip(),
-                        "refund_status": (row.get("refund_status") or "").strip(),
-                    },
-                )
+                    original_shipment_id=original_awb,
+                    return_date=_parse_date(row.get("return_date")) or now.date(),
+                    reason=(row.get("reason") or "").strip(),
+                    refund_status=(row.get("refund_status") or "").strip(),
+                ))
 
             for ndr_number, row in (input_ndr_shipments_db or {}).items():
                 nn = (ndr_number or "").strip().upper()
                 original_awb = (row.get("original_awb") or "").strip().upper()
                 if not nn or not original_awb:
                     continue
-
-                Shipment.objects.using("shipstream").get_or_create(tracking_number=original_awb)
-
                 attempts = row.get("attempts")
                 try:
                     attempts_int = int(attempts) if attempts is not None else 1
                 except Exception:
                     attempts_int = 1
-
-                NdrEvent.objects.using("shipstream").update_or_create(
+                ndr.append(NdrEvent(
                     ndr_number=nn,
-                    defaults={
-                        "original_shipment_id": original_awb,
-                        "ndr_date": _parse_date(row.get("ndr_date")) or now.date(),
-                        "issue": (row.get("issue") or "").strip(),
-                        "attempts": attempts_int,
-                        "final_outcome": (row.get("final_outcome") or "").strip(),
-                    },
-                )
+                    original_shipment_id=original_awb,
+                    ndr_date=_parse_date(row.get("ndr_date")) or now.date(),
+                    issue=(row.get("issue") or "").strip(),
+                    attempts=attempts_int,
+                    final_outcome=(row.get("final_outcome") or "").strip(),
+                ))
 
             for exchange_number, row in (input_exchange_shipments_db or {}).items():
                 en = (exchange_number or "").strip().upper()
                 original_awb = (row.get("original_awb") or "").strip().upper()
                 if not en or not original_awb:
                     continue
-
-                Shipment.objects.using("shipstream").get_or_create(tracking_number=original_awb)
-
-                ExchangeShipment.objects.using("shipstream").update_or_create(
+                exchange.append(ExchangeShipment(
                     exchange_number=en,
-                    defaults={
-                        "original_shipment_id": original_awb,
-                        "exchange_date": _parse_date(row.get("exchange_date")) or now.date(),
-                        "new_item": (row.get("new_item") or "").strip(),
-                        "status": (row.get("status") or "").strip(),
-                    },
-                )
-
-        # -----------------------------
-        # CareDesk
-        # -----------------------------
-        with transaction.atomic(using="caredesk"):
-            for ticket_key, row in (input_tickets_db or {}).items():
-                pk = _derive_ticket_pk(ticket_key)
-                if not pk:
-                    continue
-
-                user_id = row.get("user_id")
-                user_email = (row.get("user_email") or "").strip().lower()
-
-                # If we have an order for the same user+Gaming Monitor in input_orders_db, reference it.
-                ref = None
-                for _, o in (input_orders_db or {}).items():
-                    if o.get("user_id") == user_id:
-                        ref = _derive_order_id_from_shipment_id(o.get("shipment_id"))
-                        if ref:
-                            break
-
-                Ticket.objects.using("caredesk").update_or_create(
-                    id=int(pk),
-                    defaults={
-                        "user_id": int(user_id) if user_id is not None else 0,
-                        "reference_id": str(ref) if ref is not None else (user_email or ""),
-                        "issue_type": (row.get("subject") or "").strip() or "Support",
-                        "status": (row.get("status") or "").strip() or "Open",
-                    },
-                )
-
-                if not TicketMessage.objects.using("caredesk").filter(ticket_id=int(pk)).exists():
-                    TicketMessage.objects.using("caredesk").create(
-                        ticket_id=int(pk),
-                        sender="Agent",
-                        content="Seeded from input_data.",
-                    )
-
-        # -----------------------------
-        # PayGuard
-        # -----------------------------
-        with transaction.atomic(using="payguard"):
-            # Wallets for all users in input_data
-            for _, row in (input_users_db or {}).items():
-                uid = row.get("id")
-                if not uid:
-                    continue
-
-                Wallet.objects.using("payguard").update_or_create(
-                    user_id=int(uid),
-                    defaults={
-                        "balance": Decimal("0.00"),
-                        "currency": "INR",
-                    },
-                )
-
-            # Create one payment method per wallet if missing
-            for wallet in Wallet.objects.using("payguard").all():
-                if not PaymentMethod.objects.using("payguard").filter(wallet_id=wallet.id).exists():
-                    PaymentMethod.objects.using("payguard").create(
-                        wallet=wallet,
-                        provider="VISA",
-                        expiry_date=(now.date() + timedelta(days=365 * 2)),
-                    )
+                    original_shipment_id=original_awb,
+                    exchange_date=_parse_date(row.get("exchange_date")) or now.date(),
+                    new_item=(row.get("new_item") or "").strip(),
+                    status=(row.get("status") or "").strip(),
+                ))
+
+            # Placeholder forward shipments for any AWB referenced but not seeded.
+            referenced = {r.original_shipment_id for r in reverse + ndr + exchange}
+            known = loader.existing(Shipment, "tracking_number", referenced)
+            loader.insert(Shipment, [Shipment(tracking_number=awb) for awb in sorted(referenced - known)], ignore_conflicts=True)
+
+            loader.upsert(ReverseShipment, reverse, unique_fields=["reverse_number"])
+            loader.upsert(NdrEvent, ndr, unique_fields=["ndr_number"])
+            loader.upsert(ExchangeShipment, exchange, unique_fields=["exchange_number"])
+
+    # -----------------------------
+    # CareDesk
+    # -----------------------------
+    def _seed_caredesk(self):
+        # A ticket references the user's first order in input_orders_db.
+        first_order = {}
+        for _, o in (input_orders_db or {}).items():
+            ref = _derive_order_id_from_shipment_id(o.get("shipment_id"))
+            if ref:
+                first_order.setdefault(o.get("user_id"), ref)
+
+        tickets = []
+        for ticket_key, row in (input_tickets_db or {}).items():
+            pk = _derive_ticket_pk(ticket_key)
+            if not pk:
+                continue
+            user_id = row.get("user_id")
+            user_email = (row.get("user_email") or "").strip().lower()
+            ref = first_order.get(user_id)
+            tickets.append(Ticket(
+                id=int(pk),
+                user_id=int(user_id) if user_id is not None else 0,
+                reference_id=str(ref) if ref is not None else (user_email or ""),
+                issue_type=(row.get("subject") or "").strip() or "Support",
+                status=(row.get("status") or "").strip() or "Open",
+            ))
+
+        with BulkLoader("caredesk", batch_size=self.batch_size) as loader:
+            loader.upsert(Ticket, tickets, unique_fields=["id"])
+            with_messages = loader.existing(TicketMessage, "ticket_id", [t.id for t in tickets])
+            loader.insert(TicketMessage, [
+                TicketMessage(ticket_id=t.id, sender="Agent", content="Seeded from input_data.")
+                for t in tickets
+                if t.id not in with_messages
+            ])
+
+    # -----------------------------
+    # PayGuard
+    # -----------------------------
+    def _seed_payguard(self, now):
+        user_ids = [int(row["id"]) for row in (input_users_db or {}).values() if row.get("id")]
+
+        order_user = {}
+        order_by_key = {}
+        for key, o in (input_orders_db or {}).items():
+            oid = _derive_order_id_from_shipment_id(o.get("shipment_id"))
+            if oid is not None:
+                order_by_key[key] = oid
+                order_user.setdefault(oid, o.get("user_id"))
+
+        with BulkLoader("payguard", batch_size=self.batch_size) as loader:
+            # Wallets for all users in input_data (user_id is not unique, so no upsert)
+            wallets = {w.user_id: w for w in Wallet.objects.using("payguard").filter(user_id__in=user_ids)}
+            for wallet in wallets.values():
+                wallet.balance, wallet.currency = Decimal("0.00"), "INR"
+            loader.update(Wallet, wallets.values(), ["balance", "currency"])
+            loader.insert(Wallet, [
+                Wallet(user_id=uid, balance=Decimal("0.00"), currency="INR")
+                for uid in dict.fromkeys(user_ids)
+                if uid not in wallets
+            ])
+            wallet_ids = loader.key_map(Wallet, "user_id", "id", user_id__in=user_ids)
+
+            # One payment method per wallet if missing
+            all_wallets = loader.key_map(Wallet, "id", "id")
+            with_methods = loader.existing(PaymentMethod, "wallet_id", all_wallets)
+            loader.insert(PaymentMethod, [
+                PaymentMethod(wallet_id=wid, provider="VISA", expiry_date=now.date() + timedelta(days=365 * 2))
+                for wid in all_wallets
+                if wid not in with_methods
+            ])
 
             # Transactions based on input_payments_db
+            transactions = []
             for _, row in (input_payments_db or {}).items():
                 ext_order = row.get("order_id")
-                amount = row.get("amount")
-                status = (row.get("status") or "").strip().lower()
-
-                # Map external order string -> derived int order_id
-                order_id = None
-                if isinstance(ext_order, str):
-                    order_row = (input_orders_db or {}).get(ext_order)
-                    if isinstance(order_row, dict):
-                        order_id = _derive_order_id_from_shipment_id(order_row.get("shipment_id"))
+                order_id = order_by_key.get(ext_order) if isinstance(ext_order, str) else None
                 if order_id is None:
                     continue
-
-                # Find user_id from order
-                user_id = None
-                for _, o in (input_orders_db or {}).items():
-                    if _derive_order_id_from_shipment_id(o.get("shipment_id")) == order_id:
-                        user_id = o.get("user_id")
-                        break
-                if user_id is None:
-                    continue
-
-                wallet = Wallet.objects.using("payguard").filter(user_id=int(user_id)).first()
-                if not wallet:
+                user_id = order_user.get(order_id)
+                wallet_id = wallet_ids.get(int(user_id)) if user_id is not None else None
+                if not wallet_id:
                     continue
 
+                amount = row.get("amount")
                 try:
                     amount_dec = Decimal(str(amount)) if amount is not None else Decimal("0.00")
                 except Exception:
                     amount_dec = Decimal("0.00")
-
+                status = (row.get("status") or "").strip().lower()
                 tx_type = "Debit" if status == "paid" else "Refund" if status == "refunded" else "Debit"
 
-                Transaction.objects.using("payguard").create(
-                    wallet=wallet,
-                    order_id=int(order_id),
-                    amount=amount_dec,
-                    type=tx_type,
-                )
-
-        self.stdout.write(self.style.SUCCESS("✅ Seeded all domain DBs from input_data.py"))
+                transactions.append(Transaction(wallet_id=wallet_id, order_id=int(order_id), amount=amount_dec, type=tx_type))
+            loader.insert(Transaction, transactions)
@@ -26,10 +26,14 @@ INSTALLED_APPS = [
     "omniflow.shipstream",
     "omniflow.payguard",
     "omniflow.caredesk",
+    "omniflow.customer360",
+    "omniflow.events",
     "omniflow.backend",
 ]
 
 MIDDLEWARE = [
+    'api_gateway.middleware.request_id_middleware',
+    'api_gateway.middleware.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,30 +66,39 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DATABASE_DIR points every SQLite file somewhere else (a volume, or a
+# throwaway copy for load tests); MCP server subprocesses inherit it.
+DB_DIR = Path(settings.DATABASE_DIR) if settings.DATABASE_DIR else BASE_DIR
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': DB_DIR / 'db.sqlite3',
     }
     ,
     'shopcore': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db_shopcore.sqlite3',
+        'NAME': DB_DIR / 'db_shopcore.sqlite3',
     },
     'shipstream': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db_shipstream.sqlite3',
+        'NAME': DB_DIR / 'db_shipstream.sqlite3',
     },
     'payguard': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db_payguard.sqlite3',
+        'NAME': DB_DIR / 'db_payguard.sqlite3',
     },
     'caredesk': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db_caredesk.sqlite3',
+        'NAME': DB_DIR / 'db_caredesk.sqlite3',
     },
 }
 
+# Domain tools query the SQLite files from several executor threads at once
+# (omniflow/core/db/executor.py); wait for a writer's lock instead of failing.
+for _db in DATABASES.values():
+    _db.setdefault('OPTIONS', {})['timeout'] = settings.SQLITE_TIMEOUT
+
 DATABASE_ROUTERS = [
     "omniflow.backend.db_router.OmniDBRouter",
 ]
@@ -127,6 +140,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded media (return-proof images/video frames)
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", BASE_DIR / "media"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -18,6 +18,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http import HttpResponse, HttpResponseRedirect
 
+from api_gateway.metrics_views import metrics
+
 def favicon(request):
     return HttpResponse('', content_type='image/x-icon')
 
@@ -27,6 +29,7 @@ def root_redirect(request):
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("favicon.ico", favicon),
+    path("metrics", metrics, name="metrics"),
     path("", root_redirect),
     path("api/", include("api_gateway.urls")),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+from omniflow.agents.langchain_based_agents.base import mcp_manager  # noqa: E402
+
+# Discover MCP tools in the background before the first request arrives.
+mcp_manager.start_discovery()
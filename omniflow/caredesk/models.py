@@ -1,5 +1,7 @@
 from django.db import models
 
+from omniflow.events.models import OutboxEventBase
+
 # Create your models here.
 from django.db import models
 
@@ -63,3 +65,7 @@ class TicketAttachment(models.Model):
 
     def __str__(self):
         return f"Attachment {self.id} (Ticket {self.ticket_id})"
+
+
+class OutboxEvent(OutboxEventBase):
+    """Change log for the caredesk database (see `omniflow.events`)."""
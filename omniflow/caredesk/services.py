@@ -1,13 +1,37 @@
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from omniflow.core.cache.entity import register_entity_cache
+
 from .models import Ticket, TicketMessage
 
 
-def get_latest_ticket_for_user(user_id: int):
-    return (
-        Ticket.objects
+def _normalize_user_id(user_id):
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+
+# Keyed by user: any ticket saved for a user may become their latest one.
+latest_ticket_by_user = register_entity_cache(
+    "caredesk.latest_ticket",
+    Ticket,
+    loader=lambda user_id: (
+        Ticket.objects.using("caredesk")
         .filter(user_id=user_id)
         .order_by("-created_at")
         .first()
-    )
+    ),
+    key_for=lambda ticket: ticket.user_id,
+    normalize=_normalize_user_id,
+)
+
+
+def get_latest_ticket_for_user(user_id: int):
+    return latest_ticket_by_user.get(user_id)
 
 
 def get_messages_for_ticket(ticket_id: int):
@@ -15,4 +39,116 @@ def get_messages_for_ticket(ticket_id: int):
         TicketMessage.objects
         .filter(ticket_id=ticket_id)
         .order_by("timestamp")
-    )
\ No newline at end of file
+    )
+
+
+# Dict payloads shared by the CareDesk agent and the local support/knowledge
+# MCP servers.
+
+def latest_ticket_status(user_id: int, order_id: Optional[int] = None) -> dict:
+    order_ref = str(order_id) if order_id is not None else None
+
+    qs = Ticket.objects.using("caredesk").filter(user_id=user_id)
+    if order_ref:
+        qs = qs.filter(reference_id=order_ref)
+    t = qs.order_by("-created_at", "-id").first()
+    if not t:
+        return {
+            "found": False,
+            "reason": "ticket_not_found",
+            "user_id": user_id,
+            "order_id": order_id,
+        }
+
+    status = (t.status or "").strip()
+    status_key = status.lower().replace("-", " ").replace("_", " ").strip()
+    assigned = status_key in {"assigned", "in progress", "inprogress"}
+
+    return {
+        "found": True,
+        "ticket_id": t.id,
+        "status": status,
+        "issue_type": t.issue_type,
+        "created_at": str(t.created_at),
+        "reference_id": t.reference_id,
+        "assigned": assigned,
+    }
+
+
+def _message_payload(m: TicketMessage) -> dict:
+    return {"sender": m.sender, "content": m.content, "timestamp": str(m.timestamp)}
+
+
+def ticket_with_messages(user_id: int) -> dict:
+    ticket = get_latest_ticket_for_user(user_id)
+    if not ticket:
+        return {}
+    return {
+        "ticket_id": ticket.id,
+        "issue_type": ticket.issue_type,
+        "status": ticket.status,
+        "created_at": str(ticket.created_at),
+        "messages": [_message_payload(m) for m in get_messages_for_ticket(ticket.id)],
+    }
+
+
+def create_ticket(user_id: int, issue_type: str, description: str, reference_id: str = "") -> dict:
+    with transaction.atomic(using="caredesk"):
+        ticket = Ticket.objects.using("caredesk").create(
+            user_id=user_id,
+            reference_id=reference_id or "",
+            issue_type=issue_type,
+            status="Open",
+        )
+        if description:
+            TicketMessage.objects.using("caredesk").create(ticket=ticket, sender="User", content=description)
+    return {"ticket_id": ticket.id, "status": ticket.status, "issue_type": ticket.issue_type}
+
+
+def add_message(ticket_id: int, sender: str, content: str) -> dict:
+    if not Ticket.objects.using("caredesk").filter(id=ticket_id).exists():
+        return {"error": f"Ticket {ticket_id} not found"}
+    message = TicketMessage.objects.using("caredesk").create(ticket_id=ticket_id, sender=sender, content=content)
+    return {"ticket_id": ticket_id, "message": _message_payload(message)}
+
+
+def escalate_ticket(ticket_id: int, reason: str) -> dict:
+    with transaction.atomic(using="caredesk"):
+        ticket = Ticket.objects.using("caredesk").select_for_update().filter(id=ticket_id).first()
+        if ticket is None:
+            return {"error": f"Ticket {ticket_id} not found"}
+        # save() rather than queryset.update() so post_save refreshes the
+        # entity cache and the customer-360 projection.
+        ticket.status = "Escalated"
+        ticket.save(using="caredesk", update_fields=["status"])
+        TicketMessage.objects.using("caredesk").create(
+            ticket_id=ticket_id,
+            sender="Agent",
+            content=f"Escalated: {reason}",
+        )
+    return {"ticket_id": ticket_id, "status": "Escalated"}
+
+
+def search_messages(query: str, limit: int = 5) -> dict:
+    """Keyword search over past ticket conversations, most recent first."""
+    terms = [t for t in (query or "").split() if len(t) > 2][:5]
+    if not terms:
+        return {"results": []}
+
+    qs = TicketMessage.objects.using("caredesk").select_related("ticket")
+    match = Q()
+    for term in terms:
+        match |= Q(content__icontains=term)
+    rows = qs.filter(match).order_by("-timestamp")[: max(1, int(limit))]
+
+    return {
+        "results": [
+            {
+                "ticket_id": m.ticket_id,
+                "issue_type": m.ticket.issue_type,
+                "status": m.ticket.status,
+                **_message_payload(m),
+            }
+            for m in rows
+        ]
+    }
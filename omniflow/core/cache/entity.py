@@ -0,0 +1,231 @@
+# core/cache/entity.py
+import os
+import threading
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Type, TypeVar
+
+from django.db import router, transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+
+from omniflow.core.cache.identity import identity_evict, identity_load, identity_put
+from omniflow.core.cache.shared import MISSING as SHARED_MISSING, get_shared_tier
+from omniflow.core.db.executor import run_db
+from omniflow.utils.cache import LRUCache
+from omniflow.utils.config import settings
+
+T = TypeVar("T", bound=Model)
+
+_MISSING = object()
+_NONE = object()  # cached "no such row", so repeated misses stay cheap
+
+
+class EntityStats:
+    def __init__(self):
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round((self.hits + self.shared_hits) / lookups, 3) if lookups else None,
+            }
+
+
+class EntityCache(Generic[T]):
+    """
+    Read-through cache for one entity type keyed by a natural key
+    (user email, tracking number, ...).
+
+    `loader(key)` fetches the row (or None) on a miss; `key_for(instance)`
+    maps a saved/deleted instance back to its key so model signals can
+    invalidate it. Keys are passed through `normalize` on both paths.
+
+    Lookups go through the turn's identity map first (see identity.py), so
+    one turn sees one instance per key. Local entries are bounded by
+    ENTITY_CACHE_SIZE/ENTITY_CACHE_TTL. Writes made in another process reach
+    this one through the outbox follower started before the first load (see
+    `on_local_tier_start`); the TTL only bounds what a missed event can cost.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Type[T],
+        loader: Callable[[Hashable], Optional[T]],
+        key_for: Callable[[T], Hashable],
+        normalize: Optional[Callable[[Any], Hashable]] = None,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.name = name
+        self.model = model
+        self.loader = loader
+        self.key_for = key_for
+        self.normalize = normalize or (lambda key: key)
+        self.stats = EntityStats()
+        maxsize = maxsize or settings.ENTITY_CACHE_SIZE
+        self._local = LRUCache(maxsize=maxsize, ttl=settings.ENTITY_CACHE_TTL if ttl is None else ttl)
+        # pk -> key, so an update that changes the natural key also drops the old entry
+        self._keys_by_pk = LRUCache(maxsize=maxsize)
+
+    def get(self, key: Any) -> Optional[T]:
+        key = self.normalize(key)
+        if key is None or key == "":
+            return None
+        return identity_load(self.model, self.name, key, lambda: self._get(key))
+
+    def _get(self, key: Hashable) -> Optional[T]:
+        if not settings.ENTITY_CACHE_ENABLED:
+            self.stats.incr("misses")
+            return self.loader(key)
+
+        value = self._local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats.incr("hits")
+            return None if value is _NONE else value
+
+        _start_local_tier()
+
+        shared = get_shared_tier()
+        if shared is not None:
+            value = shared.get(self.name, key)
+            if value is not SHARED_MISSING:
+                self.stats.incr("shared_hits")
+                self._remember(key, value)
+                return value
+
+        self.stats.incr("misses")
+        value = self.loader(key)
+        self._remember(key, value)
+        if shared is not None:
+            shared.set(self.name, key, value)
+        return value
+
+    async def aget(self, key: Any) -> Optional[T]:
+        return await run_db(router.db_for_read(self.model) or "default", self.get, key)
+
+    def prime(self, instance: T) -> None:
+        """Store an instance loaded by some other query (e.g. a prefetch bundle)."""
+        key = self.normalize(self.key_for(instance))
+        if key is None or key == "":
+            return
+        if settings.ENTITY_CACHE_ENABLED:
+            _start_local_tier()
+            self._remember(key, instance)
+        identity_put(self.model, self.name, key, instance)
+
+    def _remember(self, key: Hashable, value: Optional[T]) -> None:
+        self._local.set(key, _NONE if value is None else value)
+        if value is not None:
+            self._keys_by_pk.set(value.pk, key)
+
+    def invalidate(self, key: Any) -> None:
+        key = self.normalize(key)
+        self._local.pop(key)
+        identity_evict(self.model, self.name, key)
+        shared = get_shared_tier()
+        if shared is not None:
+            shared.delete(self.name, key)
+        self.stats.incr("invalidations")
+
+    def keys_for_instance(self, instance: T) -> set:
+        """The instance's current key plus the one it was last cached under."""
+        keys = {self.normalize(self.key_for(instance))}
+        previous = self._keys_by_pk.get(instance.pk)
+        if previous is not None:
+            self._keys_by_pk.pop(instance.pk)
+            keys.add(previous)
+        return {key for key in keys if key is not None and key != ""}
+
+    def invalidate_instance(self, instance: T) -> None:
+        for key in self.keys_for_instance(instance):
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        self._local.clear()
+        self._keys_by_pk.clear()
+
+    def snapshot(self) -> dict:
+        return {**self.stats.snapshot(), "size": len(self._local)}
+
+
+_registry: Dict[str, EntityCache] = {}
+
+_local_tier_hooks: List[Callable[[], None]] = []
+_local_tier_lock = threading.Lock()
+_local_tier_pid: Optional[int] = None
+
+
+def on_local_tier_start(hook: Callable[[], None]) -> None:
+    """
+    Run `hook()` once per process (forked workers included) before its first
+    cache load, e.g. to start following other processes' writes.
+    """
+    _local_tier_hooks.append(hook)
+
+
+def _start_local_tier() -> None:
+    global _local_tier_pid
+    pid = os.getpid()
+    if _local_tier_pid == pid:
+        return
+    with _local_tier_lock:
+        if _local_tier_pid == pid:
+            return
+        # Run before anything is loaded, so a write that lands during the
+        # load is still seen by the hook (nothing cached yet can miss it).
+        for hook in _local_tier_hooks:
+            hook()
+        _local_tier_pid = pid
+
+
+def register_entity_cache(name: str, model: Type[T], **kwargs) -> EntityCache[T]:
+    """Create the cache for `name` and invalidate it on the model's save/delete signals."""
+    if name in _registry:
+        return _registry[name]
+
+    cache: EntityCache[T] = EntityCache(name, model, **kwargs)
+
+    def _invalidate(sender, instance, using=None, **_):
+        keys = cache.keys_for_instance(instance)
+
+        def invalidate_keys():
+            for key in keys:
+                cache.invalidate(key)
+
+        invalidate_keys()
+        # The signal fires inside the writer's transaction: a concurrent reader
+        # can still load and re-cache the old committed row until it commits.
+        transaction.on_commit(invalidate_keys, using=using)
+
+    post_save.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"entity_cache:{name}:save")
+    post_delete.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"entity_cache:{name}:delete")
+    _registry[name] = cache
+    return cache
+
+
+def entity_caches_for(model: Type[Model]) -> list:
+    """Caches holding rows of `model` (used by out-of-process invalidation)."""
+    return [cache for cache in _registry.values() if cache.model is model]
+
+
+def entity_cache_stats() -> Dict[str, dict]:
+    """Hit/miss/invalidation counters per entity type."""
+    return {name: cache.snapshot() for name, cache in _registry.items()}
+
+
+def clear_entity_caches() -> None:
+    for cache in _registry.values():
+        cache.clear()
@@ -0,0 +1,131 @@
+# core/cache/identity.py
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple, Type
+
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+
+_MISSING = object()
+
+IdentityKey = Tuple[str, str, Hashable]
+
+
+class UnitOfWork:
+    """
+    Identity map for one conversational turn.
+
+    Every entity fetched through `identity_load` is memoized by
+    (model label, lookup name, key), so later steps of the same turn get the
+    same instance back without a query. Saving or deleting a row during the
+    turn evicts every entry for its model (see the signals below).
+    """
+
+    def __init__(self):
+        self._identity: Dict[IdentityKey, Any] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, key: IdentityKey, default: Any = None) -> Any:
+        with self._lock:
+            return self._identity.get(key, default)
+
+    def put(self, key: IdentityKey, value: Any) -> None:
+        with self._lock:
+            self._identity[key] = value
+            if isinstance(value, Model) and value.pk is not None:
+                self._identity.setdefault((value._meta.label, "pk", value.pk), value)
+
+    def load(self, key: IdentityKey, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._identity.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+        value = loader()
+        with self._lock:
+            self.loads += 1
+        self.put(key, value)
+        return value
+
+    def evict(self, key: IdentityKey) -> None:
+        with self._lock:
+            self._identity.pop(key, None)
+
+    def evict_model(self, label: str) -> None:
+        """
+        Drop every entry for a model. A saved row can change the answer of any
+        lookup on it, including remembered misses (None) and "latest by FK"
+        reads that held a different row, so per-instance eviction is not enough.
+        """
+        with self._lock:
+            for k in [k for k in self._identity if k[0] == label]:
+                del self._identity[k]
+
+    def evict_instance(self, instance: Model) -> None:
+        self.evict_model(instance._meta.label)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"entities": len(self._identity), "hits": self.hits, "loads": self.loads}
+
+
+_current: ContextVar[Optional[UnitOfWork]] = ContextVar("omniflow_unit_of_work", default=None)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _current.get()
+
+
+@contextmanager
+def unit_of_work() -> Iterator[UnitOfWork]:
+    """
+    Open an identity map for the current turn, or join the one already open
+    (the gateway opens it before the supervisor graph runs).
+    """
+    existing = _current.get()
+    if existing is not None:
+        yield existing
+        return
+    uow = UnitOfWork()
+    token = _current.set(uow)
+    try:
+        yield uow
+    finally:
+        _current.reset(token)
+
+
+def identity_key(model: Type[Model], lookup: str, key: Hashable) -> IdentityKey:
+    return (model._meta.label, lookup, key)
+
+
+def identity_load(model: Type[Model], lookup: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    """`loader()` memoized in the current unit of work (called directly when none is open)."""
+    uow = _current.get()
+    if uow is None:
+        return loader()
+    return uow.load(identity_key(model, lookup, key), loader)
+
+
+def identity_put(model: Type[Model], lookup: str, key: Hashable, value: Any) -> None:
+    uow = _current.get()
+    if uow is not None:
+        uow.put(identity_key(model, lookup, key), value)
+
+
+def identity_evict(model: Type[Model], lookup: str, key: Hashable) -> None:
+    uow = _current.get()
+    if uow is not None:
+        uow.evict(identity_key(model, lookup, key))
+
+
+def _evict_saved_instance(sender, instance, **_):
+    uow = _current.get()
+    if uow is not None and isinstance(instance, Model):
+        uow.evict_instance(instance)
+
+
+post_save.connect(_evict_saved_instance, weak=False, dispatch_uid="identity_map:save")
+post_delete.connect(_evict_saved_instance, weak=False, dispatch_uid="identity_map:delete")
@@ -0,0 +1,96 @@
+# core/cache/shared.py
+import pickle
+import threading
+import time
+from typing import Any, Optional
+
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+MISSING = object()  # returned by SharedTier.get on a miss
+
+
+class SharedTier:
+    """
+    Optional Redis tier behind the per-process entity caches.
+
+    Values are pickled under `<prefix><cache name>:<key>`. Redis being slow or
+    down must never fail a lookup: errors count as misses and the tier backs
+    off for `retry_after` seconds before trying again.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "omniflow:entity:", retry_after: float = 30.0):
+        import redis  # optional: only needed when ENTITY_CACHE_REDIS_URL is set
+
+        self.ttl = max(1, int(ttl))
+        self.prefix = prefix
+        self.retry_after = retry_after
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._down_until = 0.0
+
+    def _key(self, name: str, key: Any) -> str:
+        return f"{self.prefix}{name}:{key}"
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, op: str, e: Exception) -> None:
+        if self._available():
+            logger.warning(f"Shared entity cache {op} failed, bypassing Redis for {self.retry_after:.0f}s: {e}")
+        self._down_until = time.monotonic() + self.retry_after
+
+    def get(self, name: str, key: Any) -> Any:
+        if not self._available():
+            return MISSING
+        try:
+            raw = self._client.get(self._key(name, key))
+        except Exception as e:
+            self._failed("get", e)
+            return MISSING
+        if raw is None:
+            return MISSING
+        try:
+            return pickle.loads(raw)
+        except Exception:
+            return MISSING
+
+    def set(self, name: str, key: Any, value: Any) -> None:
+        if not self._available():
+            return
+        try:
+            self._client.set(self._key(name, key), pickle.dumps(value), ex=self.ttl)
+        except Exception as e:
+            self._failed("set", e)
+
+    def delete(self, name: str, key: Any) -> None:
+        if not self._available():
+            return
+        try:
+            self._client.delete(self._key(name, key))
+        except Exception as e:
+            self._failed("delete", e)
+
+
+_shared: Optional[SharedTier] = None
+_shared_lock = threading.Lock()
+_shared_initialized = False
+
+
+def get_shared_tier() -> Optional[SharedTier]:
+    """The process-wide Redis tier, or None when ENTITY_CACHE_REDIS_URL is unset."""
+    global _shared, _shared_initialized
+    if _shared_initialized:
+        return _shared
+    with _shared_lock:
+        if not _shared_initialized:
+            url = (settings.ENTITY_CACHE_REDIS_URL or "").strip()
+            if url:
+                try:
+                    _shared = SharedTier(url, ttl=settings.ENTITY_CACHE_SHARED_TTL)
+                except Exception as e:
+                    logger.warning(f"Shared entity cache disabled: {e}")
+                    _shared = None
+            _shared_initialized = True
+    return _shared
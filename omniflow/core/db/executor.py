@@ -0,0 +1,150 @@
+# core/db/executor.py
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, TypeVar
+
+from django.db import connections
+
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def _parse_sizes(spec: str) -> Dict[str, int]:
+    sizes = {}
+    for part in (spec or "").split(","):
+        alias, _, n = part.partition("=")
+        if alias.strip() and n.strip():
+            try:
+                sizes[alias.strip()] = max(1, int(n))
+            except ValueError:
+                logger.warning(f"Ignoring DB_EXECUTOR_SIZES entry {part!r}")
+    return sizes
+
+
+class AliasExecutor:
+    """
+    Bounded thread pool dedicated to one database alias.
+
+    Django keeps one connection per thread per alias, so pinning an alias
+    to its own threads gives every worker a long-lived connection to that
+    database only, and a slow query on one domain cannot queue work for
+    the others behind asgiref's single thread-sensitive thread.
+    """
+
+    def __init__(self, alias: str, workers: int):
+        self.alias = alias
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=f"db-{alias}",
+        )
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.inflight = 0
+        self.wait_s = 0.0
+        self.busy_s = 0.0
+
+    def _run(self, fn: Callable[..., T], queued_at: float) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self.wait_s += started - queued_at
+        try:
+            return fn()
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.busy_s += time.perf_counter() - started
+                self.completed += 1
+                self.inflight -= 1
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        # Carry contextvars (the turn's unit of work, request ids) into the worker.
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        with self._lock:
+            self.submitted += 1
+            self.inflight += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._run, call, time.perf_counter())
+
+    def shutdown(self) -> None:
+        # Connections are thread-local, so each worker has to close its own;
+        # the barrier makes every thread take exactly one close task.
+        barrier = threading.Barrier(self.workers)
+
+        def close_connection():
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            connections.close_all()
+
+        futures = [self._pool.submit(close_connection) for _ in range(self.workers)]
+        for f in futures:
+            try:
+                f.result(timeout=10)
+            except Exception:
+                pass
+        self._pool.shutdown(wait=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "inflight": self.inflight,
+                "avg_wait_ms": round(self.wait_s / self.completed * 1000, 3) if self.completed else 0.0,
+                "avg_busy_ms": round(self.busy_s / self.completed * 1000, 3) if self.completed else 0.0,
+            }
+
+
+_executors: Dict[str, AliasExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(alias: str) -> AliasExecutor:
+    executor = _executors.get(alias)
+    if executor is not None:
+        return executor
+    with _executors_lock:
+        executor = _executors.get(alias)
+        if executor is None:
+            workers = _parse_sizes(settings.DB_EXECUTOR_SIZES).get(alias, settings.DB_EXECUTOR_WORKERS)
+            executor = _executors[alias] = AliasExecutor(alias, workers)
+        return executor
+
+
+async def run_db(alias: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run sync ORM code for database `alias` on that alias's executor.
+
+    `fn` may read other aliases too (the connections are thread-local), but
+    should do its writes on `alias` so transactions stay on one thread.
+    """
+    return await get_executor(alias).run(fn, *args, **kwargs)
+
+
+def db_executor_stats() -> Dict[str, dict]:
+    return {alias: executor.snapshot() for alias, executor in _executors.items()}
+
+
+def shutdown_db_executors() -> None:
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown()
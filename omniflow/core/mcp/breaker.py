@@ -0,0 +1,127 @@
+# core/mcp/breaker.py
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures. While open,
+    calls are rejected without touching the server; after `reset_timeout`
+    seconds a single probe is let through (half-open) and its outcome decides
+    whether the circuit closes again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Forget a half-open probe that ended without an outcome (e.g. it was
+        cancelled), so the next call probes again instead of being rejected."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def retry_after(self) -> Optional[float]:
+        with self._lock:
+            if self._state != self.OPEN:
+                return None
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+
+class ServerStats:
+    """Per-server call counters and a rolling latency window."""
+
+    def __init__(self, window: int = 512):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.short_circuited = 0
+        self.connects = 0
+        self.connect_failures = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_call(self, latency_s: float, ok: bool, timed_out: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(latency_s)
+            if not ok:
+                self.errors += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def record_short_circuit(self) -> None:
+        with self._lock:
+            self.short_circuited += 1
+
+    def record_connect(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.connects += 1
+            else:
+                self.connect_failures += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+            def pct(p: float) -> Optional[float]:
+                if not latencies:
+                    return None
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "short_circuited": self.short_circuited,
+                "connects": self.connects,
+                "connect_failures": self.connect_failures,
+                "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            }
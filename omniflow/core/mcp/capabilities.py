@@ -0,0 +1,79 @@
+# core/mcp/capabilities.py
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class CapabilityCache:
+    """
+    What each MCP server can do, as last observed.
+
+    Positive entries come from `list_tools`; negative ones from failed
+    connects or unknown-tool errors. Every entry expires after `ttl` seconds,
+    after which the next call re-probes the server.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = float(ttl)
+        # server -> (expires_at, available, tool names or None if unknown)
+        self._servers: Dict[str, Tuple[float, bool, Optional[frozenset]]] = {}
+        self._missing_tools: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def record_tools(self, server_name: str, tool_names: Iterable[str]) -> None:
+        with self._lock:
+            self._servers[server_name] = (time.monotonic() + self.ttl, True, frozenset(tool_names))
+            self._missing_tools = {k: v for k, v in self._missing_tools.items() if k[0] != server_name}
+
+    def record_server_down(self, server_name: str) -> None:
+        with self._lock:
+            self._servers[server_name] = (time.monotonic() + self.ttl, False, None)
+
+    def record_tool_missing(self, server_name: str, tool_name: str) -> None:
+        with self._lock:
+            self._missing_tools[(server_name, tool_name)] = time.monotonic() + self.ttl
+
+    def is_fresh(self, server_name: str) -> bool:
+        with self._lock:
+            entry = self._servers.get(server_name)
+            return bool(entry and entry[0] > time.monotonic() and entry[1])
+
+    def supports(self, server_name: str, tool_name: str) -> Optional[bool]:
+        """True/False when known, None when the server should be (re-)probed."""
+        now = time.monotonic()
+        with self._lock:
+            missing_until = self._missing_tools.get((server_name, tool_name))
+            if missing_until is not None:
+                if missing_until > now:
+                    return False
+                del self._missing_tools[(server_name, tool_name)]
+
+            entry = self._servers.get(server_name)
+            if entry is None:
+                return None
+            expires_at, available, tools = entry
+            if expires_at <= now:
+                del self._servers[server_name]
+                return None
+            if not available:
+                return False
+            if tools is None:
+                return None
+            return tool_name in tools
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "available": available,
+                    "tools": sorted(tools) if tools is not None else None,
+                    "expires_in": round(max(0.0, expires_at - now), 1),
+                }
+                for name, (expires_at, available, tools) in self._servers.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._servers.clear()
+            self._missing_tools.clear()
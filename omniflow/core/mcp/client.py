@@ -0,0 +1,634 @@
+# core/mcp/client.py
+import asyncio
+import atexit
+import concurrent.futures
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters, stdio_client
+
+try:
+    from mcp import MCPError as McpError
+except ImportError:  # mcp < 2
+    from mcp.shared.exceptions import McpError
+
+from omniflow.core.mcp.breaker import CircuitBreaker, ServerStats
+from omniflow.core.mcp.capabilities import CapabilityCache
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class MCPUnavailableError(ValueError):
+    """The server is not registered, not reachable or open-circuited; use the DB fallback."""
+
+
+class MCPToolError(RuntimeError):
+    """The server answered, but the tool reported an error."""
+
+
+def unwrap_tool_result(result: Any) -> Any:
+    """Structured content if the server sent it, else JSON/text content."""
+    if getattr(result, "is_error", getattr(result, "isError", False)):
+        raise MCPToolError(_result_text(result) or "MCP tool returned an error")
+
+    structured = getattr(result, "structured_content", getattr(result, "structuredContent", None))
+    if structured is not None:
+        return structured
+
+    text = _result_text(result)
+    if text is None:
+        return result
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _result_text(result: Any) -> Optional[str]:
+    parts = [c.text for c in getattr(result, "content", None) or [] if getattr(c, "text", None) is not None]
+    return "".join(parts) if parts else None
+
+
+class _PooledSession:
+    """
+    One stdio MCP session. The transport and session context managers are
+    entered and exited inside a single owner task, as anyio requires.
+    """
+
+    def __init__(self, params: StdioServerParameters):
+        self.params = params
+        self.session: Optional[ClientSession] = None
+        self.tools: List[Any] = []
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+        self.inflight = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float) -> "_PooledSession":
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise MCPUnavailableError(f"Timed out connecting to MCP server: {self.params.command}")
+        if self._error is not None or self.session is None:
+            raise MCPUnavailableError(f"Failed to start MCP server: {self._error}")
+        return self
+
+    async def _run(self) -> None:
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    try:
+                        self.tools = list((await session.list_tools()).tools)
+                    except Exception:
+                        self.tools = []
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            while isinstance(e, BaseExceptionGroup) and len(e.exceptions) == 1:
+                e = e.exceptions[0]
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), 5)
+        except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+            self._task.cancel()
+
+
+class _ServerPool:
+    """
+    Up to `size` sessions per server. MCP multiplexes requests by id, so a
+    session carries up to `max_inflight` concurrent calls; a call goes to an
+    idle session if there is one, otherwise it is pipelined onto the least
+    loaded session while another session is opened in the background.
+    """
+
+    def __init__(self, name: str, params: StdioServerParameters, size: int, max_inflight: int = 1):
+        self.name = name
+        self.params = params
+        self.size = max(1, size)
+        self.max_inflight = max(1, max_inflight)
+        self.sessions: List[_PooledSession] = []
+        self.connecting = 0
+        self.tools: List[Any] = []
+        self._cond = asyncio.Condition()
+        self._growing: set = set()
+
+    @property
+    def open_count(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def idle(self) -> List[_PooledSession]:
+        return [p for p in self.sessions if p.inflight == 0]
+
+    def _can_open(self) -> bool:
+        return len(self.sessions) + self.connecting < self.size
+
+    async def acquire(
+        self,
+        connect_timeout: float,
+        stats: ServerStats,
+        prefer_new: bool = False,
+    ) -> _PooledSession:
+        async with self._cond:
+            while True:
+                self.sessions = [p for p in self.sessions if p.alive]
+                if not (prefer_new and self._can_open()):
+                    candidates = [p for p in self.sessions if p.inflight < self.max_inflight]
+                    if candidates:
+                        pooled = min(candidates, key=lambda p: p.inflight)
+                        if pooled.inflight and self._can_open():
+                            self._grow_in_background(connect_timeout, stats)
+                        pooled.inflight += 1
+                        return pooled
+                if self._can_open():
+                    self.connecting += 1
+                    break
+                await self._cond.wait()
+
+        pooled = await self._open(connect_timeout, stats)
+        pooled.inflight = 1
+        return pooled
+
+    async def _open(self, connect_timeout: float, stats: ServerStats) -> _PooledSession:
+        try:
+            pooled = await _PooledSession(self.params).start(connect_timeout)
+        except BaseException:
+            stats.record_connect(ok=False)
+            async with self._cond:
+                self.connecting -= 1
+                self._cond.notify_all()
+            raise
+
+        stats.record_connect(ok=True)
+        if pooled.tools:
+            self.tools = pooled.tools
+        async with self._cond:
+            self.connecting -= 1
+            self.sessions.append(pooled)
+            self._cond.notify_all()
+        logger.info(f"Opened MCP session to {self.name} ({self.open_count}/{self.size})")
+        return pooled
+
+    def _grow_in_background(self, connect_timeout: float, stats: ServerStats) -> None:
+        self.connecting += 1
+
+        async def grow():
+            try:
+                await self._open(connect_timeout, stats)
+            except Exception:
+                pass
+
+        task = asyncio.create_task(grow())
+        self._growing.add(task)
+        task.add_done_callback(self._growing.discard)
+
+    async def release(self, pooled: _PooledSession, broken: bool = False) -> None:
+        pooled.inflight -= 1
+        if broken or not pooled.alive:
+            async with self._cond:
+                if pooled in self.sessions:
+                    self.sessions.remove(pooled)
+                self._cond.notify_all()
+            await pooled.close()
+            return
+        async with self._cond:
+            self._cond.notify_all()
+
+    async def discard_idle(self, pooled: _PooledSession) -> None:
+        async with self._cond:
+            if pooled.inflight or pooled not in self.sessions:
+                return
+            self.sessions.remove(pooled)
+            self._cond.notify_all()
+        await pooled.close()
+
+    async def close(self) -> None:
+        async with self._cond:
+            sessions, self.sessions = self.sessions, []
+        for pooled in sessions:
+            await pooled.close()
+
+
+class MCPClientManager:
+    """
+    Pooled MCP client.
+
+    Sessions live on a dedicated event loop thread so they survive across
+    requests (the HTTP gateway runs each request in its own `asyncio.run`).
+    Servers are registered with `connect_to_server` and connected lazily on
+    first use. A per-server circuit breaker makes calls to a failing server
+    raise `MCPUnavailableError` immediately, so agent tools go straight to
+    their DB fallback; a background pinger checks idle sessions and probes
+    open circuits.
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        call_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        ping_interval: Optional[float] = None,
+        session_max_inflight: Optional[int] = None,
+    ):
+        self.pool_size = pool_size or settings.MCP_POOL_SIZE
+        self.call_timeout = call_timeout or settings.MCP_CALL_TIMEOUT
+        self.connect_timeout = connect_timeout or settings.MCP_CONNECT_TIMEOUT
+        self.ping_interval = ping_interval if ping_interval is not None else settings.MCP_PING_INTERVAL
+        self.session_max_inflight = session_max_inflight or settings.MCP_SESSION_MAX_INFLIGHT
+
+        self._servers: Dict[str, StdioServerParameters] = {}
+        self._pools: Dict[str, _ServerPool] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._stats: Dict[str, ServerStats] = {}
+        self.capabilities = CapabilityCache(ttl=settings.MCP_CAPABILITY_TTL)
+        self._discovery: Optional[concurrent.futures.Future] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pinger: Optional[asyncio.Future] = None
+        self._lock = threading.Lock()
+
+    # ---------------- registration ----------------
+
+    async def connect_to_server(self, server_name: str, command: list, env: Optional[dict] = None) -> bool:
+        """Register an MCP server (stdio command). The connection is opened lazily."""
+        self.register_server(server_name, command, env=env)
+        return True
+
+    def register_server(self, server_name: str, command: list, env: Optional[dict] = None) -> None:
+        with self._lock:
+            self._servers[server_name] = StdioServerParameters(command=command[0], args=list(command[1:]), env=env)
+            self._breakers.setdefault(server_name, CircuitBreaker(
+                failure_threshold=settings.MCP_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.MCP_BREAKER_RESET_TIMEOUT,
+            ))
+            self._stats.setdefault(server_name, ServerStats())
+
+    def is_registered(self, server_name: str) -> bool:
+        return server_name in self._servers
+
+    def get_tools_for_server(self, server_name: str) -> list:
+        """Get available tools for a specific server"""
+        pool = self._pools.get(server_name)
+        return list(pool.tools) if pool else []
+
+    # ---------------- calls ----------------
+
+    def supports(self, server_name: str, tool_name: str) -> bool:
+        """
+        Cheap, synchronous check used by agent tools before trying MCP.
+
+        False when the server is not registered, its circuit is open, or it
+        is known (within the capability TTL) to be down or to lack the tool.
+        Unknown or expired entries return True so the next call re-probes.
+        """
+        if server_name not in self._servers:
+            return False
+        if self._breakers[server_name].state == CircuitBreaker.OPEN:
+            return False
+        return self.capabilities.supports(server_name, tool_name) is not False
+
+    def _precheck(self, server_name: str, tool_name: str) -> Optional[MCPUnavailableError]:
+        if server_name not in self._servers:
+            return MCPUnavailableError(f"No MCP server registered: {server_name}")
+        if self.capabilities.supports(server_name, tool_name) is False:
+            return MCPUnavailableError(f"MCP tool {server_name}.{tool_name} is unavailable")
+        if not self._breakers[server_name].allow():
+            self._stats[server_name].record_short_circuit()
+            return MCPUnavailableError(f"MCP server {server_name} is open-circuited")
+        return None
+
+    async def call_tool(self, server_name: str, tool_name: str, arguments: dict, timeout: Optional[float] = None) -> Any:
+        """Call a tool on an MCP server and return its (unwrapped) result."""
+        error = self._precheck(server_name, tool_name)
+        if error is not None:
+            raise error
+        try:
+            return await self._submit(self._call(server_name, tool_name, arguments, timeout or self.call_timeout))
+        except BaseException:
+            # Covers a cancelled caller and a call that never reached _call.
+            self._breakers[server_name].release_probe()
+            raise
+
+    async def call_tools_batch(
+        self,
+        calls: List[Tuple[str, str, dict]],
+        timeout: Optional[float] = None,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """
+        Run several `(server_name, tool_name, arguments)` calls concurrently
+        and return their results in the same order.
+
+        Each call gets its own timeout; calls to the same server are spread
+        over its pooled sessions and pipelined within a session. With
+        `return_exceptions` (the default) a failed call yields its exception
+        in place of a result, so callers can fall back per item.
+        """
+        timeout = timeout or self.call_timeout
+        results: List[Any] = [None] * len(calls)
+        pending = []
+
+        for i, (server_name, tool_name, arguments) in enumerate(calls):
+            error = self._precheck(server_name, tool_name)
+            if error is not None:
+                results[i] = error
+            else:
+                pending.append((i, server_name, tool_name, arguments))
+
+        if pending:
+            async def run_all():
+                return await asyncio.gather(
+                    *[self._call(server, tool, args, timeout) for _, server, tool, args in pending],
+                    return_exceptions=True,
+                )
+
+            # One hop to the MCP loop for the whole batch.
+            try:
+                outcomes = await self._submit(run_all())
+            except BaseException:
+                for server_name in {server for _, server, _, _ in pending}:
+                    self._breakers[server_name].release_probe()
+                raise
+            for (i, *_), outcome in zip(pending, outcomes):
+                results[i] = outcome
+
+        if not return_exceptions:
+            for outcome in results:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+        return results
+
+    async def _call(self, server_name: str, tool_name: str, arguments: dict, timeout: float) -> Any:
+        pool = self._get_pool(server_name)
+        breaker = self._breakers[server_name]
+        stats = self._stats[server_name]
+
+        try:
+            pooled = await pool.acquire(self.connect_timeout, stats)
+        except Exception:
+            breaker.record_failure()
+            self.capabilities.record_server_down(server_name)
+            raise
+        except BaseException:
+            # Cancelled: no verdict on the server, but don't leave a half-open probe claimed.
+            breaker.release_probe()
+            raise
+        if pool.tools and not self.capabilities.is_fresh(server_name):
+            self.capabilities.record_tools(server_name, [t.name for t in pool.tools])
+
+        started = time.perf_counter()
+        broken = False
+        try:
+            result = await asyncio.wait_for(pooled.session.call_tool(tool_name, arguments), timeout)
+        except asyncio.TimeoutError:
+            # The session may still be carrying other pipelined calls; a hung
+            # server is caught by the pinger rather than by tearing it down here.
+            breaker.record_failure()
+            stats.record_call(time.perf_counter() - started, ok=False, timed_out=True)
+            raise MCPUnavailableError(f"MCP call {server_name}.{tool_name} timed out after {timeout}s")
+        except McpError as e:
+            # The server answered with a protocol error (e.g. unknown tool).
+            breaker.record_success()
+            stats.record_call(time.perf_counter() - started, ok=False)
+            self._note_tool_error(server_name, tool_name, str(e))
+            raise MCPToolError(f"MCP call {server_name}.{tool_name} failed: {e}") from e
+        except Exception as e:
+            broken = True
+            breaker.record_failure()
+            stats.record_call(time.perf_counter() - started, ok=False)
+            logger.warning(f"MCP call {server_name}.{tool_name} failed: {e}")
+            raise MCPUnavailableError(f"MCP call {server_name}.{tool_name} failed: {e}") from e
+        except BaseException:
+            breaker.release_probe()
+            raise
+        finally:
+            await pool.release(pooled, broken=broken)
+
+        breaker.record_success()
+        try:
+            value = unwrap_tool_result(result)
+        except MCPToolError as e:
+            stats.record_call(time.perf_counter() - started, ok=False)
+            self._note_tool_error(server_name, tool_name, str(e))
+            raise
+        stats.record_call(time.perf_counter() - started, ok=True)
+        return value
+
+    def _note_tool_error(self, server_name: str, tool_name: str, message: str) -> None:
+        lowered = message.lower()
+        if "unknown tool" in lowered or (tool_name in message and "not found" in lowered):
+            self.capabilities.record_tool_missing(server_name, tool_name)
+
+    async def discover(self) -> Dict[str, dict]:
+        """
+        Connect to every registered server once and fill the capability cache
+        from `list_tools`, so tools dispatch to the right backend from the
+        first request on.
+        """
+        for server_name, outcome in zip(
+            list(self._servers),
+            await asyncio.gather(*[self.warm_up(name, 1) for name in list(self._servers)], return_exceptions=True),
+        ):
+            if isinstance(outcome, Exception):
+                logger.warning(f"MCP discovery: {server_name} unavailable ({outcome})")
+                self.capabilities.record_server_down(server_name)
+            elif self.get_tools_for_server(server_name):
+                self.capabilities.record_tools(server_name, [t.name for t in self.get_tools_for_server(server_name)])
+        return self.capabilities.snapshot()
+
+    def start_discovery(self) -> Optional[concurrent.futures.Future]:
+        """
+        Schedule `discover()` on the client loop without waiting for it.
+
+        Called once at startup; later calls (and concurrent first requests)
+        get the same future back, so discovery only ever runs once.
+        """
+        if not self._servers:
+            return None
+        loop = self._ensure_loop()
+        with self._lock:
+            if self._discovery is None:
+                self._discovery = asyncio.run_coroutine_threadsafe(self.discover(), loop)
+            return self._discovery
+
+    async def ensure_discovered(self) -> None:
+        """Wait for the shared discovery run, starting it if nothing has yet."""
+        discovery = self.start_discovery()
+        if discovery is not None:
+            await asyncio.wrap_future(discovery)
+
+    async def warm_up(self, server_name: str, sessions: Optional[int] = None) -> int:
+        """Open up to `sessions` (default: pool size) sessions ahead of traffic."""
+        return await self._submit(self._warm_up(server_name, sessions or self.pool_size))
+
+    async def _warm_up(self, server_name: str, sessions: int) -> int:
+        pool = self._get_pool(server_name)
+        leased = []
+        try:
+            for _ in range(min(sessions, pool.size)):
+                leased.append(await pool.acquire(self.connect_timeout, self._stats[server_name], prefer_new=True))
+        finally:
+            for pooled in leased:
+                await pool.release(pooled)
+        return len(leased)
+
+    # ---------------- health ----------------
+
+    async def _ping_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            for server_name in list(self._servers):
+                try:
+                    await self._check_server(server_name)
+                except Exception:
+                    logger.warning(f"MCP health check for {server_name} failed", exc_info=True)
+
+    async def _check_server(self, server_name: str) -> None:
+        breaker = self._breakers[server_name]
+        pool = self._get_pool(server_name)
+
+        if breaker.state != CircuitBreaker.CLOSED:
+            # Probe an open circuit with a fresh connection instead of waiting
+            # for a user request to pay for it.
+            if breaker.allow():
+                pooled = None
+                try:
+                    pooled = await pool.acquire(self.connect_timeout, self._stats[server_name])
+                    await asyncio.wait_for(pooled.session.send_ping(), self.call_timeout)
+                except Exception:
+                    breaker.record_failure()
+                    if pooled is not None:
+                        await pool.release(pooled, broken=True)
+                    return
+                except BaseException:
+                    breaker.release_probe()
+                    if pooled is not None:
+                        await pool.release(pooled, broken=True)
+                    raise
+                breaker.record_success()
+                if pool.tools:
+                    self.capabilities.record_tools(server_name, [t.name for t in pool.tools])
+                await pool.release(pooled)
+                logger.info(f"MCP server {server_name} recovered; circuit closed")
+            return
+
+        for pooled in list(pool.idle):
+            try:
+                await asyncio.wait_for(pooled.session.send_ping(), self.call_timeout)
+            except Exception:
+                breaker.record_failure()
+                await pool.discard_idle(pooled)
+
+    def stats(self) -> Dict[str, dict]:
+        out = {}
+        capabilities = self.capabilities.snapshot()
+        for server_name in list(self._servers):
+            pool = self._pools.get(server_name)
+            out[server_name] = {
+                **self._stats[server_name].snapshot(),
+                "circuit": self._breakers[server_name].state,
+                "open_sessions": pool.open_count if pool else 0,
+                "idle_sessions": len(pool.idle) if pool else 0,
+                "inflight": sum(p.inflight for p in pool.sessions) if pool else 0,
+                "capabilities": capabilities.get(server_name),
+            }
+        return out
+
+    # ---------------- event loop ----------------
+
+    def _get_pool(self, server_name: str) -> _ServerPool:
+        pool = self._pools.get(server_name)
+        if pool is None:
+            pool = _ServerPool(server_name, self._servers[server_name], self.pool_size, self.session_max_inflight)
+            self._pools[server_name] = pool
+        return pool
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="mcp-client", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._pools = {}
+            if self.ping_interval and self.ping_interval > 0:
+                self._pinger = asyncio.run_coroutine_threadsafe(self._ping_forever(), loop)
+            return loop
+
+    async def _submit(self, coro) -> Any:
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    async def _close_all(self) -> None:
+        if self._pinger is not None:
+            self._pinger.cancel()
+        for pool in list(self._pools.values()):
+            await pool.close()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Close all sessions (terminating the server subprocesses) and stop the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None or not thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_all(), loop).result(timeout)
+        except Exception:
+            logger.warning("MCP client shutdown did not complete cleanly", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+
+def _shutdown_managers() -> None:
+    for manager in list(_MANAGERS):
+        manager.shutdown()
+
+
+_MANAGERS: List[MCPClientManager] = []
+atexit.register(_shutdown_managers)
+
+
+def create_manager(**kwargs) -> MCPClientManager:
+    manager = MCPClientManager(**kwargs)
+    _MANAGERS.append(manager)
+    return manager
@@ -0,0 +1,153 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from omniflow.core.mcp.breaker import CircuitBreaker
+from omniflow.core.mcp.client import MCPClientManager, MCPUnavailableError
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("omniflow.core.mcp.breaker.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    def trip(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_after(), 30)
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.trip()
+        self.now += 30
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+    def test_probe_success_closes(self):
+        self.trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_probe_failure_reopens(self):
+        self.trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_released_probe_can_be_retried(self):
+        self.trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release_probe()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+
+class _HangingPool:
+    async def acquire(self, timeout, stats, prefer_new=False):
+        await asyncio.sleep(3600)
+
+
+class _FailingPool:
+    async def acquire(self, timeout, stats, prefer_new=False):
+        raise ConnectionError("server gone")
+
+
+class ProbeCancellationTests(SimpleTestCase):
+    def setUp(self):
+        self.manager = MCPClientManager(ping_interval=0)
+        self.addCleanup(self.manager.shutdown)
+        self.manager.register_server("fake", ["true"])
+        self.breaker = self.manager._breakers["fake"]
+        self.breaker.reset_timeout = 0
+        for _ in range(self.breaker.failure_threshold):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+
+    def test_cancelled_probe_does_not_wedge_the_circuit(self):
+        self.manager._get_pool = lambda name: _HangingPool()
+
+        async def scenario():
+            task = asyncio.create_task(self.manager.call_tool("fake", "tool", {}))
+            await asyncio.sleep(0.05)
+            self.assertFalse(self.breaker.allow())  # the probe is in flight
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+    def test_cancelled_batch_probe_does_not_wedge_the_circuit(self):
+        self.manager._get_pool = lambda name: _HangingPool()
+
+        async def scenario():
+            task = asyncio.create_task(self.manager.call_tools_batch([("fake", "tool", {})]))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        self.manager._get_pool = lambda name: _FailingPool()
+        self.breaker.reset_timeout = 30
+        with self.assertRaises(ConnectionError):
+            asyncio.run(self.manager.call_tool("fake", "tool", {}))
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(MCPUnavailableError):
+            asyncio.run(self.manager.call_tool("fake", "tool", {}))
+
+
+class DiscoveryTests(SimpleTestCase):
+    def setUp(self):
+        self.manager = MCPClientManager(ping_interval=0)
+        self.addCleanup(self.manager.shutdown)
+        self.manager.register_server("fake", ["true"])
+        self.warm_ups = 0
+
+        async def slow_warm_up(server_name, sessions=None):
+            self.warm_ups += 1
+            await asyncio.sleep(0.05)
+            raise ConnectionError("server is down")
+
+        self.manager.warm_up = slow_warm_up
+
+    def test_concurrent_callers_share_one_discovery(self):
+        self.manager.start_discovery()
+
+        async def first_requests():
+            await asyncio.gather(*[self.manager.ensure_discovered() for _ in range(5)])
+
+        asyncio.run(first_requests())
+        asyncio.run(self.manager.ensure_discovered())
+        self.assertEqual(self.warm_ups, 1)
+        self.assertIs(self.manager.capabilities.supports("fake", "tool"), False)
+
+    def test_nothing_to_discover_without_servers(self):
+        self.assertIsNone(MCPClientManager(ping_interval=0).start_discovery())
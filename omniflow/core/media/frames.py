@@ -0,0 +1,138 @@
+# core/media/frames.py
+import asyncio
+import base64
+import io
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from PIL import Image
+
+from omniflow.core.media.phash import dhash, hamming_distance
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DATA_URL_PREFIX = re.compile(r"^data:[^;,]*;base64,", re.I)
+
+# Decoding is the expensive step, so very long frame lists are thinned evenly
+# before anything is decoded. Dedupe then works on this oversampled subset.
+OVERSAMPLE_FACTOR = 4
+
+OUTPUT_MIME = {
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+}
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+
+
+def _evenly_spaced(items: list, limit: int) -> list:
+    if limit <= 0 or len(items) <= limit:
+        return list(items)
+    if limit == 1:
+        return [items[0]]
+    step = (len(items) - 1) / (limit - 1)
+    return [items[round(i * step)] for i in range(limit)]
+
+
+def decode_frame(data: str) -> Optional[Image.Image]:
+    if not isinstance(data, str) or not data:
+        return None
+    try:
+        raw = base64.b64decode(DATA_URL_PREFIX.sub("", data.strip()))
+        image = Image.open(io.BytesIO(raw))
+        image.load()
+        return image
+    except Exception:
+        return None
+
+
+def encode_frame(image: Image.Image, fmt: str, quality: int) -> str:
+    fmt = fmt.upper() if fmt.upper() in OUTPUT_MIME else "JPEG"
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    buf = io.BytesIO()
+    image.save(buf, format=fmt, quality=quality)
+    b64 = base64.b64encode(buf.getvalue()).decode("ascii")
+    return f"data:{OUTPUT_MIME[fmt]};base64,{b64}"
+
+
+def ingest_frames(
+    frames: List[str],
+    max_frames: int,
+    max_side: int,
+    fmt: str,
+    quality: int,
+    duplicate_distance: int,
+) -> List[str]:
+    """
+    Decode, de-duplicate, cap, downscale and re-encode return-proof frames.
+
+    Frames whose perceptual hash is within `duplicate_distance` bits of an
+    already kept frame are dropped; the survivors are sampled evenly down to
+    `max_frames` so the kept set still spans the whole clip.
+    """
+    candidates = _evenly_spaced(list(frames or []), max_frames * OVERSAMPLE_FACTOR)
+
+    kept: List[Image.Image] = []
+    kept_hashes: List[int] = []
+    for data in candidates:
+        image = decode_frame(data)
+        if image is None:
+            continue
+
+        h = dhash(image)
+        if any(hamming_distance(h, other) <= duplicate_distance for other in kept_hashes):
+            continue
+
+        kept.append(image)
+        kept_hashes.append(h)
+
+    out: List[str] = []
+    for image in _evenly_spaced(kept, max_frames):
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        out.append(encode_frame(image, fmt, quality))
+    return out
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ProcessPoolExecutor(
+            max_workers=settings.MEDIA_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _EXECUTOR
+
+
+async def aingest_frames(frames: List[str]) -> List[str]:
+    """Run `ingest_frames` off the event loop using the configured limits."""
+    global _EXECUTOR
+
+    args = (
+        frames,
+        settings.RETURN_FRAMES_MAX_COUNT,
+        settings.RETURN_FRAMES_MAX_SIDE,
+        settings.RETURN_FRAMES_FORMAT,
+        settings.RETURN_FRAMES_QUALITY,
+        settings.RETURN_FRAMES_DUPLICATE_DISTANCE,
+    )
+
+    if settings.MEDIA_PROCESS_WORKERS <= 0:
+        out = await asyncio.to_thread(ingest_frames, *args)
+    else:
+        loop = asyncio.get_running_loop()
+        try:
+            out = await loop.run_in_executor(_get_executor(), ingest_frames, *args)
+        except BrokenProcessPool:
+            logger.warning("Frame ingest pool broke; processing in a thread instead", exc_info=True)
+            _EXECUTOR = None
+            out = await asyncio.to_thread(ingest_frames, *args)
+
+    logger.info(f"Return frames ingested: received={len(frames or [])} kept={len(out)}")
+    return out
@@ -0,0 +1,119 @@
+# core/media/storage.py
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterable, Optional
+
+from django.conf import settings
+
+
+class MediaTooLarge(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    sha256: str
+    size_bytes: int
+    storage_path: str
+    # False when an identical blob was already stored.
+    created: bool = False
+
+
+class BlobWriter:
+    """
+    Push-style upload into a ReturnMediaStore: `write()` each chunk as it
+    arrives, then `finish()` to move it into place (or `abort()`).
+    """
+
+    def __init__(self, store: "ReturnMediaStore", max_bytes: int):
+        self._store = store
+        self._max_bytes = max_bytes
+        self._hasher = hashlib.sha256()
+        self.size = 0
+        tmp_dir = store.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self._out = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.size > self._max_bytes:
+            raise MediaTooLarge(f"Upload exceeds {self._max_bytes} bytes")
+        self._hasher.update(chunk)
+        self._out.write(chunk)
+
+    def finish(self) -> StoredBlob:
+        try:
+            self._out.close()
+            sha256 = self._hasher.hexdigest()
+            final_path = self._store._path_for(sha256)
+            created = not final_path.exists()
+            if not created:
+                os.unlink(self._tmp_path)
+            else:
+                final_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self._tmp_path, final_path)
+        except BaseException:
+            self.abort()
+            raise
+        return StoredBlob(
+            sha256=sha256,
+            size_bytes=self.size,
+            storage_path=str(final_path.relative_to(self._store.root)),
+            created=created,
+        )
+
+    def abort(self) -> None:
+        self._out.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+class ReturnMediaStore:
+    """
+    Content-addressed blob store for return-proof media.
+
+    Uploads are written chunk by chunk to a temp file in the store while the
+    SHA-256 is computed incrementally, then atomically moved to
+    <root>/<aa>/<bb>/<sha256>. Identical uploads share one file on disk.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = Path(root) if root else None
+
+    @property
+    def root(self) -> Path:
+        return self._root or Path(settings.MEDIA_ROOT) / "return_media"
+
+    def _path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def writer(self, max_bytes: int) -> BlobWriter:
+        return BlobWriter(self, max_bytes)
+
+    def save_stream(self, chunks: Iterable[bytes], max_bytes: int) -> StoredBlob:
+        writer = self.writer(max_bytes)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.finish()
+
+    def delete(self, storage_path: str) -> None:
+        (self.root / storage_path).unlink(missing_ok=True)
+
+    def open(self, storage_path: str) -> IO[bytes]:
+        return (self.root / storage_path).open("rb")
+
+    def read_bytes(self, storage_path: str) -> bytes:
+        return (self.root / storage_path).read_bytes()
+
+
+return_media_store = ReturnMediaStore()
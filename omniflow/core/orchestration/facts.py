@@ -0,0 +1,141 @@
+# core/orchestration/facts.py
+"""
+FACTS_JSON for the response synthesizer, kept small.
+
+Handlers collect facts as plain dicts; before they go into the prompt they
+are compacted: nulls are stripped, fields the intent's answer never uses
+are dropped, and the JSON is written without whitespace. If the result is
+still over the intent's token budget, the longest lists are shortened to
+their first and last items with a `<name>_total` count beside them, until
+it fits or every list is down to one item. Scalars are never dropped, so
+the budget is a target rather than a hard cap.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # optional: token counts fall back to an estimate
+    tiktoken = None
+
+# Surrogate keys the customer never sees; tracking/order numbers stay.
+ALWAYS_DROP = {"warehouse_id", "shipment_id", "product_id"}
+
+INTENT_DROP: Dict[str, set] = {
+    "paid_amount": {"events", "current_location"},
+    "paid_amount_order": {"events", "current_location"},
+    "payguard": {"events", "current_location"},
+    "return_status": {"events"},
+    "return_request": {"events"},
+    "return_confirm": {"events"},
+    "return_cancel": {"events"},
+    "return_image": {"events"},
+}
+
+# Tokens of FACTS_JSON per intent; others use FACTS_TOKEN_BUDGET.
+TOKEN_BUDGETS: Dict[str, int] = {
+    "complex_query": 400,
+    "shipstream": 300,
+    "return_status": 200,
+    "return_request": 200,
+    "return_confirm": 200,
+    "return_image": 200,
+    "paid_amount": 150,
+    "paid_amount_order": 150,
+    "payguard": 150,
+}
+
+# Rough JSON characters per token when no tokenizer is available.
+_CHARS_PER_TOKEN = 3
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # the BPE file is downloaded on first use
+        logger.warning(f"tiktoken encoding unavailable, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def token_budget(intent: Optional[str]) -> int:
+    return TOKEN_BUDGETS.get(intent or "", settings.FACTS_TOKEN_BUDGET)
+
+
+def dumps(facts: Any) -> str:
+    return json.dumps(facts, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def compact_facts(facts: Any, intent: Optional[str] = None) -> Any:
+    """A copy of `facts` without nulls or the fields `intent` does not need."""
+    drop = ALWAYS_DROP | INTENT_DROP.get(intent or "", set())
+
+    def strip(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items() if v is not None and k not in drop}
+        if isinstance(value, (list, tuple)):
+            return [strip(v) for v in value if v is not None]
+        return value
+
+    return strip(facts)
+
+
+def _longest_list(value: Any) -> Optional[Tuple[dict, str]]:
+    """The (parent, key) of the longest list inside a dict; the first one found wins ties."""
+    best, best_len = None, 1
+    stack = [value]
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, dict):
+            for key, child in node.items():
+                if isinstance(child, list) and len(child) > best_len:
+                    best, best_len = (node, key), len(child)
+                stack.append(child)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return best
+
+
+def _shorten(parent: dict, key: str) -> None:
+    items = parent[key]
+    keep = len(items) // 2
+    # Lists are newest-first; keep the newest and the oldest (origin) items.
+    parent[key] = items[:keep - 1] + items[-1:] if keep > 1 else items[:1]
+    parent.setdefault(f"{key}_total", len(items))
+
+
+def render_facts(facts: Any, intent: Optional[str] = None, budget: Optional[int] = None) -> str:
+    """FACTS_JSON text for `intent`, compacted and fitted to its token budget."""
+    budget = budget or token_budget(intent)
+    compacted = compact_facts(facts, intent)
+    text = dumps(compacted)
+    tokens = count_tokens(text)
+    while tokens > budget:
+        target = _longest_list(compacted)
+        if target is None:
+            logger.debug(f"FACTS_JSON over budget for {intent}: {tokens} > {budget} tokens")
+            break
+        _shorten(*target)
+        text = dumps(compacted)
+        tokens = count_tokens(text)
+    return text
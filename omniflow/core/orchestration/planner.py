@@ -0,0 +1,184 @@
+# core/orchestration/planner.py
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from omniflow.caredesk.services import get_latest_ticket_for_user
+from omniflow.core.db.executor import run_db
+from omniflow.payguard.services import get_debit_for_order, get_wallet_by_user_id
+from omniflow.shipstream.services import (
+    get_reverse_for_shipment,
+    get_reverse_shipment,
+    get_shipment_by_tracking_number,
+)
+from omniflow.shopcore.services import get_order, get_user_by_email
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+TRACKING_RE = re.compile(r"\b(FWD|REV|NDR|EXC)\s*[-‐‑‒–—−]?\s*(\d+)\b", re.I)
+ORDER_ID_RE = re.compile(r"\border\s*#?\s*(\d{3,})\b", re.I)
+
+# What each intent's handler reads. "user" is always the requester;
+# "reverse" is the return for a FWD shipment, "reverse_number" a REV lookup.
+INTENT_NEEDS: Dict[str, Set[str]] = {
+    "return_status": {"shipment", "order", "reverse"},
+    "return_request": {"shipment"},
+    "return_confirm": {"shipment", "reverse"},
+    "return_image": {"shipment", "order"},
+    "paid_amount": {"user"},
+    "paid_amount_order": {"order", "debit"},
+    "complex_query": {"user"},
+    "shipstream": {"shipment", "reverse_number"},
+    "payguard": {"user", "wallet"},
+    "caredesk": {"user", "ticket"},
+    "shopcore": {"user"},
+}
+
+
+@dataclass
+class PrefetchPlan:
+    intent: str
+    needs: Set[str]
+    user_email: Optional[str] = None
+    tracking_number: Optional[str] = None
+    order_id: Optional[int] = None
+
+    @property
+    def empty(self) -> bool:
+        return not self.needs
+
+
+@dataclass
+class PrefetchResult:
+    entities: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+
+def plan_prefetch(
+    intent: Optional[str],
+    query: str,
+    user_email: Optional[str] = None,
+    pending_action: Optional[Dict[str, Any]] = None,
+    reference_id: Optional[str] = None,
+) -> PrefetchPlan:
+    """Decide which rows the routed handler will need from the identifiers in the turn."""
+    needs = set(INTENT_NEEDS.get(intent or "", set()))
+
+    tracking = (pending_action or {}).get("tracking_number") or None
+    if not tracking:
+        m = TRACKING_RE.search(query or "") or TRACKING_RE.search(reference_id or "")
+        if m:
+            tracking = f"{m.group(1).upper()}-{m.group(2)}"
+
+    order_id = None
+    m = ORDER_ID_RE.search(query or "")
+    if m:
+        order_id = int(m.group(1))
+    elif tracking and tracking.startswith("FWD-"):
+        # Seeded forward shipments are numbered after their order.
+        order_id = int(tracking.split("-", 1)[1])
+
+    if not tracking or not tracking.startswith("FWD-"):
+        needs -= {"shipment", "reverse"}
+    if not tracking or not tracking.startswith("REV-"):
+        needs.discard("reverse_number")
+    if order_id is None:
+        needs -= {"order", "debit"}
+    if not user_email:
+        needs -= {"user", "wallet", "ticket"}
+    elif {"wallet", "ticket"} & needs:
+        needs.add("user")
+
+    return PrefetchPlan(
+        intent=intent or "",
+        needs=needs,
+        user_email=user_email,
+        tracking_number=tracking,
+        order_id=order_id,
+    )
+
+
+async def execute_prefetch(plan: PrefetchPlan) -> PrefetchResult:
+    """
+    Run the plan as one parallel wave: one task per database alias on that
+    alias's executor, each issuing its queries back to back. Rows land in the
+    turn's identity map, so handlers that run next read them without a query.
+    Failures are logged and left for the handler to retry on its own path.
+    """
+    result = PrefetchResult()
+    if plan.empty:
+        return result
+
+    started = time.perf_counter()
+    needs = plan.needs
+    user_future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def shopcore() -> Dict[str, Any]:
+        out = {}
+        if "user" in needs:
+            out["user"] = get_user_by_email(plan.user_email)
+        if "order" in needs:
+            out["order"] = get_order(plan.order_id)
+        return out
+
+    def shipstream() -> Dict[str, Any]:
+        out = {}
+        tn = plan.tracking_number
+        if "shipment" in needs:
+            out["shipment"] = get_shipment_by_tracking_number(tn)
+        if "reverse" in needs:
+            out["reverse"] = get_reverse_for_shipment(tn)
+        if "reverse_number" in needs:
+            out["reverse"] = get_reverse_shipment(tn)
+        return out
+
+    def payguard(user) -> Dict[str, Any]:
+        out = {}
+        if "debit" in needs:
+            out["debit"] = get_debit_for_order(plan.order_id)
+        if "wallet" in needs and user is not None:
+            out["wallet"] = get_wallet_by_user_id(user.id)
+        return out
+
+    def caredesk(user) -> Dict[str, Any]:
+        out = {}
+        if "ticket" in needs and user is not None:
+            out["ticket"] = get_latest_ticket_for_user(user.id)
+        return out
+
+    async def run(alias: str, fn: Callable[..., Dict[str, Any]], *deps: Awaitable) -> None:
+        try:
+            args = [await d for d in deps]
+            rows = await run_db(alias, fn, *args)
+            result.entities.update(rows)
+        except Exception as e:
+            logger.warning(f"Prefetch on {alias} failed: {e}")
+            result.errors[alias] = str(e)
+        finally:
+            if alias == "shopcore" and not user_future.done():
+                user_future.set_result(result.entities.get("user"))
+
+    tasks = []
+    if {"user", "order"} & needs:
+        tasks.append(run("shopcore", shopcore))
+    else:
+        user_future.set_result(None)
+    if {"shipment", "reverse", "reverse_number"} & needs:
+        tasks.append(run("shipstream", shipstream))
+    if {"debit", "wallet"} & needs:
+        # Only the wallet lookup has to wait for the user id.
+        tasks.append(run("payguard", payguard, user_future if "wallet" in needs else _none()))
+    if "ticket" in needs:
+        tasks.append(run("caredesk", caredesk, user_future))
+
+    await asyncio.gather(*tasks)
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+async def _none() -> None:
+    return None
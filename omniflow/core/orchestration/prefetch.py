@@ -0,0 +1,52 @@
+# core/orchestration/prefetch.py
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from omniflow.caredesk.services import get_latest_ticket_for_user
+from omniflow.core.db.executor import run_db
+from omniflow.payguard.services import get_wallet_by_user_id
+from omniflow.shipstream.services import get_shipment_by_tracking_number
+from omniflow.shopcore.services import get_order, users_by_email
+
+BUNDLE_PARTS = ("order", "user", "wallet", "ticket")
+
+
+@dataclass
+class TrackingBundle:
+    tracking_number: str
+    shipment: Optional[Any] = None
+    order: Optional[Any] = None
+    user: Optional[Any] = None
+    wallet: Optional[Any] = None
+    ticket: Optional[Any] = None
+
+
+def prefetch_tracking_bundle(tracking_number: str, include: Iterable[str] = BUNDLE_PARTS) -> TrackingBundle:
+    """
+    Resolve a tracking ID to shipment -> order (+user, +product) -> wallet and
+    latest ticket with one query per hop, and leave every row in the turn's
+    identity map so the handlers that run next read them for free.
+    """
+    include = set(include)
+    bundle = TrackingBundle(tracking_number=tracking_number)
+
+    bundle.shipment = get_shipment_by_tracking_number(tracking_number)
+    order_id = getattr(bundle.shipment, "order_id", None)
+    if not order_id or not include & set(BUNDLE_PARTS):
+        return bundle
+
+    bundle.order = get_order(order_id)
+    bundle.user = getattr(bundle.order, "user", None) if bundle.order else None
+    if bundle.user is None:
+        return bundle
+    users_by_email.prime(bundle.user)
+
+    if "wallet" in include:
+        bundle.wallet = get_wallet_by_user_id(bundle.user.id)
+    if "ticket" in include:
+        bundle.ticket = get_latest_ticket_for_user(bundle.user.id)
+    return bundle
+
+
+async def aprefetch_tracking_bundle(tracking_number: str, include: Iterable[str] = BUNDLE_PARTS) -> TrackingBundle:
+    return await run_db("shipstream", prefetch_tracking_bundle, tracking_number, tuple(include))
@@ -1,24 +1,34 @@
 #core/orchestration/supervisor_graph.py
 from typing import TypedDict, Optional, Dict, Any, List
 from dataclasses import dataclass
+import asyncio
 import os
+import time
 import re
 import json
 
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, ToolMessage
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 import django
 django.setup()
 
-from asgiref.sync import sync_to_async
 from django.db import connections, transaction
 
 from omniflow.utils.logging import get_logger
 from omniflow.utils.prompts import get_response_synthesizer_prompt
 from omniflow.utils.config import settings as pydantic_settings
+from omniflow.core.media.frames import aingest_frames
+from omniflow.core.cache.identity import unit_of_work
+from omniflow.core.db.executor import run_db
+from omniflow.core.telemetry import db as _query_telemetry  # noqa: F401  (installs the per-alias query timer)
+from omniflow.core.telemetry.callbacks import TracingCallbackHandler
+from omniflow.core.telemetry.metrics import observe_turn, supervisor_inflight
+from omniflow.core.telemetry.spans import telemetry_enabled, trace_turn
+from omniflow.core.orchestration.planner import execute_prefetch, plan_prefetch
+from omniflow.core.orchestration.facts import render_facts
 
 from omniflow.agents.langchain_based_agents.shopcore_agent import (
     build_shopcore_agent,
@@ -32,16 +42,21 @@ from omniflow.agents.langchain_based_agents.shipstream_agent import (
     submit_return_image,
     tracking_for_order,
 )
+from omniflow.agents.langchain_based_agents.base import mcp_manager
 from omniflow.agents.langchain_based_agents.payguard_agent import build_payguard_agent
+from omniflow.agents.langchain_based_agents.vision_agent import match_order_from_image
 from omniflow.agents.langchain_based_agents.caredesk_agent import (
     build_caredesk_agent,
     latest_ticket_status,
 )
 
-from omniflow.shipstream.models import Shipment, ReverseShipment, NdrEvent, ExchangeShipment
-from omniflow.shopcore.models import Order, User, Product
-from omniflow.payguard.models import Transaction
+from omniflow.shipstream.models import NdrEvent, ExchangeShipment, ReturnMedia
+from omniflow.shipstream.services import get_reverse_shipment, get_shipment_by_tracking_number, shipments_by_tracking
+from omniflow.shopcore.models import User, Product
+from omniflow.shopcore.services import first_product_matching, get_order
+from omniflow.payguard.services import get_debit_for_order
 from omniflow.caredesk.models import Ticket, TicketAttachment
+from omniflow.customer360.projector import find_order, order_facts
 
 logger = get_logger(__name__)
 
@@ -68,13 +83,13 @@ def _is_no(text: str) -> bool:
     return bool(re.match(r"^(no|n|nope|cancel|cancelled)$", t))
 
 
-def _synthesize_answer(user_message: str, facts: Dict[str, Any]) -> str:
+def _synthesize_answer(user_message: str, facts: Dict[str, Any], intent: Optional[str] = None) -> str:
     prompt = get_response_synthesizer_prompt()
     msg = (
         "USER_MESSAGE:\n"
         f"{user_message}\n\n"
         "FACTS_JSON:\n"
-        f"{json.dumps(facts, ensure_ascii=False)}"
+        f"{render_facts(facts, intent)}"
     )
     out = RESPONSE_SYNTH_LLM.invoke([
         SystemMessage(content=prompt),
@@ -92,6 +107,7 @@ class SupervisorState(TypedDict):
     user_name: Optional[str]
     image: Optional[str]
     image_frames: Optional[List[str]]
+    media_ids: Optional[List[str]]
     reference_id: Optional[str]
 
     intent: Optional[str]
@@ -115,7 +131,7 @@ def intent_gate(state: SupervisorState) -> SupervisorState:
     q = raw_q.lower()
 
     if state.get("pending_action") and state["pending_action"].get("action") == "await_return_image":
-        if state.get("image") or state.get("image_frames"):
+        if state.get("image") or state.get("image_frames") or state.get("media_ids"):
             state["intent"] = "return_image"
             return state
 
@@ -136,6 +152,7 @@ def intent_gate(state: SupervisorState) -> SupervisorState:
                     "next_step": "awaiting_confirmation_yes_no",
                 }
             },
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         state["intent"] = None
@@ -218,6 +235,7 @@ def intent_gate(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts={"system": {"require_identity": True}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -251,41 +269,106 @@ def _extract_product_name(raw_query: str) -> Optional[str]:
     return None
 
 
+async def _batched_lookups(lookups: Dict[str, tuple]) -> Dict[str, Any]:
+    """
+    Resolve independent lookups in one round-trip of wall time.
+
+    `lookups` maps a key to `((server, tool, arguments), fallback)`. The MCP
+    calls go out as a single batch; any that fail fall back to their local
+    tool, and the fallbacks also run concurrently.
+    """
+    keys = [k for k in lookups if mcp_manager.supports(*lookups[k][0][:2])]
+    outcomes = await mcp_manager.call_tools_batch([lookups[k][0] for k in keys]) if keys else []
+
+    results: Dict[str, Any] = {}
+    fallback_keys = [k for k in lookups if k not in keys]
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, dict):
+            results[key] = outcome
+        else:
+            fallback_keys.append(key)
+
+    if fallback_keys:
+        fallbacks = await asyncio.gather(
+            *[lookups[k][1]() for k in fallback_keys],
+            return_exceptions=True,
+        )
+        for key, value in zip(fallback_keys, fallbacks):
+            if isinstance(value, Exception):
+                logger.warning(f"Lookup {key} failed: {value}")
+                value = None
+            results[key] = value
+    return results
+
+
 async def handle_complex_query(state: SupervisorState) -> SupervisorState:
     raw_query = state.get("query") or ""
     state["decision_trace"].append({"agent": "Supervisor", "reason": "Complex query orchestration"})
 
     product_name = _extract_product_name(raw_query)
-    if not product_name:
+    if product_name and pydantic_settings.CUSTOMER360_ENABLED:
+        # One indexed read of the customer-360 projection answers all three
+        # domains; fall through to the live lookups when it has no row. The
+        # product is resolved the way the live lookup resolves it, so both
+        # paths answer with the same order.
+        try:
+            product = await run_db("shopcore", first_product_matching, product_name)
+            row = await run_db("default", find_order, state.get("user_email") or "", product.id) if product else None
+        except Exception as e:
+            logger.warning(f"customer360 read failed, using live lookups: {e}")
+            row = None
+        if row is not None:
+            facts = order_facts(row)
+            state["decision_trace"].append({"agent": "Supervisor", "reason": "Answered from customer360 projection"})
+            state["facts"] = facts
+            state["final_response"] = _synthesize_answer(user_message=raw_query, facts=facts, intent=state.get("intent"))
+            state["confidence_score"] = 1.0
+            return state
+
+    if product_name:
+        shop = await lookup_order_for_user_product.ainvoke({
+            "user_email": state.get("user_email") or "",
+            "product_name": product_name,
+        })
+    elif state.get("image"):
+        # No product named in the text: identify it from the customer's photo.
+        shop = await match_order_from_image.ainvoke({
+            "image_data": state.get("image"),
+            "user_email": state.get("user_email") or "",
+        })
+    else:
         state["final_response"] = _synthesize_answer(
             user_message=raw_query,
             facts={"shopcore": {"need_product_name": True}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
 
-    shop = await lookup_order_for_user_product.ainvoke({
-        "user_email": state.get("user_email") or "",
-        "product_name": product_name,
-    })
-
     if not isinstance(shop, dict) or not shop.get("found"):
         facts = {"shopcore": shop if isinstance(shop, dict) else {"found": False}}
         state["facts"] = facts
-        state["final_response"] = _synthesize_answer(user_message=raw_query, facts=facts)
+        state["final_response"] = _synthesize_answer(user_message=raw_query, facts=facts, intent=state.get("intent"))
         state["confidence_score"] = 0.7
         return state
 
     order_id = shop.get("order_id")
     user_id = shop.get("user_id")
 
-    ship = None
+    lookups = {}
     if isinstance(order_id, int):
-        ship = await tracking_for_order.ainvoke({"order_id": order_id})
-
-    care = None
+        lookups["ship"] = (
+            ("tracking_service", "get_order_tracking", {"order_id": order_id}),
+            lambda: tracking_for_order.ainvoke({"order_id": order_id}),
+        )
     if isinstance(user_id, int):
-        care = await latest_ticket_status.ainvoke({"user_id": user_id, "order_id": order_id})
+        lookups["care"] = (
+            ("support_service", "get_ticket_status", {"user_id": user_id, "order_id": order_id}),
+            lambda: latest_ticket_status.ainvoke({"user_id": user_id, "order_id": order_id}),
+        )
+    results = await _batched_lookups(lookups)
+    ship = results.get("ship")
+    care = results.get("care")
 
     facts: Dict[str, Any] = {
         "shopcore": shop,
@@ -293,7 +376,7 @@ async def handle_complex_query(state: SupervisorState) -> SupervisorState:
         "caredesk": care if isinstance(care, dict) else {"found": False, "reason": "caredesk_unavailable"},
     }
     state["facts"] = facts
-    state["final_response"] = _synthesize_answer(user_message=raw_query, facts=facts)
+    state["final_response"] = _synthesize_answer(user_message=raw_query, facts=facts, intent=state.get("intent"))
     state["confidence_score"] = 1.0
     return state
 
@@ -307,6 +390,7 @@ async def handle_paid_amount(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=raw_query,
             facts={"shopcore": {"need_product_name": True}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -319,7 +403,7 @@ async def handle_paid_amount(state: SupervisorState) -> SupervisorState:
     if not isinstance(shop, dict) or not shop.get("found"):
         facts = {"shopcore": shop if isinstance(shop, dict) else {"found": False}}
         state["facts"] = facts
-        state["final_response"] = _synthesize_answer(user_message=raw_query, facts=facts)
+        state["final_response"] = _synthesize_answer(user_message=raw_query, facts=facts, intent=state.get("intent"))
         state["confidence_score"] = 0.7
         return state
 
@@ -330,20 +414,13 @@ async def handle_paid_amount(state: SupervisorState) -> SupervisorState:
     source = None
 
     if isinstance(order_id, int):
-        txn = await sync_to_async(
-            lambda: Transaction.objects.using("payguard")
-            .filter(order_id=order_id, type__iexact="Debit")
-            .order_by("-timestamp")
-            .first()
-        )()
+        txn = await run_db("payguard", get_debit_for_order, order_id)
         if txn and getattr(txn, "amount", None) is not None:
             amount = str(txn.amount)
             source = "transaction"
 
     if amount is None and isinstance(product_id, int):
-        prod = await sync_to_async(
-            lambda: Product.objects.using("shopcore").filter(id=product_id).first()
-        )()
+        prod = await run_db("shopcore", Product.objects.using("shopcore").filter(id=product_id).first)
         if prod and getattr(prod, "price", None) is not None:
             amount = str(prod.price)
             source = "product_price"
@@ -384,6 +461,7 @@ async def handle_paid_amount_for_order(state: SupervisorState) -> SupervisorStat
         state["final_response"] = _synthesize_answer(
             user_message=raw_query,
             facts={"payguard": {"need_order_id": True}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -397,22 +475,16 @@ async def handle_paid_amount_for_order(state: SupervisorState) -> SupervisorStat
         state["final_response"] = _synthesize_answer(
             user_message=raw_query,
             facts={"payguard": {"need_order_id": True}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
 
-    txn = await sync_to_async(
-        lambda: Transaction.objects.using("payguard")
-        .filter(order_id=order_id, type__iexact="Debit")
-        .order_by("-timestamp")
-        .first()
-    )()
+    txn = await run_db("payguard", get_debit_for_order, order_id)
 
     amount = str(txn.amount) if txn and getattr(txn, "amount", None) is not None else None
 
-    order = await sync_to_async(
-        lambda: Order.objects.using("shopcore").select_related("product").filter(id=order_id).first()
-    )()
+    order = await run_db("shopcore", get_order, order_id)
     product_name = None
     if order and getattr(order, "product", None):
         product_name = getattr(order.product, "name", None)
@@ -478,15 +550,14 @@ async def handle_return_status(state: SupervisorState) -> SupervisorState:
     # --------------------------------------------------
     # Optional ownership verification (ShopCore authority)
     # --------------------------------------------------
+    # The prefetch node already loaded the shipment and order into the
+    # turn's identity map, so these reads normally skip the database.
     order_id = result.get("order_id")
+    if not order_id:
+        shipment = await run_db("shipstream", get_shipment_by_tracking_number, tracking)
+        order_id = getattr(shipment, "order_id", None)
     if order_id:
-        order = await sync_to_async(
-            lambda: Order.objects
-            .using("shopcore")
-            .select_related("user")
-            .filter(id=order_id)
-            .first()
-        )()
+        order = await run_db("shopcore", get_order, order_id)
 
         if order and getattr(order, "user", None):
             owner_email = (getattr(order.user, "email", "") or "").strip().lower()
@@ -513,18 +584,47 @@ async def handle_return_image(state: SupervisorState) -> SupervisorState:
     tracking = (pending.get("tracking_number") or "").strip().upper() or None
     image = state.get("image")
     frames = state.get("image_frames")
+    media_ids = [m.strip() for m in (state.get("media_ids") or []) if isinstance(m, str) and m.strip()]
 
     if not tracking:
         state["pending_action"] = None
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts={"return": {"error": "missing_tracking_for_image"}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 0.5
         return state
 
     has_frames = isinstance(frames, list) and len(frames) > 0
-    if not image and not has_frames:
+
+    media = []
+    if media_ids and not image and not has_frames:
+        media = await run_db(
+            "shipstream",
+            list,
+            ReturnMedia.objects.using("shipstream")
+            .filter(media_id__in=media_ids, tracking_number__iexact=tracking)
+            .order_by("id"),
+        )
+        if not media:
+            state["final_response"] = _synthesize_answer(
+                user_message=state.get("query") or "",
+                facts={
+                    "return": {
+                        "tracking_number": tracking,
+                        "stage": "awaiting_image",
+                        "error": "unknown_media_reference",
+                    }
+                },
+                intent=state.get("intent"),
+            )
+            state["confidence_score"] = 0.7
+            return state
+
+    single_image_media = len(media) == 1 and media[0].mime_type.startswith("image/")
+
+    if not image and not has_frames and not media:
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts={
@@ -534,36 +634,51 @@ async def handle_return_image(state: SupervisorState) -> SupervisorState:
                     "requirement": "item_condition_image_or_video",
                 }
             },
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
 
-    if not image and has_frames:
+    if not image and (has_frames or (media and not single_image_media)):
+        if has_frames:
+            frames = await aingest_frames(frames)
+            attachment_payload = json.dumps(frames, ensure_ascii=False)
+        else:
+            frames = [m.media_id for m in media]
+            attachment_payload = json.dumps({"media_ids": frames})
+
+        if not frames:
+            state["final_response"] = _synthesize_answer(
+                user_message=state.get("query") or "",
+                facts={
+                    "return": {
+                        "tracking_number": tracking,
+                        "stage": "awaiting_image",
+                        "error": "unreadable_video_frames",
+                    }
+                },
+                intent=state.get("intent"),
+            )
+            state["confidence_score"] = 0.7
+            return state
+
+        # Reads go to their own databases' executors; only the ticket write runs on caredesk's.
+        shipment = await run_db("shipstream", get_shipment_by_tracking_number, tracking)
+        order_id = getattr(shipment, "order_id", None) if shipment else None
+        if not order_id:
+            try:
+                order_id = int(str(tracking).split("-", 1)[-1])
+            except Exception:
+                order_id = None
+
+        user_id = None
+        if order_id:
+            order = await run_db("shopcore", get_order, order_id)
+            if order and getattr(order, "user_id", None):
+                user_id = int(order.user_id)
+
         def _store_return_video() -> dict:
             with transaction.atomic(using="caredesk"):
-                shipment = (
-                    Shipment.objects.using("shipstream")
-                    .filter(tracking_number__iexact=tracking)
-                    .first()
-                )
-                order_id = getattr(shipment, "order_id", None) if shipment else None
-                if not order_id:
-                    try:
-                        order_id = int(str(tracking).split("-", 1)[-1])
-                    except Exception:
-                        order_id = None
-
-                user_id = None
-                if order_id:
-                    order = (
-                        Order.objects.using("shopcore")
-                        .select_related("user")
-                        .filter(id=int(order_id))
-                        .first()
-                    )
-                    if order and getattr(order, "user_id", None):
-                        user_id = int(order.user_id)
-
                 ticket = None
                 if user_id and order_id:
                     ticket = (
@@ -580,11 +695,10 @@ async def handle_return_image(state: SupervisorState) -> SupervisorState:
                         status="Open",
                     )
 
-                payload = json.dumps(frames, ensure_ascii=False)
                 att = TicketAttachment.objects.using("caredesk").create(
                     ticket_id=int(ticket.id),
                     kind="return_video",
-                    image_data=payload,
+                    image_data=attachment_payload,
                 )
 
                 return {
@@ -593,7 +707,7 @@ async def handle_return_image(state: SupervisorState) -> SupervisorState:
                     "order_id": int(order_id) if order_id is not None else None,
                 }
 
-        stored = await sync_to_async(_store_return_video)()
+        stored = await run_db("caredesk", _store_return_video)
 
         state["pending_action"] = None
         state["facts"] = {
@@ -608,6 +722,7 @@ async def handle_return_image(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts=state["facts"],
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -616,6 +731,7 @@ async def handle_return_image(state: SupervisorState) -> SupervisorState:
         "tracking_number": tracking,
         "user_email": state.get("user_email"),
         "image": image,
+        "media_id": media[0].media_id if single_image_media and not image else None,
     })
 
     return_id = None
@@ -642,6 +758,7 @@ async def handle_return_image(state: SupervisorState) -> SupervisorState:
     state["final_response"] = _synthesize_answer(
         user_message=state.get("query") or "",
         facts=state["facts"],
+        intent=state.get("intent"),
     )
     state["confidence_score"] = 0.7
     return state
@@ -654,6 +771,7 @@ async def handle_return_request(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=raw_query,
             facts={"return": {"need_tracking_number": True}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -668,6 +786,7 @@ async def handle_return_request(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=raw_query,
             facts={"return": {"tracking_number": tracking, "eligibility_check": "failed"}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 0.5
         return state
@@ -705,6 +824,7 @@ async def handle_return_confirm(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts={"return": {"error": "missing_tracking_for_confirmation"}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 0.5
         return state
@@ -725,6 +845,7 @@ async def handle_return_confirm(state: SupervisorState) -> SupervisorState:
                     "initiate": "failed",
                 }
             },
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 0.5
         return state
@@ -748,6 +869,7 @@ async def handle_return_confirm(state: SupervisorState) -> SupervisorState:
     state["final_response"] = _synthesize_answer(
         user_message=state.get("query") or "",
         facts=state["facts"],
+        intent=state.get("intent"),
     )
 
     state["confidence_score"] = 1.0
@@ -760,11 +882,39 @@ async def handle_return_cancel(state: SupervisorState) -> SupervisorState:
     state["final_response"] = _synthesize_answer(
         user_message=state.get("query") or "",
         facts={"return": {"tracking_number": tracking, "cancelled": True}},
+        intent=state.get("intent"),
     )
     state["confidence_score"] = 1.0
     return state
 
 
+async def prefetch_domain_data(state: SupervisorState) -> SupervisorState:
+    """
+    Fetch what the routed handler is about to read, across all four
+    databases at once, before it runs. Handlers still do their own lookups;
+    those now hit the turn's identity map instead of the database.
+    """
+    if not state.get("intent"):
+        return state
+
+    plan = plan_prefetch(
+        intent=state.get("intent"),
+        query=state.get("query") or "",
+        user_email=state.get("user_email"),
+        pending_action=state.get("pending_action"),
+        reference_id=state.get("reference_id"),
+    )
+    result = await execute_prefetch(plan)
+    logger.info("prefetch", extra={
+        "sampled": True,
+        "intent": plan.intent,
+        "needs": sorted(plan.needs),
+        "found": sorted(k for k, v in result.entities.items() if v is not None),
+        "elapsed_ms": result.elapsed_ms,
+    })
+    return state
+
+
 def route_after_intent(state: SupervisorState) -> str:
     intent = state.get("intent")
     if intent:
@@ -822,6 +972,7 @@ async def call_shipstream(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=raw_query,
             facts={"shipstream": {"need_tracking_number": True}},
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -830,17 +981,13 @@ async def call_shipstream(state: SupervisorState) -> SupervisorState:
     # FORWARD SHIPMENT (FWD)
     # ==================================================
     if tracking.startswith("FWD-"):
-        shipment = await sync_to_async(
-            lambda: Shipment.objects
-            .using("shipstream")
-            .filter(tracking_number__iexact=tracking)
-            .first()
-        )()
+        shipment = await shipments_by_tracking.aget(tracking)
 
         if not shipment:
             state["final_response"] = _synthesize_answer(
                 user_message=raw_query,
                 facts={"shipstream": {"tracking_number": tracking, "found": False}},
+                intent=state.get("intent"),
             )
             state["confidence_score"] = 1.0
             return state
@@ -866,17 +1013,13 @@ async def call_shipstream(state: SupervisorState) -> SupervisorState:
     # REVERSE SHIPMENT (REV)
     # ==================================================
     if tracking.startswith("REV-"):
-        reverse = await sync_to_async(
-            lambda: ReverseShipment.objects
-            .using("shipstream")
-            .filter(reverse_number=tracking)
-            .first()
-        )()
+        reverse = await run_db("shipstream", get_reverse_shipment, tracking)
 
         if not reverse:
             state["final_response"] = _synthesize_answer(
                 user_message=raw_query,
                 facts={"shipstream": {"tracking_number": tracking, "found": False}},
+                intent=state.get("intent"),
             )
             state["confidence_score"] = 1.0
             return state
@@ -895,17 +1038,19 @@ async def call_shipstream(state: SupervisorState) -> SupervisorState:
     # NDR EVENT
     # ==================================================
     if tracking.startswith("NDR-"):
-        ndr = await sync_to_async(
-            lambda: NdrEvent.objects
+        ndr = await run_db(
+            "shipstream",
+            NdrEvent.objects
             .using("shipstream")
             .filter(ndr_number=tracking)
-            .first()
-        )()
+            .first,
+        )
 
         if not ndr:
             state["final_response"] = _synthesize_answer(
                 user_message=raw_query,
                 facts={"shipstream": {"tracking_number": tracking, "found": False}},
+                intent=state.get("intent"),
             )
             state["confidence_score"] = 1.0
             return state
@@ -925,17 +1070,19 @@ async def call_shipstream(state: SupervisorState) -> SupervisorState:
     # EXCHANGE SHIPMENT
     # ==================================================
     if tracking.startswith("EXC-"):
-        exc = await sync_to_async(
-            lambda: ExchangeShipment.objects
+        exc = await run_db(
+            "shipstream",
+            ExchangeShipment.objects
             .using("shipstream")
             .filter(exchange_number=tracking)
-            .first()
-        )()
+            .first,
+        )
 
         if not exc:
             state["final_response"] = _synthesize_answer(
                 user_message=raw_query,
                 facts={"shipstream": {"tracking_number": tracking, "found": False}},
+                intent=state.get("intent"),
             )
             state["confidence_score"] = 1.0
             return state
@@ -956,6 +1103,7 @@ async def call_shipstream(state: SupervisorState) -> SupervisorState:
     state["final_response"] = _synthesize_answer(
         user_message=raw_query,
         facts={"shipstream": {"tracking_number": tracking, "unsupported_type": True}},
+        intent=state.get("intent"),
     )
     state["confidence_score"] = 0.5
     return state
@@ -963,16 +1111,39 @@ async def call_shipstream(state: SupervisorState) -> SupervisorState:
 
 
 
-async def call_payguard(state: SupervisorState) -> SupervisorState:
-    logger.warning("PAYGUARD AGENT CALLED")
+def _agent_facts(result: Any) -> Optional[Dict[str, Any]]:
+    """
+    JSON-safe facts from an agent run: what its tools returned and its final
+    answer. The raw result holds message objects, which must not reach
+    `state` (the WebSocket sends it as JSON).
+    """
+    if not isinstance(result, dict):
+        return None
+    tool_results = []
+    answer = ""
+    for message in result.get("messages") or []:
+        if isinstance(message, ToolMessage):
+            content = message.text
+            try:
+                content = json.loads(content)
+            except ValueError:
+                pass
+            tool_results.append({"tool": message.name, "result": content})
+        elif isinstance(message, AIMessage) and message.text:
+            answer = message.text.strip()
+    if not tool_results and not answer:
+        return None
+    return {"tool_results": tool_results, "answer": answer}
+
 
+async def call_payguard(state: SupervisorState) -> SupervisorState:
     state["decision_trace"].append({"agent": "PayGuard", "reason": "Wallet lookup"})
     try:
         result = await PAYGUARD_AGENT.ainvoke({
             "input": state["query"],
             "user_email": state["user_email"],
         })
-        state["payguard_ctx"] = result if isinstance(result, dict) else None
+        state["payguard_ctx"] = _agent_facts(result)
     except Exception as e:
         logger.error(f"PayGuard failed: {e}")
         state["payguard_ctx"] = None
@@ -986,7 +1157,7 @@ async def call_caredesk(state: SupervisorState) -> SupervisorState:
             "input": state["query"],
             "user_email": state["user_email"],
         })
-        state["caredesk_ctx"] = result if isinstance(result, dict) else None
+        state["caredesk_ctx"] = _agent_facts(result)
     except Exception as e:
         logger.error(f"CareDesk failed: {e}")
         state["caredesk_ctx"] = None
@@ -1028,6 +1199,7 @@ def aggregate_response(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts=facts,
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -1038,6 +1210,7 @@ def aggregate_response(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts=facts,
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -1048,6 +1221,7 @@ def aggregate_response(state: SupervisorState) -> SupervisorState:
         state["final_response"] = _synthesize_answer(
             user_message=state.get("query") or "",
             facts=facts,
+            intent=state.get("intent"),
         )
         state["confidence_score"] = 1.0
         return state
@@ -1055,6 +1229,7 @@ def aggregate_response(state: SupervisorState) -> SupervisorState:
     state["final_response"] = _synthesize_answer(
         user_message=state.get("query") or "",
         facts={"system": {"no_matching_record": True}},
+        intent=state.get("intent"),
     )
     state["confidence_score"] = 0.3
     return state
@@ -1071,6 +1246,7 @@ def build_supervisor_graph():
     # Core routing
     # -----------------------------
     graph.add_node("intent", intent_gate)
+    graph.add_node("prefetch", prefetch_domain_data)
 
     # -----------------------------
     # Return flow (explicit lifecycle)
@@ -1106,12 +1282,13 @@ def build_supervisor_graph():
     graph.add_node("aggregate", aggregate_response)
 
     graph.set_entry_point("intent")
+    graph.add_edge("intent", "prefetch")
 
     # -----------------------------
     # Intent-based routing
     # -----------------------------
     graph.add_conditional_edges(
-        "intent",
+        "prefetch",
         route_after_intent,
         {
             # Return lifecycle
@@ -1213,13 +1390,19 @@ async def run_supervisor(
     image: Optional[str] = None,
     image_frames: Optional[List[str]] = None,
     reference_id: Optional[str] = None,
+    media_ids: Optional[List[str]] = None,
 ) -> dict:
+    # No-op once startup has kicked discovery off; never waits on it, since
+    # tools probe unknown capabilities themselves.
+    mcp_manager.start_discovery()
+
     initial_state: SupervisorState = {
         "query": query,
         "user_email": user_email,
         "user_name": user_name,
         "image": image,
         "image_frames": image_frames,
+        "media_ids": media_ids,
         "reference_id": reference_id,
         "intent": None,
         "pending_action": pending_action,
@@ -1235,7 +1418,23 @@ async def run_supervisor(
         "final_response": None,
     }
 
-    result = await SUPERVISOR_GRAPH.ainvoke(initial_state)
+    config = {"callbacks": [TracingCallbackHandler()]} if telemetry_enabled() else None
+    metrics_on = pydantic_settings.METRICS_ENABLED
+    if metrics_on:
+        supervisor_inflight(1)
+    started = time.perf_counter()
+    try:
+        with unit_of_work(), trace_turn() as trace:
+            result = await SUPERVISOR_GRAPH.ainvoke(initial_state, config=config)
+            if trace is not None:
+                if pydantic_settings.TRACE_DEBUG:
+                    result["decision_trace"].extend(trace.decision_trace())
+                logger.debug(f"Turn spans (ms by kind): {trace.totals()}")
+    finally:
+        if metrics_on:
+            supervisor_inflight(-1)
+    if metrics_on:
+        observe_turn(result.get("intent"), time.perf_counter() - started)
 
     pending = result.get("pending_action")
     needs_image = bool(isinstance(pending, dict) and pending.get("action") == "await_return_image")
@@ -0,0 +1,118 @@
+# core/telemetry/callbacks.py
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from omniflow.utils.config import settings
+
+from .metrics import count_llm_call, count_tokens
+from .spans import record_span
+
+
+def _token_usage(response) -> Tuple[int, int]:
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    if usage:
+        return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+    prompt = completion = 0
+    for generations in getattr(response, "generations", None) or []:
+        for gen in generations:
+            meta = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+            prompt += int(meta.get("input_tokens") or 0)
+            completion += int(meta.get("output_tokens") or 0)
+    return prompt, completion
+
+
+def _node_path(metadata: dict, node: str) -> str:
+    # Nodes of an agent subgraph run under the supervisor node that called the
+    # agent ("shopcore:<id>|model:<id>"); name them "shopcore/model".
+    ns = metadata.get("langgraph_checkpoint_ns") or metadata.get("checkpoint_ns") or ""
+    parts = [p.split(":", 1)[0] for p in ns.split("|") if p]
+    return "/".join(parts) if len(parts) > 1 else node
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Turns LangGraph node runs, tool runs and LLM calls into spans.
+
+    Passed in the graph's config, so LangChain propagates it to the tools and
+    chat models invoked inside nodes as well.
+    """
+
+    # Timing has to be taken where the run happens, not on a callback thread.
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open: Dict[UUID, Tuple[str, str, float, Dict[str, Any]]] = {}
+
+    def _start(self, run_id: UUID, kind: str, name: str, **attrs) -> None:
+        with self._lock:
+            self._open[run_id] = (kind, name, time.perf_counter(), attrs)
+
+    def _end(self, run_id: UUID, **attrs) -> None:
+        ended = time.perf_counter()
+        with self._lock:
+            entry = self._open.pop(run_id, None)
+        if entry is not None:
+            kind, name, started, start_attrs = entry
+            record_span(kind, name, started, ended, **start_attrs, **attrs)
+
+    # ---------------- graph nodes ----------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._start(run_id, "node", _node_path(metadata, node))
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, error=type(error).__name__)
+
+    # ---------------- tools ----------------
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._start(run_id, "tool", name)
+
+    def on_tool_end(self, output, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, error=type(error).__name__)
+
+    # ---------------- LLM calls ----------------
+
+    def _llm_start(self, serialized, run_id: UUID, metadata: Optional[dict]) -> None:
+        model = (
+            (metadata or {}).get("ls_model_name")
+            or ((serialized or {}).get("kwargs") or {}).get("model_name")
+            or "llm"
+        )
+        self._start(run_id, "llm", model)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._llm_start(serialized, run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._llm_start(serialized, run_id, metadata)
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        with self._lock:
+            entry = self._open.get(run_id)
+        prompt, completion = _token_usage(response)
+        if entry is not None and settings.METRICS_ENABLED:
+            count_llm_call(entry[1], ok=True)
+            count_tokens(entry[1], prompt, completion)
+        self._end(run_id, prompt_tokens=prompt or None, completion_tokens=completion or None)
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        with self._lock:
+            entry = self._open.get(run_id)
+        if entry is not None and settings.METRICS_ENABLED:
+            count_llm_call(entry[1], ok=False)
+        self._end(run_id, error=type(error).__name__)
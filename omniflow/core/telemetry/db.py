@@ -0,0 +1,33 @@
+# core/telemetry/db.py
+import time
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .spans import record_span, telemetry_enabled
+
+
+def _query_timer(alias: str):
+    def wrapper(execute, sql, params, many, context):
+        if not telemetry_enabled():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            record_span("db", alias, started, time.perf_counter(), many=many or None)
+    return wrapper
+
+
+_INSTALLED_ATTR = "_telemetry_query_timer"
+
+
+@receiver(connection_created, dispatch_uid="telemetry:query_timer")
+def _install_query_timer(sender, connection, **kwargs):
+    # The signal fires on every reconnect of the same wrapper object
+    # (CONN_MAX_AGE=0, close_old_connections), and execute_wrappers outlives
+    # the underlying connection, so install the timer only once per wrapper.
+    if getattr(connection, _INSTALLED_ATTR, False):
+        return
+    connection.execute_wrappers.append(_query_timer(connection.alias))
+    setattr(connection, _INSTALLED_ATTR, True)
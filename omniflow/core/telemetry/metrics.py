@@ -0,0 +1,162 @@
+# core/telemetry/metrics.py
+import os
+import threading
+import time
+from typing import Optional
+
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY
+except ImportError:  # optional: spans still reach decision_trace without it
+    Counter = Gauge = Histogram = None
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    logger.info("prometheus_client not installed; metrics disabled")
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported) every
+# worker process writes its samples to its own mmap'd files and /metrics
+# merges them, so several ASGI workers report as one service.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def _metric(cls, name: str, documentation: str, labels=(), **kwargs):
+    if cls is None:
+        return None
+    return cls(name, documentation, list(labels), **kwargs)
+
+
+# Node and tool spans range from sub-millisecond cache hits to multi-second
+# LLM calls; DB queries sit at the low end.
+_SPAN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SPAN_SECONDS = _metric(
+    Histogram, "omniflow_span_seconds",
+    "Duration of supervisor graph nodes, tool calls, DB queries and LLM calls",
+    ["kind", "name"], buckets=_SPAN_BUCKETS,
+)
+LLM_TOKENS = _metric(Counter, "omniflow_llm_tokens", "LLM tokens consumed, by model and direction", ["model", "direction"])
+LLM_CALLS = _metric(Counter, "omniflow_llm_calls", "LLM calls, by model and outcome", ["model", "status"])
+
+HTTP_REQUESTS = _metric(Counter, "omniflow_http_requests", "HTTP requests, by route and status", ["route", "method", "status"])
+HTTP_SECONDS = _metric(
+    Histogram, "omniflow_http_request_seconds", "HTTP request latency, by route", ["route", "method"],
+    buckets=_REQUEST_BUCKETS,
+)
+TURN_SECONDS = _metric(
+    Histogram, "omniflow_supervisor_turn_seconds", "Supervisor turn latency, by detected intent", ["intent"],
+    buckets=_REQUEST_BUCKETS,
+)
+SUPERVISOR_INFLIGHT = _metric(Gauge, "omniflow_supervisor_inflight", "Supervisor runs in progress", multiprocess_mode="livesum")
+WS_CONNECTIONS = _metric(Gauge, "omniflow_ws_connections", "Open WebSocket connections", multiprocess_mode="livesum")
+WS_REQUESTS = _metric(Counter, "omniflow_ws_requests", "WebSocket queries, by outcome", ["status"])
+
+# Process-local state (cache counters, breaker states, executor queues) is
+# copied into gauges by publish_process_stats(); live worker values are summed.
+ENTITY_CACHE_LOOKUPS = _metric(
+    Gauge, "omniflow_entity_cache_lookups", "Entity cache lookups since process start, by cache and result",
+    ["cache", "result"], multiprocess_mode="livesum",
+)
+MCP_BREAKER_STATE = _metric(
+    Gauge, "omniflow_mcp_breaker_state", "1 for the circuit state each MCP server is in, per worker",
+    ["server", "state"], multiprocess_mode="liveall",
+)
+DB_EXECUTOR_INFLIGHT = _metric(
+    Gauge, "omniflow_db_executor_inflight", "ORM calls queued or running on each alias's executor",
+    ["alias"], multiprocess_mode="livesum",
+)
+
+
+def observe_span(kind: str, name: str, seconds: float) -> None:
+    if SPAN_SECONDS is not None:
+        SPAN_SECONDS.labels(kind, name).observe(seconds)
+
+
+def count_tokens(model: str, prompt: int, completion: int) -> None:
+    if LLM_TOKENS is None:
+        return
+    if prompt:
+        LLM_TOKENS.labels(model, "prompt").inc(prompt)
+    if completion:
+        LLM_TOKENS.labels(model, "completion").inc(completion)
+
+
+def count_llm_call(model: str, ok: bool) -> None:
+    if LLM_CALLS is not None:
+        LLM_CALLS.labels(model, "ok" if ok else "error").inc()
+
+
+def observe_request(route: str, method: str, status: int, seconds: float) -> None:
+    if HTTP_REQUESTS is None:
+        return
+    HTTP_REQUESTS.labels(route, method, str(status)).inc()
+    HTTP_SECONDS.labels(route, method).observe(seconds)
+
+
+def observe_turn(intent: Optional[str], seconds: float) -> None:
+    if TURN_SECONDS is not None:
+        TURN_SECONDS.labels(intent or "none").observe(seconds)
+
+
+def supervisor_inflight(delta: int) -> None:
+    if SUPERVISOR_INFLIGHT is not None:
+        SUPERVISOR_INFLIGHT.inc(delta)
+
+
+def ws_connected(delta: int) -> None:
+    if WS_CONNECTIONS is not None:
+        WS_CONNECTIONS.inc(delta)
+
+
+def count_ws_request(status: str) -> None:
+    if WS_REQUESTS is not None:
+        WS_REQUESTS.labels(status).inc()
+
+
+# ---------------- process-local state ----------------
+
+_BREAKER_STATES = ("closed", "open", "half_open")
+_published_at = 0.0
+_publish_lock = threading.Lock()
+
+
+def publish_process_stats(min_interval: float = 1.0) -> None:
+    """Copy this process's cache, breaker and executor state into gauges (at most once per `min_interval`)."""
+    global _published_at
+    if ENTITY_CACHE_LOOKUPS is None:
+        return
+    now = time.monotonic()
+    if now - _published_at < min_interval or not _publish_lock.acquire(blocking=False):
+        return
+    try:
+        _published_at = now
+        from omniflow.core.cache.entity import entity_cache_stats
+        from omniflow.core.db.executor import db_executor_stats
+        from omniflow.agents.langchain_based_agents.base import mcp_manager
+
+        for cache, stats in entity_cache_stats().items():
+            for result in ("hits", "shared_hits", "misses"):
+                ENTITY_CACHE_LOOKUPS.labels(cache, result).set(stats[result])
+        for server, stats in mcp_manager.stats().items():
+            for state in _BREAKER_STATES:
+                MCP_BREAKER_STATE.labels(server, state).set(1 if stats["circuit"] == state else 0)
+        for alias, stats in db_executor_stats().items():
+            DB_EXECUTOR_INFLIGHT.labels(alias).set(stats["inflight"])
+    except Exception as e:
+        logger.warning(f"Publishing process stats failed: {e}")
+    finally:
+        _publish_lock.release()
+
+
+def render_metrics() -> bytes:
+    if Counter is None:
+        return b"# prometheus_client is not installed\n"
+    publish_process_stats(min_interval=0)
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,170 @@
+# core/telemetry/spans.py
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+from .metrics import observe_span
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Span:
+    kind: str  # node / tool / db / llm
+    name: str
+    offset_ms: float  # from the start of the turn
+    duration_ms: float
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def as_trace_entry(self) -> dict:
+        return {
+            "agent": "Trace",
+            "reason": f"{self.kind} {self.name}: {self.duration_ms:.1f} ms",
+            "kind": self.kind,
+            "name": self.name,
+            "offset_ms": self.offset_ms,
+            "duration_ms": self.duration_ms,
+            **self.attrs,
+        }
+
+
+class Trace:
+    """Spans recorded during one supervisor turn (shared by every task and executor thread of the turn)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.started_ns = time.time_ns()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.otel_context = None
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def decision_trace(self) -> List[dict]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.offset_ms)
+        return [s.as_trace_entry() for s in spans]
+
+    def totals(self) -> Dict[str, float]:
+        """Milliseconds per span kind (nested spans are counted in each kind)."""
+        out: Dict[str, float] = {}
+        with self._lock:
+            for s in self.spans:
+                out[s.kind] = round(out.get(s.kind, 0.0) + s.duration_ms, 3)
+        return out
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("omniflow_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def telemetry_enabled() -> bool:
+    """Whether spans are measured at all (for the per-turn trace or for Prometheus)."""
+    return settings.TRACE_ENABLED or settings.METRICS_ENABLED
+
+
+# ---------------- OpenTelemetry (optional) ----------------
+
+_tracer = None
+
+
+def _otel_tracer():
+    global _tracer
+    if _tracer is None:
+        from opentelemetry import trace  # optional: only needed when TRACE_OTEL is set
+
+        _tracer = trace.get_tracer("omniflow")
+    return _tracer
+
+
+def _otel_attrs(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        f"omniflow.{k}": v if isinstance(v, (str, bool, int, float)) else str(v)
+        for k, v in attrs.items()
+        if v is not None
+    }
+
+
+def _export_otel(trace: Trace, kind: str, name: str, started: float, ended: float, attrs: Dict[str, Any]) -> None:
+    try:
+        from opentelemetry import trace as otel_trace
+
+        start_ns = trace.started_ns + int((started - trace.started) * 1e9)
+        end_ns = trace.started_ns + int((ended - trace.started) * 1e9)
+        otel_span = _otel_tracer().start_span(
+            f"{kind} {name}",
+            context=otel_trace.set_span_in_context(trace.otel_context) if trace.otel_context else None,
+            start_time=start_ns,
+            attributes={"omniflow.kind": kind, **_otel_attrs(attrs)},
+        )
+        otel_span.end(end_time=end_ns)
+    except Exception as e:
+        logger.debug(f"OpenTelemetry export failed: {e}")
+
+
+# ---------------- recording ----------------
+
+@contextmanager
+def trace_turn(name: str = "supervisor") -> Iterator[Optional[Trace]]:
+    """Collect spans for one turn; yields None (and costs nothing) when tracing is off."""
+    if not settings.TRACE_ENABLED:
+        yield None
+        return
+
+    trace = Trace(name)
+    token = _current.set(trace)
+    root = None
+    if settings.TRACE_OTEL:
+        try:
+            root = _otel_tracer().start_span(f"turn {name}", start_time=trace.started_ns)
+            trace.otel_context = root
+        except Exception as e:
+            logger.debug(f"OpenTelemetry unavailable: {e}")
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        if root is not None:
+            root.end()
+
+
+def record_span(kind: str, name: str, started: float, ended: float, **attrs) -> None:
+    """Record a finished span; `started`/`ended` are `time.perf_counter()` readings."""
+    if settings.METRICS_ENABLED:
+        observe_span(kind, name, ended - started)
+    trace = _current.get()
+    if trace is None:
+        return
+    trace.add(Span(
+        kind=kind,
+        name=name,
+        offset_ms=round((started - trace.started) * 1000, 3),
+        duration_ms=round((ended - started) * 1000, 3),
+        attrs={k: v for k, v in attrs.items() if v is not None},
+    ))
+    if trace.otel_context is not None:
+        _export_otel(trace, kind, name, started, ended, attrs)
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs) -> Iterator[None]:
+    if not telemetry_enabled():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(kind, name, started, time.perf_counter(), **attrs)
@@ -0,0 +1,19 @@
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import SimpleTestCase
+
+
+def _query_timers(connection):
+    return [w for w in connection.execute_wrappers if w.__qualname__.startswith("_query_timer.")]
+
+
+class QueryTimerInstallTests(SimpleTestCase):
+    def test_reconnecting_keeps_a_single_timer(self):
+        import omniflow.core.telemetry.db  # noqa: F401  (connects the receiver)
+
+        connection = connections.create_connection("default")
+        self.addCleanup(connection.close)
+        for _ in range(4):
+            # What ensure_connection() sends after every close()/reconnect.
+            connection_created.send(sender=connection.__class__, connection=connection)
+        self.assertEqual(len(_query_timers(connection)), 1)
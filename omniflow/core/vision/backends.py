@@ -0,0 +1,217 @@
+# core/vision/backends.py
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings as django_settings
+from PIL import ImageFilter, ImageStat
+
+from omniflow.core.media.phash import hamming_distance
+from omniflow.core.vision.decode import DecodedImage, decode_image
+from omniflow.core.vision.index import get_product_image_index
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+REFERENCE_FILE = re.compile(r"^(?P<product_id>\d+)(?:[_-].*)?\.(?:jpe?g|png|webp)$", re.I)
+
+
+class VisionBackend:
+    """
+    Local (CPU-only) image analysis. Subclasses override `identify`; the
+    image quality checks used for return-proof validation are shared.
+    """
+
+    name = "basic"
+
+    def cache_token(self):
+        """Changes whenever cached results for this backend become stale."""
+        return None
+
+    def analyze(self, img: DecodedImage, query: str) -> dict:
+        gray = img.image.convert("L")
+        brightness = ImageStat.Stat(gray).mean[0]
+        sharpness = ImageStat.Stat(gray.filter(ImageFilter.FIND_EDGES)).stddev[0]
+        usable = 20 <= brightness <= 235 and sharpness >= 8 and min(img.size) >= 64
+
+        return {
+            "description": (
+                f"This appears to be a {img.format} image with dimensions "
+                f"{img.size[0]}x{img.size[1]} pixels. Mode: {img.mode}."
+            ),
+            "format": img.format,
+            "size": img.size,
+            "mode": img.mode,
+            "quality": {
+                "brightness": round(brightness, 1),
+                "sharpness": round(sharpness, 1),
+                "usable_as_return_proof": usable,
+            },
+            "query_response": (
+                f"Based on the image and your query '{query}', the image is "
+                + ("clear enough to use as return proof." if usable else "too dark, blurry or small to use as return proof.")
+            ),
+        }
+
+    def match(self, img: DecodedImage, k: int = 5, product_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        return []
+
+    def is_match(self, candidate: dict) -> bool:
+        return False
+
+    def identify(self, img: DecodedImage) -> dict:
+        # Nothing to compare against: report no match rather than guess from the image size.
+        return {
+            "product_type": "Unknown",
+            "product_id": None,
+            "confidence": 0.0,
+            "image_size": f"{img.size[0]}x{img.size[1]}",
+            "suggested_products": [],
+            "note": "No product reference images are configured, so the product cannot be identified.",
+        }
+
+
+class PerceptualHashBackend(VisionBackend):
+    """
+    Match photos against product reference images by perceptual hash.
+
+    Reference images live in VISION_REFERENCE_DIR (default
+    <MEDIA_ROOT>/product_images) and are named `<product_id>[_suffix].<ext>`.
+    """
+
+    name = "phash"
+
+    def __init__(self, reference_dir: Optional[Path] = None):
+        self._reference_dir = reference_dir
+        self._references: Optional[List[dict]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def reference_dir(self) -> Path:
+        if self._reference_dir:
+            return Path(self._reference_dir)
+        if settings.VISION_REFERENCE_DIR:
+            return Path(settings.VISION_REFERENCE_DIR)
+        return Path(django_settings.MEDIA_ROOT) / "product_images"
+
+    def _product_names(self, product_ids: List[int]) -> Dict[int, str]:
+        from omniflow.shopcore.models import Product
+
+        try:
+            return dict(
+                Product.objects.using("shopcore")
+                .filter(id__in=product_ids)
+                .values_list("id", "name")
+            )
+        except Exception:
+            logger.warning("Could not load product names for vision references", exc_info=True)
+            return {}
+
+    def references(self) -> List[dict]:
+        with self._lock:
+            if self._references is not None:
+                return self._references
+
+            refs = []
+            directory = self.reference_dir
+            for path in sorted(directory.glob("*")) if directory.is_dir() else []:
+                m = REFERENCE_FILE.match(path.name)
+                if not m:
+                    continue
+                try:
+                    decoded = decode_image(path.read_bytes())
+                except Exception:
+                    logger.warning(f"Skipping unreadable reference image {path}")
+                    continue
+                refs.append({"product_id": int(m.group("product_id")), "dhash": decoded.dhash})
+
+            names = self._product_names(sorted({r["product_id"] for r in refs}))
+            for r in refs:
+                r["product_name"] = names.get(r["product_id"])
+
+            logger.info(f"Loaded {len(refs)} product reference image(s) from {directory}")
+            self._references = refs
+            return refs
+
+    def match(self, img: DecodedImage, k: int = 5, product_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        allowed = set(product_ids) if product_ids is not None else None
+        best: Dict[int, dict] = {}
+        for ref in self.references():
+            if allowed is not None and ref["product_id"] not in allowed:
+                continue
+            distance = hamming_distance(img.dhash, ref["dhash"])
+            current = best.get(ref["product_id"])
+            if current is None or distance < current["distance"]:
+                best[ref["product_id"]] = {
+                    "product_id": ref["product_id"],
+                    "product_name": ref["product_name"],
+                    "distance": distance,
+                    "score": round(1 - distance / 64, 4),
+                }
+        return sorted(best.values(), key=lambda r: r["distance"])[:k]
+
+    def is_match(self, candidate: dict) -> bool:
+        return candidate["distance"] <= settings.VISION_MATCH_MAX_DISTANCE
+
+    def identify(self, img: DecodedImage) -> dict:
+        ranked = self.match(img, k=3)
+        if not ranked:
+            return super().identify(img)
+
+        top = ranked[0]
+        matched = self.is_match(top)
+        return {
+            "product_type": top["product_name"] if matched else "Unknown",
+            "product_id": top["product_id"] if matched else None,
+            "confidence": round(max(0.0, top["score"]), 2) if matched else 0.0,
+            "image_size": f"{img.size[0]}x{img.size[1]}",
+            "suggested_products": [r["product_name"] for r in ranked if r.get("product_name")],
+            "note": self.match_note,
+        }
+
+    match_note = "Matched against product reference images by perceptual hash."
+
+
+class EmbeddingIndexBackend(PerceptualHashBackend):
+    """
+    Cosine top-k over the memory-mapped product image index built by
+    `manage.py build_product_image_index`. Falls back to perceptual-hash
+    matching until the index exists.
+    """
+
+    name = "index"
+    match_note = "Matched against the product image index."
+
+    def cache_token(self):
+        index = get_product_image_index()
+        return id(index) if index is not None else None
+
+    def match(self, img: DecodedImage, k: int = 5, product_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        index = get_product_image_index()
+        if index is None:
+            return super().match(img, k=k, product_ids=product_ids)
+        return index.search(img, k=k, product_ids=product_ids)
+
+    def is_match(self, candidate: dict) -> bool:
+        if "distance" in candidate:
+            return super().is_match(candidate)
+        return candidate["score"] >= settings.VISION_INDEX_MIN_SCORE
+
+
+VISION_BACKENDS = {
+    VisionBackend.name: VisionBackend,
+    PerceptualHashBackend.name: PerceptualHashBackend,
+    EmbeddingIndexBackend.name: EmbeddingIndexBackend,
+}
+
+_backend: Optional[VisionBackend] = None
+
+
+def get_vision_backend() -> VisionBackend:
+    global _backend
+    if _backend is None:
+        backend_cls = VISION_BACKENDS.get(settings.VISION_BACKEND.lower(), EmbeddingIndexBackend)
+        _backend = backend_cls()
+    return _backend
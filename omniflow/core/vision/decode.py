@@ -0,0 +1,75 @@
+# core/vision/decode.py
+import base64
+import hashlib
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from PIL import Image
+
+from omniflow.core.media.phash import dhash
+from omniflow.utils.cache import LRUCache
+from omniflow.utils.config import settings
+
+DATA_URL_PREFIX = re.compile(r"^data:[^;,]*;base64,", re.I)
+
+# Longest side of the working copy kept in the cache. Analysis and matching
+# never need more than this, and it bounds cache memory per entry.
+WORKING_SIDE = 512
+
+
+@dataclass
+class DecodedImage:
+    sha256: str
+    format: Optional[str]
+    size: tuple
+    mode: str
+    image: Image.Image
+    _features: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def dhash(self) -> int:
+        if "dhash" not in self._features:
+            self._features["dhash"] = dhash(self.image)
+        return self._features["dhash"]
+
+
+_decoded = LRUCache(maxsize=settings.VISION_CACHE_SIZE)
+
+
+def image_bytes(data: Union[str, bytes]) -> bytes:
+    """Accept raw bytes, a base64 string or a data URL."""
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    return base64.b64decode(DATA_URL_PREFIX.sub("", (data or "").strip()))
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _decode(raw: bytes, sha256: str) -> DecodedImage:
+    image = Image.open(io.BytesIO(raw))
+    fmt, size, mode = image.format, image.size, image.mode
+
+    working = image.convert("RGB")
+    working.thumbnail((WORKING_SIDE, WORKING_SIDE), Image.Resampling.BILINEAR)
+    return DecodedImage(sha256=sha256, format=fmt, size=size, mode=mode, image=working)
+
+
+def decode_image(data: Union[str, bytes], sha256: Optional[str] = None) -> DecodedImage:
+    """
+    Decode an image once per content hash.
+
+    `sha256` may be passed when it is already known (e.g. uploaded return
+    media) to skip re-hashing the payload.
+    """
+    if sha256:
+        cached = _decoded.get(sha256)
+        if cached is not None:
+            return cached
+
+    raw = image_bytes(data)
+    key = sha256 or content_hash(raw)
+    return _decoded.get_or_set(key, lambda: _decode(raw, key))
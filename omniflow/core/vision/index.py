@@ -0,0 +1,194 @@
+# core/vision/index.py
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings as django_settings
+from PIL import Image
+
+from omniflow.core.vision.decode import DecodedImage
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+THUMB_SIDE = 16
+HIST_BINS = 4
+EMBEDDING_DIM = THUMB_SIDE * THUMB_SIDE + HIST_BINS ** 3
+
+
+def embed(img: DecodedImage) -> np.ndarray:
+    """
+    Cheap CPU embedding: a zero-mean 16x16 grayscale thumbnail (layout) plus a
+    4x4x4 RGB colour histogram, L2-normalised so a dot product is cosine
+    similarity.
+    """
+    gray = np.asarray(
+        img.image.convert("L").resize((THUMB_SIDE, THUMB_SIDE), Image.Resampling.BILINEAR),
+        dtype=np.float32,
+    ).ravel()
+    gray -= gray.mean()
+    gray /= np.linalg.norm(gray) or 1.0
+
+    rgb = np.asarray(img.image, dtype=np.uint8).reshape(-1, 3) // (256 // HIST_BINS)
+    bins = rgb[:, 0].astype(np.int32) * HIST_BINS * HIST_BINS + rgb[:, 1] * HIST_BINS + rgb[:, 2]
+    hist = np.bincount(bins, minlength=HIST_BINS ** 3).astype(np.float32)
+    hist /= np.linalg.norm(hist) or 1.0
+
+    vec = np.concatenate([gray, hist])
+    return vec / (np.linalg.norm(vec) or 1.0)
+
+
+def default_index_path() -> Path:
+    if settings.VISION_INDEX_PATH:
+        return Path(settings.VISION_INDEX_PATH)
+    return Path(django_settings.MEDIA_ROOT) / "product_images" / "index"
+
+
+class ProductImageIndex:
+    """
+    Product image embeddings stored as one version directory per build,
+    `<path>.versions/<version>/` holding `vectors.npy` (float32, one row per
+    reference image) and `rows.json` (the product of each row), plus a
+    `<path>.current` pointer naming the live version. The matrix is
+    memory-mapped, so loading is O(1) and the pages are shared between
+    worker processes.
+    """
+
+    def __init__(self, vectors: np.ndarray, rows: List[dict]):
+        self.vectors = vectors
+        self.rows = rows
+        self.product_ids = np.asarray([r["product_id"] for r in rows], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def pointer(path: Path) -> Path:
+        return Path(path).with_suffix(".current")
+
+    @staticmethod
+    def versions_dir(path: Path) -> Path:
+        return Path(path).with_suffix(".versions")
+
+    @classmethod
+    def files(cls, path: Path, version: str) -> Tuple[Path, Path]:
+        version_dir = cls.versions_dir(path) / version
+        return version_dir / "vectors.npy", version_dir / "rows.json"
+
+    @classmethod
+    def current_version(cls, path: Path) -> Optional[str]:
+        try:
+            return cls.pointer(path).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[int, Optional[str], DecodedImage]]) -> "ProductImageIndex":
+        rows, vectors = [], []
+        for product_id, product_name, img in items:
+            rows.append({"product_id": product_id, "product_name": product_name})
+            vectors.append(embed(img))
+        matrix = np.vstack(vectors) if vectors else np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        return cls(matrix.astype(np.float32), rows)
+
+    def save(self, path: Path) -> str:
+        """Write a new version and swap the pointer to it; returns the version."""
+        root = self.versions_dir(path)
+        previous = self.current_version(path)
+        version = f"{time.time_ns():x}"
+
+        # Both files land in a fresh directory that nothing reads yet; the
+        # single pointer swap then publishes vectors and rows together.
+        tmp_dir = root / f".{version}.tmp"
+        tmp_dir.mkdir(parents=True)
+        with (tmp_dir / "vectors.npy").open("wb") as f:
+            np.save(f, self.vectors)
+        (tmp_dir / "rows.json").write_text(json.dumps({"dim": EMBEDDING_DIM, "rows": self.rows}), encoding="utf-8")
+        os.replace(tmp_dir, root / version)
+
+        pointer = self.pointer(path)
+        tmp_pointer = pointer.with_suffix(".current.tmp")
+        tmp_pointer.write_text(version, encoding="utf-8")
+        os.replace(tmp_pointer, pointer)
+
+        # Keep the previous version for processes that read the old pointer
+        # a moment ago; anything older is unreachable.
+        for old in root.iterdir():
+            if old.name not in (version, previous):
+                shutil.rmtree(old, ignore_errors=True)
+        return version
+
+    @classmethod
+    def load(cls, path: Path, version: Optional[str] = None) -> Optional["ProductImageIndex"]:
+        version = version or cls.current_version(path)
+        if not version:
+            return None
+        npy_path, json_path = cls.files(path, version)
+        if not npy_path.exists() or not json_path.exists():
+            return None
+
+        meta = json.loads(json_path.read_text(encoding="utf-8"))
+        if meta.get("dim") != EMBEDDING_DIM:
+            logger.warning(f"Ignoring product image index {npy_path}: built with dim={meta.get('dim')}")
+            return None
+
+        vectors = np.load(npy_path, mmap_mode="r")
+        if vectors.shape[0] != len(meta["rows"]):
+            logger.warning(f"Ignoring product image index {npy_path}: row count mismatch")
+            return None
+        return cls(vectors, meta["rows"])
+
+    def search(self, img: DecodedImage, k: int = 5, product_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """
+        Cosine top-k, best score per product. `product_ids` restricts the
+        search (e.g. to products the customer actually ordered).
+        """
+        if not len(self):
+            return []
+
+        scores = np.asarray(self.vectors @ embed(img))
+        if product_ids is not None:
+            allowed = np.isin(self.product_ids, np.fromiter(product_ids, dtype=np.int64))
+            scores = np.where(allowed, scores, -np.inf)
+
+        results, seen = [], set()
+        for row in np.argsort(-scores):
+            if not np.isfinite(scores[row]) or len(results) >= k:
+                break
+            meta = self.rows[row]
+            if meta["product_id"] in seen:
+                continue
+            seen.add(meta["product_id"])
+            results.append({**meta, "score": round(float(scores[row]), 4)})
+        return results
+
+
+_index: Optional[ProductImageIndex] = None
+_index_version: Optional[str] = None
+_index_lock = threading.Lock()
+
+
+def get_product_image_index() -> Optional[ProductImageIndex]:
+    """Process-wide index, re-mapped when the command publishes a new version."""
+    global _index, _index_version
+    path = default_index_path()
+    version = ProductImageIndex.current_version(path)
+    if version is None:
+        return None
+
+    with _index_lock:
+        if _index is None or _index_version != version:
+            index = ProductImageIndex.load(path, version)
+            if index is None:
+                # Not cached: the next call retries (e.g. a version pruned
+                # between reading the pointer and loading it).
+                return None
+            _index, _index_version = index, version
+            logger.info(f"Mapped product image index ({len(index)} rows, version {version}) from {ProductImageIndex.versions_dir(path)}")
+        return _index
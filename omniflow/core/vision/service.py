@@ -0,0 +1,81 @@
+# core/vision/service.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Union
+
+from omniflow.core.vision.backends import get_vision_backend
+from omniflow.core.vision.decode import decode_image
+from omniflow.utils.cache import LRUCache
+from omniflow.utils.config import settings
+
+# Results are cached per (backend, index version, operation, content hash,
+# query); the decoded image itself is cached separately in decode.py.
+_results = LRUCache(maxsize=settings.VISION_CACHE_SIZE)
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(
+            max_workers=max(1, settings.VISION_WORKERS),
+            thread_name_prefix="vision",
+        )
+    return _EXECUTOR
+
+
+def analyze_image(data: Union[str, bytes], query: str = "", sha256: Optional[str] = None) -> dict:
+    backend = get_vision_backend()
+    img = decode_image(data, sha256=sha256)
+    key = (backend.name, backend.cache_token(), "analyze", img.sha256, query)
+    return _results.get_or_set(key, lambda: backend.analyze(img, query))
+
+
+def identify_product(data: Union[str, bytes], sha256: Optional[str] = None) -> dict:
+    backend = get_vision_backend()
+    img = decode_image(data, sha256=sha256)
+    key = (backend.name, backend.cache_token(), "identify", img.sha256, None)
+    return _results.get_or_set(key, lambda: backend.identify(img))
+
+
+def match_products(
+    data: Union[str, bytes],
+    k: int = 5,
+    product_ids: Optional[Iterable[int]] = None,
+    sha256: Optional[str] = None,
+) -> List[dict]:
+    """Ranked candidate products for an image, optionally restricted to `product_ids`."""
+    backend = get_vision_backend()
+    img = decode_image(data, sha256=sha256)
+    return backend.match(img, k=k, product_ids=product_ids)
+
+
+def is_confident_match(candidate: dict) -> bool:
+    return get_vision_backend().is_match(candidate)
+
+
+def _safe(fn, *args) -> dict:
+    try:
+        return fn(*args)
+    except Exception as e:
+        return {"error": f"Failed to process image: {e}"}
+
+
+async def identify_products_batch(images: List[Union[str, bytes]]) -> List[dict]:
+    """Identify several images concurrently on the vision worker pool, preserving order."""
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    return list(await asyncio.gather(*[
+        loop.run_in_executor(executor, _safe, identify_product, data)
+        for data in images
+    ]))
+
+
+async def analyze_images_batch(images: List[Union[str, bytes]], query: str = "") -> List[dict]:
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    return list(await asyncio.gather(*[
+        loop.run_in_executor(executor, _safe, analyze_image, data, query)
+        for data in images
+    ]))
@@ -0,0 +1,54 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from omniflow.core.vision import index as index_module
+from omniflow.core.vision.index import EMBEDDING_DIM, ProductImageIndex, get_product_image_index
+from omniflow.utils.config import settings
+
+
+def _index(product_ids):
+    vectors = np.eye(len(product_ids), EMBEDDING_DIM, dtype=np.float32)
+    return ProductImageIndex(vectors, [{"product_id": pid, "product_name": f"P{pid}"} for pid in product_ids])
+
+
+class ProductImageIndexVersionTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "index"
+        for patcher in (
+            mock.patch.object(settings, "VISION_INDEX_PATH", str(self.path)),
+            mock.patch.object(index_module, "_index", None),
+            mock.patch.object(index_module, "_index_version", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_rebuild_publishes_vectors_and_rows_together(self):
+        _index([1, 2]).save(self.path)
+        self.assertEqual(get_product_image_index().product_ids.tolist(), [1, 2])
+
+        _index([3, 4, 5]).save(self.path)
+        loaded = get_product_image_index()
+        self.assertEqual(loaded.product_ids.tolist(), [3, 4, 5])
+        self.assertEqual(loaded.vectors.shape[0], 3)
+
+    def test_old_versions_are_pruned_but_the_previous_one_kept(self):
+        first = _index([1]).save(self.path)
+        second = _index([2]).save(self.path)
+        third = _index([3]).save(self.path)
+        versions = {p.name for p in ProductImageIndex.versions_dir(self.path).iterdir()}
+        self.assertEqual(versions, {second, third})
+        self.assertNotIn(first, versions)
+
+    def test_failed_load_is_not_cached(self):
+        version = _index([1]).save(self.path)
+        ProductImageIndex.pointer(self.path).write_text("missing", encoding="utf-8")
+        self.assertIsNone(get_product_image_index())
+
+        ProductImageIndex.pointer(self.path).write_text(version, encoding="utf-8")
+        self.assertEqual(get_product_image_index().product_ids.tolist(), [1])
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class Customer360Config(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'omniflow.customer360'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the projection's model signals)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from omniflow.customer360 import projector
+
+
+class Command(BaseCommand):
+    help = "Rebuild the customer-360 projection from the ShopCore, ShipStream, PayGuard and CareDesk databases"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Orders projected per batch (default: 500)")
+        parser.add_argument(
+            "--truncate",
+            action="store_true",
+            help="Delete every projection row first (drops rows for orders that no longer exist)",
+        )
+
+    def handle(self, *args, **options):
+        total = projector.rebuild(
+            batch_size=options["batch_size"],
+            truncate=options["truncate"],
+            progress=lambda n: self.stdout.write(f"  {n} orders projected"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Projected {total} orders into customer360"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerOrder',
+            fields=[
+                ('order_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_date', models.DateField(blank=True, null=True)),
+                ('order_status', models.CharField(blank=True, default='', max_length=30)),
+                ('user_id', models.BigIntegerField(db_index=True)),
+                ('user_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('user_name', models.CharField(blank=True, default='', max_length=100)),
+                ('product_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('product_name', models.CharField(blank=True, default='', max_length=100)),
+                ('shipment_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('tracking_number', models.CharField(blank=True, db_index=True, default='', max_length=50)),
+                ('shipment_status', models.CharField(blank=True, default='', max_length=50)),
+                ('estimated_arrival', models.DateField(blank=True, null=True)),
+                ('current_location', models.CharField(blank=True, default='', max_length=100)),
+                ('last_event', models.CharField(blank=True, default='', max_length=100)),
+                ('last_event_at', models.DateTimeField(blank=True, null=True)),
+                ('debit_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('debit_at', models.DateTimeField(blank=True, null=True)),
+                ('ticket_id', models.BigIntegerField(blank=True, null=True)),
+                ('ticket_status', models.CharField(blank=True, default='', max_length=30)),
+                ('ticket_issue_type', models.CharField(blank=True, default='', max_length=50)),
+                ('ticket_created_at', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_email', '-order_date'], name='c360_user_email_date')],
+            },
+        ),
+    ]
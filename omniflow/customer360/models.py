@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class CustomerOrder(models.Model):
+    """
+    Read-only customer-360 projection: one denormalized row per ShopCore
+    order with its user, product, latest shipment, debit and latest ticket.
+
+    Lives in the default database (the domain databases stay isolated) and
+    is written only by `omniflow.customer360.projector`.
+    """
+
+    order_id = models.BigIntegerField(primary_key=True)
+    order_date = models.DateField(null=True, blank=True)
+    order_status = models.CharField(max_length=30, blank=True, default="")
+
+    user_id = models.BigIntegerField(db_index=True)
+    user_email = models.EmailField(null=True, blank=True)
+    user_name = models.CharField(max_length=100, blank=True, default="")
+
+    product_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    product_name = models.CharField(max_length=100, blank=True, default="")
+
+    shipment_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    tracking_number = models.CharField(max_length=50, blank=True, default="", db_index=True)
+    shipment_status = models.CharField(max_length=50, blank=True, default="")
+    estimated_arrival = models.DateField(null=True, blank=True)
+    current_location = models.CharField(max_length=100, blank=True, default="")
+    last_event = models.CharField(max_length=100, blank=True, default="")
+    last_event_at = models.DateTimeField(null=True, blank=True)
+
+    debit_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    debit_at = models.DateTimeField(null=True, blank=True)
+
+    ticket_id = models.BigIntegerField(null=True, blank=True)
+    ticket_status = models.CharField(max_length=30, blank=True, default="")
+    ticket_issue_type = models.CharField(max_length=50, blank=True, default="")
+    ticket_created_at = models.DateTimeField(null=True, blank=True)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_email", "-order_date"], name="c360_user_email_date"),
+        ]
+
+    def __str__(self):
+        return f"Order {self.order_id} ({self.user_email})"
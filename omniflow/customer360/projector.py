@@ -0,0 +1,224 @@
+import time
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+
+from omniflow.caredesk.models import Ticket
+from omniflow.payguard.models import Transaction
+from omniflow.shipstream.models import Shipment, TrackingEvent, Warehouse
+from omniflow.shopcore.models import Order
+from omniflow.utils.logging import get_logger
+
+from .models import CustomerOrder
+
+logger = get_logger(__name__)
+
+PROJECTED_FIELDS = [
+    f.name for f in CustomerOrder._meta.concrete_fields if f.name not in ("order_id", "refreshed_at")
+] + ["refreshed_at"]
+
+
+def _latest_by(rows: Iterable, key) -> Dict:
+    """Last row per key; callers pass rows in ascending recency."""
+    out = {}
+    for row in rows:
+        out[key(row)] = row
+    return out
+
+
+def build_rows(order_ids: List[int]) -> List[CustomerOrder]:
+    """
+    Project a batch of orders, one query per source table regardless of
+    batch size: orders (+user, +product), shipments, latest tracking events,
+    debits and tickets.
+    """
+    orders = list(
+        Order.objects.using("shopcore")
+        .select_related("user", "product")
+        .filter(id__in=order_ids)
+    )
+    if not orders:
+        return []
+    ids = [o.id for o in orders]
+
+    shipments = _latest_by(
+        Shipment.objects.using("shipstream").filter(order_id__in=ids).order_by("id"),
+        key=lambda s: s.order_id,
+    )
+    events = _latest_by(
+        TrackingEvent.objects.using("shipstream")
+        .filter(shipment_id__in=[s.id for s in shipments.values()])
+        .order_by("timestamp", "id"),
+        key=lambda e: e.shipment_id,
+    )
+    locations = dict(
+        Warehouse.objects.using("shipstream")
+        .filter(id__in={e.warehouse_id for e in events.values()})
+        .values_list("id", "location")
+    )
+    debits = _latest_by(
+        Transaction.objects.using("payguard")
+        .filter(order_id__in=ids, type__iexact="Debit")
+        .order_by("timestamp", "id"),
+        key=lambda t: t.order_id,
+    )
+    tickets = _latest_by(
+        Ticket.objects.using("caredesk")
+        .filter(reference_id__in=[str(i) for i in ids])
+        .order_by("created_at", "id"),
+        key=lambda t: t.reference_id,
+    )
+
+    rows = []
+    for order in orders:
+        user, product = order.user, order.product
+        shipment = shipments.get(order.id)
+        event = events.get(shipment.id) if shipment else None
+        debit = debits.get(order.id)
+        ticket = tickets.get(str(order.id))
+        rows.append(CustomerOrder(
+            order_id=order.id,
+            order_date=order.order_date,
+            order_status=order.status or "",
+            user_id=order.user_id,
+            user_email=(user.email or "").strip().lower() or None,
+            user_name=user.name or "",
+            product_id=order.product_id,
+            product_name=product.name if product else "",
+            shipment_id=shipment.id if shipment else None,
+            tracking_number=shipment.tracking_number if shipment else "",
+            shipment_status=shipment.status if shipment else "",
+            estimated_arrival=shipment.estimated_arrival if shipment else None,
+            current_location=locations.get(event.warehouse_id, "") if event else "",
+            last_event=event.status_update if event else "",
+            last_event_at=event.timestamp if event else None,
+            debit_amount=debit.amount if debit else None,
+            debit_at=debit.timestamp if debit else None,
+            ticket_id=ticket.id if ticket else None,
+            ticket_status=ticket.status if ticket else "",
+            ticket_issue_type=ticket.issue_type if ticket else "",
+            ticket_created_at=ticket.created_at if ticket else None,
+        ))
+    return rows
+
+
+def refresh_orders(order_ids: Iterable[Optional[int]]) -> int:
+    """Recompute the projection rows for `order_ids`; rows for deleted orders are dropped."""
+    ids = sorted({int(i) for i in order_ids if i is not None})
+    if not ids:
+        return 0
+    rows = build_rows(ids)
+    with transaction.atomic(using="default"):
+        if rows:
+            CustomerOrder.objects.using("default").bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["order_id"],
+                update_fields=PROJECTED_FIELDS,
+            )
+        gone = set(ids) - {r.order_id for r in rows}
+        if gone:
+            CustomerOrder.objects.using("default").filter(order_id__in=gone).delete()
+    return len(rows)
+
+
+def update_user(user_id: int, email: Optional[str], name: str) -> int:
+    return CustomerOrder.objects.using("default").filter(user_id=user_id).update(
+        user_email=(email or "").strip().lower() or None,
+        user_name=name or "",
+    )
+
+
+def update_product(product_id: int, name: str) -> int:
+    return CustomerOrder.objects.using("default").filter(product_id=product_id).update(product_name=name or "")
+
+
+def rebuild(batch_size: int = 500, truncate: bool = False, progress=None) -> int:
+    """Backfill or repair the whole projection from the domain databases."""
+    started = time.perf_counter()
+    if truncate:
+        CustomerOrder.objects.using("default").all().delete()
+
+    total = 0
+    last_id = 0
+    while True:
+        ids = list(
+            Order.objects.using("shopcore")
+            .filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        total += refresh_orders(ids)
+        last_id = ids[-1]
+        if progress:
+            progress(total)
+
+    logger.info(f"customer360 rebuilt: {total} orders in {time.perf_counter() - started:.2f}s")
+    return total
+
+
+# ---------------- reads ----------------
+
+def find_order(user_email: str, product_id: Optional[int] = None) -> Optional[CustomerOrder]:
+    """
+    The customer's latest order (optionally for one product), from one indexed
+    read. Resolve a product name with `shopcore.services.first_product_matching`
+    first, as the live lookup does, so both paths pick the same order.
+    """
+    email = (user_email or "").strip().lower()
+    if not email:
+        return None
+    qs = CustomerOrder.objects.using("default").filter(user_email=email)
+    if product_id is not None:
+        qs = qs.filter(product_id=product_id)
+    return qs.order_by("-order_date", "-order_id").first()
+
+
+def order_facts(row: CustomerOrder) -> Dict[str, dict]:
+    """The same fact sections the live lookups produce, built from one projection row."""
+    ticket_key = (row.ticket_status or "").lower().replace("-", " ").replace("_", " ").strip()
+    return {
+        "shopcore": {
+            "found": True,
+            "user_id": row.user_id,
+            "product_id": row.product_id,
+            "product_name": row.product_name,
+            "order_id": row.order_id,
+            "order_date": str(row.order_date),
+            "order_status": row.order_status,
+        },
+        "shipstream": {
+            "found": True,
+            "order_id": row.order_id,
+            "shipment_id": row.shipment_id,
+            "tracking_number": row.tracking_number,
+            "shipment_status": row.shipment_status,
+            "current_location": row.current_location or None,
+            # The projection keeps the latest event only; the live path returns ten.
+            "events": [{
+                "timestamp": str(row.last_event_at),
+                "status_update": row.last_event,
+                "location": row.current_location or None,
+            }] if row.last_event_at else [],
+        } if row.shipment_id else {
+            "found": False,
+            "reason": "shipment_not_found_for_order",
+            "order_id": row.order_id,
+        },
+        "caredesk": {
+            "found": True,
+            "ticket_id": row.ticket_id,
+            "status": row.ticket_status,
+            "issue_type": row.ticket_issue_type,
+            "created_at": str(row.ticket_created_at),
+            "reference_id": str(row.order_id),
+            "assigned": ticket_key in {"assigned", "in progress", "inprogress"},
+        } if row.ticket_id else {
+            "found": False,
+            "reason": "ticket_not_found",
+            "user_id": row.user_id,
+            "order_id": row.order_id,
+        },
+    }
@@ -0,0 +1,122 @@
+from typing import Optional
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from omniflow.caredesk.models import Ticket
+from omniflow.payguard.models import Transaction
+from omniflow.shipstream.models import Shipment, TrackingEvent
+from omniflow.shopcore.models import Order, Product, User
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+from . import projector
+
+logger = get_logger(__name__)
+
+# Order ids touched by the open transaction on each connection, with the
+# on_commit callback that will refresh them, so a seed or bulk edit
+# refreshes each order a single time. Kept on the connection rather than
+# beside it: a rollback discards the callback, and the next write must
+# register a new one instead of adding to a set nothing will flush.
+_PENDING_ATTR = "_customer360_pending"
+
+
+def _refresh(ids: set) -> None:
+    if not ids:
+        return
+    try:
+        projector.refresh_orders(ids)
+    except DatabaseError as e:
+        # The projection is derived data; `rebuild_customer360` repairs it.
+        logger.warning(f"customer360 refresh of {len(ids)} orders failed: {e}")
+
+
+def _schedule(order_id: Optional[int], using: str) -> None:
+    if not settings.CUSTOMER360_ENABLED or order_id is None:
+        return
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        # Autocommit: the write is already committed.
+        _refresh({order_id})
+        return
+
+    pending = getattr(connection, _PENDING_ATTR, None)
+    if pending is not None:
+        ids, callback, index = pending
+        callbacks = connection.run_on_commit
+        # Still registered for this transaction (rolled-back blocks drop theirs).
+        if index < len(callbacks) and callbacks[index][1] is callback:
+            ids.add(order_id)
+            return
+
+    ids = {order_id}
+
+    def callback():
+        _refresh(ids)
+
+    transaction.on_commit(callback, using=using)
+    setattr(connection, _PENDING_ATTR, (ids, callback, len(connection.run_on_commit) - 1))
+
+
+def _run(fn, *args) -> None:
+    if not settings.CUSTOMER360_ENABLED:
+        return
+    try:
+        fn(*args)
+    except DatabaseError as e:
+        logger.warning(f"customer360 {fn.__name__} failed: {e}")
+
+
+@receiver(post_save, sender=Order, dispatch_uid="customer360:order")
+@receiver(post_delete, sender=Order, dispatch_uid="customer360:order_delete")
+def _order_changed(sender, instance, using, **kwargs):
+    _schedule(instance.pk, using)
+
+
+@receiver(post_save, sender=User, dispatch_uid="customer360:user")
+def _user_changed(sender, instance, using, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: _run(projector.update_user, instance.pk, instance.email, instance.name), using=using)
+
+
+@receiver(post_save, sender=Product, dispatch_uid="customer360:product")
+def _product_changed(sender, instance, using, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: _run(projector.update_product, instance.pk, instance.name), using=using)
+
+
+@receiver(post_save, sender=Shipment, dispatch_uid="customer360:shipment")
+@receiver(post_delete, sender=Shipment, dispatch_uid="customer360:shipment_delete")
+def _shipment_changed(sender, instance, using, **kwargs):
+    _schedule(instance.order_id, using)
+
+
+@receiver(post_save, sender=TrackingEvent, dispatch_uid="customer360:tracking_event")
+@receiver(post_delete, sender=TrackingEvent, dispatch_uid="customer360:tracking_event_delete")
+def _tracking_event_changed(sender, instance, using, **kwargs):
+    if not settings.CUSTOMER360_ENABLED:
+        return
+    order_id = (
+        Shipment.objects.using(using)
+        .filter(id=instance.shipment_id)
+        .values_list("order_id", flat=True)
+        .first()
+    )
+    _schedule(order_id, using)
+
+
+@receiver(post_save, sender=Transaction, dispatch_uid="customer360:transaction")
+@receiver(post_delete, sender=Transaction, dispatch_uid="customer360:transaction_delete")
+def _transaction_changed(sender, instance, using, **kwargs):
+    if (instance.type or "").lower() == "debit":
+        _schedule(instance.order_id, using)
+
+
+@receiver(post_save, sender=Ticket, dispatch_uid="customer360:ticket")
+@receiver(post_delete, sender=Ticket, dispatch_uid="customer360:ticket_delete")
+def _ticket_changed(sender, instance, using, **kwargs):
+    ref = str(instance.reference_id or "").strip()
+    if ref.isdigit():
+        _schedule(int(ref), using)
@@ -0,0 +1,88 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from omniflow.customer360.models import CustomerOrder
+from omniflow.customer360.projector import find_order
+from omniflow.payguard.models import Transaction, Wallet
+from omniflow.shopcore.models import Order, Product, User
+from omniflow.shopcore.services import first_product_matching, order_for_user_product
+
+
+class ProjectionSignalTests(TransactionTestCase):
+    # on_commit callbacks only run for real commits, so no TestCase wrapping.
+    databases = {"default", "shopcore", "shipstream", "payguard", "caredesk"}
+
+    def setUp(self):
+        self.user = User.objects.using("shopcore").create(name="Asha", email="asha@example.com")
+        self.product = product = Product.objects.using("shopcore").create(name="Desk Lamp", category="Home", price=Decimal("25.00"))
+        self.order = Order.objects.using("shopcore").create(
+            user=self.user, product=product, order_date=date(2024, 5, 1), status="Placed",
+        )
+        self.wallet = Wallet.objects.using("payguard").create(user_id=self.user.id, balance=Decimal("100.00"), currency="INR")
+
+    def debit(self, amount):
+        return Transaction.objects.using("payguard").create(
+            wallet=self.wallet, order_id=self.order.id, amount=Decimal(amount), type="Debit",
+        )
+
+    def projected_debit(self):
+        return CustomerOrder.objects.using("default").get(order_id=self.order.id).debit_amount
+
+    def test_order_write_refreshes_projection(self):
+        self.assertTrue(CustomerOrder.objects.using("default").filter(order_id=self.order.id).exists())
+
+    def test_committed_write_after_rollback_still_refreshes(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic(using="payguard"):
+                self.debit("10.00")
+                raise RuntimeError("roll back")
+        self.assertIsNone(self.projected_debit())
+
+        with transaction.atomic(using="payguard"):
+            self.debit("20.00")
+        self.assertEqual(self.projected_debit(), Decimal("20.00"))
+
+    def test_autocommit_write_after_rollback_refreshes(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic(using="payguard"):
+                self.debit("10.00")
+                raise RuntimeError("roll back")
+
+        self.debit("30.00")
+        self.assertEqual(self.projected_debit(), Decimal("30.00"))
+
+    def test_rolled_back_savepoint_keeps_outer_writes(self):
+        with transaction.atomic(using="payguard"):
+            try:
+                with transaction.atomic(using="payguard"):
+                    self.debit("10.00")
+                    raise RuntimeError("roll back savepoint")
+            except RuntimeError:
+                pass
+            self.debit("40.00")
+        self.assertEqual(self.projected_debit(), Decimal("40.00"))
+
+    def projected_order_id(self, product_name):
+        product = first_product_matching(product_name)
+        row = find_order(self.user.email, product.id) if product else None
+        return row.order_id if row else None
+
+    def test_projection_picks_the_same_order_as_the_live_lookup(self):
+        pro = Product.objects.using("shopcore").create(name="Desk Lamp Pro", category="Home", price=Decimal("60.00"))
+        Order.objects.using("shopcore").create(user=self.user, product=pro, order_date=date(2024, 6, 1), status="Placed")
+
+        live = order_for_user_product(self.user.email, "desk lamp")
+        self.assertEqual(live["order_id"], self.order.id)
+        self.assertEqual(self.projected_order_id("desk lamp"), self.order.id)
+
+    def test_projection_has_no_answer_when_the_live_lookup_finds_no_order(self):
+        other = User.objects.using("shopcore").create(name="Ravi", email="ravi@example.com")
+        pro = Product.objects.using("shopcore").create(name="Desk Lamp Pro", category="Home", price=Decimal("60.00"))
+        Order.objects.using("shopcore").create(user=other, product=pro, order_date=date(2024, 6, 1), status="Placed")
+        self.user = other
+
+        self.assertEqual(order_for_user_product(other.email, "desk lamp")["reason"], "order_not_found")
+        self.assertIsNone(self.projected_order_id("desk lamp"))
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class EventsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'omniflow.events'
+
+    def ready(self):
+        from . import capture, subscribers  # noqa: F401  (outbox signal capture and built-in consumers)
@@ -0,0 +1,108 @@
+from typing import Any, Dict, Iterable, Optional
+
+from django.apps import apps
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+
+from omniflow.utils.config import settings
+
+from .codec import encode
+from .models import OutboxEventBase
+
+# Domain apps with an outbox; each maps to the database of the same name.
+DOMAINS = ("shopcore", "shipstream", "payguard", "caredesk")
+
+# Bulky columns left out of change payloads; consumers re-read the row if they need them.
+EXCLUDED_FIELDS: Dict[str, set] = {
+    "shipstream.ReturnRequest": {"image_blob"},
+    "caredesk.TicketAttachment": {"image_data"},
+}
+
+
+def outbox_model(domain: str):
+    return apps.get_model(domain, "OutboxEvent")
+
+
+def snapshot(instance: models.Model) -> Dict[str, Any]:
+    """Column values of `instance` keyed by attname (`order_id`, not `order`)."""
+    excluded = EXCLUDED_FIELDS.get(instance._meta.label, set())
+    return {
+        f.attname: getattr(instance, f.attname)
+        for f in instance._meta.concrete_fields
+        if f.name not in excluded and not isinstance(f, models.BinaryField)
+    }
+
+
+def emit(
+    domain: str,
+    aggregate: str,
+    aggregate_id: Any,
+    event_type: str,
+    payload: Dict[str, Any],
+    using: Optional[str] = None,
+) -> None:
+    """
+    Append one event to `domain`'s outbox. Call it inside the transaction
+    that performs the write so both commit or neither does.
+    """
+    if not settings.OUTBOX_ENABLED:
+        return
+    outbox_model(domain).objects.using(using or domain).create(
+        aggregate=aggregate,
+        aggregate_id=str(aggregate_id),
+        event_type=event_type,
+        payload=encode(payload),
+    )
+
+
+def emit_many(instances: Iterable[models.Model], event_type: str, using: Optional[str] = None) -> int:
+    """Record rows written without signals (bulk_create / queryset.update) in one insert."""
+    instances = list(instances)
+    if not settings.OUTBOX_ENABLED or not instances:
+        return 0
+    domain = instances[0]._meta.app_label
+    Outbox = outbox_model(domain)
+    rows = [
+        Outbox(
+            aggregate=obj._meta.label,
+            aggregate_id=str(obj.pk),
+            event_type=event_type,
+            payload=encode({"fields": snapshot(obj)}),
+        )
+        for obj in instances
+    ]
+    Outbox.objects.using(using or domain).bulk_create(rows)
+    return len(rows)
+
+
+def _captured(sender) -> bool:
+    return (
+        sender._meta.app_label in DOMAINS
+        and not issubclass(sender, OutboxEventBase)
+        and not sender._meta.proxy
+    )
+
+
+def _on_save(sender, instance, created, using, update_fields=None, **kwargs):
+    if not _captured(sender):
+        return
+    # The whole row, so consumers can key on any column; `update_fields`
+    # says which columns the write actually touched.
+    emit(
+        sender._meta.app_label,
+        sender._meta.label,
+        instance.pk,
+        "created" if created else "updated",
+        {"fields": snapshot(instance), "update_fields": sorted(update_fields) if update_fields else None},
+        using=using,
+    )
+
+
+def _on_delete(sender, instance, using, **kwargs):
+    if not _captured(sender):
+        return
+    emit(sender._meta.app_label, sender._meta.label, instance.pk, "deleted", {"fields": snapshot(instance)}, using=using)
+
+
+post_save.connect(_on_save, weak=False, dispatch_uid="outbox:save")
+post_delete.connect(_on_delete, weak=False, dispatch_uid="outbox:delete")
@@ -0,0 +1,53 @@
+import datetime as dt
+import uuid
+from decimal import Decimal
+from typing import Any
+
+import msgpack
+
+# msgpack extension codes for the non-native values model fields produce.
+_EXT_DECIMAL = 1
+_EXT_DATETIME = 2
+_EXT_DATE = 3
+_EXT_TIME = 4
+_EXT_UUID = 5
+
+
+def _default(value: Any) -> msgpack.ExtType:
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, dt.datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, dt.date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, dt.time):
+        return msgpack.ExtType(_EXT_TIME, value.isoformat().encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    raise TypeError(f"Cannot encode {type(value).__name__} in an outbox payload")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_DATETIME:
+        return dt.datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return dt.date.fromisoformat(data.decode())
+    if code == _EXT_TIME:
+        return dt.time.fromisoformat(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def encode(payload: Any) -> bytes:
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def decode(data: bytes) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
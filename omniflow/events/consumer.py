@@ -0,0 +1,206 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from django.apps import apps
+from django.db import transaction
+
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+from .capture import DOMAINS, outbox_model
+from .codec import decode
+from .models import ConsumerOffset
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Event:
+    domain: str
+    position: int
+    aggregate: str
+    aggregate_id: str
+    event_type: str
+    payload: Dict[str, Any]
+    created_at: datetime
+
+    @property
+    def model(self):
+        return apps.get_model(self.aggregate)
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        return self.payload.get("fields") or {}
+
+    def instance(self):
+        """An unsaved model instance carrying the captured columns (enough for cache keys)."""
+        model = self.model
+        known = {f.attname for f in model._meta.concrete_fields}
+        obj = model(**{k: v for k, v in self.fields.items() if k in known})
+        obj._state.adding = False
+        obj._state.db = self.domain
+        return obj
+
+
+Handler = Callable[[List[Event]], None]
+
+
+class OutboxConsumer:
+    """
+    Tails the domain outboxes for one named consumer.
+
+    Offsets live in the default database and move only after the handler
+    returns, so delivery is at-least-once: a handler that raises sees the
+    same batch again on the next poll.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Handler,
+        domains: Sequence[str] = DOMAINS,
+        batch_size: Optional[int] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.domains = tuple(domains)
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+
+    def offset(self, domain: str) -> int:
+        row = ConsumerOffset.objects.using("default").filter(consumer=self.name, domain=domain).first()
+        return row.position if row else 0
+
+    def commit(self, domain: str, position: int) -> None:
+        ConsumerOffset.objects.using("default").update_or_create(
+            consumer=self.name,
+            domain=domain,
+            defaults={"position": position},
+        )
+
+    def seek_to_end(self) -> None:
+        """Start from now on: skip everything already in the outboxes."""
+        for domain in self.domains:
+            last = outbox_model(domain).objects.using(domain).order_by("-position").values_list("position", flat=True).first()
+            self.commit(domain, last or 0)
+
+    def poll(self, domain: str, after: Optional[int] = None) -> List[Event]:
+        after = self.offset(domain) if after is None else after
+        rows = (
+            outbox_model(domain).objects.using(domain)
+            .filter(position__gt=after)
+            .order_by("position")[: self.batch_size]
+        )
+        return [
+            Event(
+                domain=domain,
+                position=r.position,
+                aggregate=r.aggregate,
+                aggregate_id=r.aggregate_id,
+                event_type=r.event_type,
+                payload=decode(r.payload),
+                created_at=r.created_at,
+            )
+            for r in rows
+        ]
+
+    def consume(self) -> int:
+        """Drain every domain once; returns the number of events handled."""
+        handled = 0
+        for domain in self.domains:
+            position = self.offset(domain)
+            while True:
+                events = self.poll(domain, after=position)
+                if not events:
+                    break
+                self.handler(events)
+                position = events[-1].position
+                self.commit(domain, position)
+                handled += len(events)
+                if len(events) < self.batch_size:
+                    break
+        return handled
+
+    def run(self, interval: Optional[float] = None, stop: Optional[threading.Event] = None) -> None:
+        interval = settings.OUTBOX_POLL_INTERVAL if interval is None else interval
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                handled = self.consume()
+            except Exception as e:
+                logger.warning(f"Outbox consumer {self.name} failed, retrying: {e}")
+                handled = 0
+            if not handled:
+                stop.wait(interval)
+
+
+class OutboxFollower(OutboxConsumer):
+    """
+    A consumer whose offsets live in this process only.
+
+    For handlers that keep per-process state in sync (local cache tiers):
+    that state starts empty with the process, so the follower starts from
+    the end of the outboxes and never needs a ConsumerOffset row. Followers
+    are not registered, so `prune_outbox` does not wait for them.
+    """
+
+    def __init__(self, name: str, handler: Handler, domains: Sequence[str] = DOMAINS, batch_size: Optional[int] = None):
+        super().__init__(name, handler, domains=domains, batch_size=batch_size)
+        self._positions: Dict[str, int] = {}
+
+    def offset(self, domain: str) -> int:
+        return self._positions.get(domain, 0)
+
+    def commit(self, domain: str, position: int) -> None:
+        self._positions[domain] = position
+
+
+_subscribers: Dict[str, OutboxConsumer] = {}
+
+
+def subscribe(name: str, domains: Sequence[str] = DOMAINS, batch_size: Optional[int] = None):
+    """Register `handler(events)` as the named consumer: `@subscribe("search-index")`."""
+    def decorator(handler: Handler) -> Handler:
+        _subscribers[name] = OutboxConsumer(name, handler, domains=domains, batch_size=batch_size)
+        return handler
+    return decorator
+
+
+def get_consumer(name: str) -> OutboxConsumer:
+    return _subscribers[name]
+
+
+def registered_consumers() -> Dict[str, OutboxConsumer]:
+    return dict(_subscribers)
+
+
+def prune_outbox(domains: Iterable[str] = DOMAINS) -> Dict[str, int]:
+    """Delete events every registered consumer has processed."""
+    deleted = {}
+    names = list(_subscribers)
+    for domain in domains:
+        if not names:
+            break
+        offsets = dict(
+            ConsumerOffset.objects.using("default")
+            .filter(domain=domain, consumer__in=names)
+            .values_list("consumer", "position")
+        )
+        if len(offsets) < len(names):
+            continue  # a consumer that never ran still needs everything
+        upto = min(offsets.values())
+        with transaction.atomic(using=domain):
+            deleted[domain], _ = outbox_model(domain).objects.using(domain).filter(position__lte=upto).delete()
+    return deleted
+
+
+def stream(domain: str, after: int = 0, batch_size: int = 500) -> Iterable[Event]:
+    """Read one outbox from `after` without an offset (replays, debugging)."""
+    reader = OutboxConsumer("", lambda events: None, domains=[domain], batch_size=batch_size)
+    while True:
+        events = reader.poll(domain, after=after)
+        yield from events
+        if len(events) < batch_size:
+            return
+        after = events[-1].position
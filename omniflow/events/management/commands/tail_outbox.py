@@ -0,0 +1,61 @@
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from omniflow.events.consumer import prune_outbox, registered_consumers
+
+
+class Command(BaseCommand):
+    help = "Run the registered outbox consumers (entity-cache invalidation, projections, search indexes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--consumer",
+            action="append",
+            default=None,
+            help="Consumer name to run (repeatable). Defaults to every registered consumer",
+        )
+        parser.add_argument("--once", action="store_true", help="Drain the outboxes once and exit")
+        parser.add_argument("--interval", type=float, default=None, help="Seconds between empty polls (default: OUTBOX_POLL_INTERVAL)")
+        parser.add_argument(
+            "--from-end",
+            action="store_true",
+            help="Skip events already in the outboxes (first run of a consumer that has a rebuild command)",
+        )
+        parser.add_argument("--prune", action="store_true", help="After draining, delete events every consumer has processed")
+
+    def handle(self, *args, **options):
+        available = registered_consumers()
+        names = options["consumer"] or sorted(available)
+        unknown = [n for n in names if n not in available]
+        if unknown:
+            raise CommandError(f"Unknown consumer(s): {', '.join(unknown)}. Registered: {', '.join(sorted(available))}")
+        consumers = [available[n] for n in names]
+
+        if options["from_end"]:
+            for consumer in consumers:
+                consumer.seek_to_end()
+
+        if options["once"]:
+            for consumer in consumers:
+                handled = consumer.consume()
+                self.stdout.write(f"{consumer.name}: {handled} events")
+            if options["prune"]:
+                for domain, deleted in prune_outbox().items():
+                    self.stdout.write(f"pruned {deleted} events from {domain}")
+            return
+
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=c.run, kwargs={"interval": options["interval"], "stop": stop}, name=f"outbox-{c.name}", daemon=True)
+            for c in consumers
+        ]
+        for t in threads:
+            t.start()
+        self.stdout.write(self.style.SUCCESS(f"Tailing outboxes for: {', '.join(names)}"))
+        try:
+            while any(t.is_alive() for t in threads):
+                for t in threads:
+                    t.join(timeout=1.0)
+        except KeyboardInterrupt:
+            stop.set()
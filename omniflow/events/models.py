@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class OutboxEventBase(models.Model):
+    """
+    Append-only change log row. Each domain app declares a concrete
+    `OutboxEvent` from this base so the row lands in the domain's own
+    database, inside the same transaction as the write it records.
+
+    `position` (the primary key) is the stream offset consumers track.
+    `payload` is msgpack (see `omniflow.events.codec`).
+    """
+
+    position = models.BigAutoField(primary_key=True)
+    aggregate = models.CharField(max_length=100)  # model label, e.g. "shipstream.Shipment"
+    aggregate_id = models.CharField(max_length=64)
+    event_type = models.CharField(max_length=50)  # created / updated / deleted, or a domain event
+    payload = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["position"]
+
+    def __str__(self):
+        return f"#{self.position} {self.aggregate}:{self.aggregate_id} {self.event_type}"
+
+
+class ConsumerOffset(models.Model):
+    """Last position a named consumer has processed in one domain's outbox (default DB)."""
+
+    consumer = models.CharField(max_length=100)
+    domain = models.CharField(max_length=30)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["consumer", "domain"], name="events_consumer_domain_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.consumer}@{self.domain}: {self.position}"
@@ -0,0 +1,60 @@
+import os
+import threading
+from typing import List
+
+from omniflow.core.cache.entity import entity_caches_for, on_local_tier_start
+from omniflow.utils.config import settings
+from omniflow.utils.logging import get_logger
+
+from .consumer import Event, OutboxFollower, subscribe
+
+logger = get_logger(__name__)
+
+
+@subscribe("entity-cache")
+def invalidate_entity_caches(events: List[Event]) -> None:
+    """
+    Drop cached rows changed by any process, including writers that never
+    load this process's signal handlers. Registered for `tail_outbox` (the
+    shared Redis tier) and run by every caching process's own follower
+    (its local tier, which no other process can reach).
+    """
+    for event in events:
+        try:
+            caches = entity_caches_for(event.model)
+        except LookupError:
+            continue
+        if not caches:
+            continue
+        instance = event.instance()
+        for cache in caches:
+            try:
+                cache.invalidate_instance(instance)
+            except Exception as e:
+                logger.warning(f"Invalidating {cache.name} for {event.aggregate}:{event.aggregate_id} failed: {e}")
+
+
+def follow_outbox_for_entity_caches() -> None:
+    """Start this process's in-memory follower of the outboxes for its local cache tier."""
+    if not (settings.OUTBOX_ENABLED and settings.ENTITY_CACHE_FOLLOW_OUTBOX):
+        return
+    follower = OutboxFollower(f"entity-cache:{os.getpid()}", invalidate_entity_caches)
+    positioned = threading.Event()
+
+    def run() -> None:
+        # Seek on this thread so the caller's executor only ever opens its own alias.
+        try:
+            follower.seek_to_end()
+        except Exception as e:
+            # Without a starting point it replays from the beginning: slower, still correct.
+            logger.warning(f"Outbox follower could not seek to the end, replaying: {e}")
+        finally:
+            positioned.set()
+        follower.run()
+
+    threading.Thread(target=run, name="outbox-entity-cache", daemon=True).start()
+    # The first load must not start before the follower knows where "now" is.
+    positioned.wait()
+
+
+on_local_tier_start(follow_outbox_for_entity_caches)
@@ -0,0 +1,39 @@
+from django.test import TransactionTestCase
+
+from omniflow.events.capture import emit_many
+from omniflow.events.consumer import OutboxFollower
+from omniflow.events.models import ConsumerOffset
+from omniflow.events.subscribers import invalidate_entity_caches
+from omniflow.shipstream.models import Shipment
+from omniflow.shipstream.services import shipments_by_tracking
+
+
+class EntityCacheFollowerTests(TransactionTestCase):
+    databases = {"default", "shopcore", "shipstream", "payguard", "caredesk"}
+
+    def setUp(self):
+        self.shipment = Shipment.objects.using("shipstream").create(
+            order_id=1, tracking_number="FWD-FOLLOW", status="Delivered",
+        )
+        shipments_by_tracking.clear()
+        self.addCleanup(shipments_by_tracking.clear)
+        self.follower = OutboxFollower("entity-cache:test", invalidate_entity_caches)
+        self.follower.seek_to_end()
+
+    def write_elsewhere(self, status):
+        # queryset.update() skips this process's signals, like a write from another process.
+        Shipment.objects.using("shipstream").filter(pk=self.shipment.pk).update(status=status)
+        self.shipment.status = status
+        emit_many([self.shipment], "updated")
+
+    def test_write_from_another_process_reaches_local_tier(self):
+        self.assertEqual(shipments_by_tracking.get("FWD-FOLLOW").status, "Delivered")
+        self.write_elsewhere("RTO_Initiated")
+        self.assertEqual(self.follower.consume(), 1)
+        self.assertEqual(shipments_by_tracking.get("FWD-FOLLOW").status, "RTO_Initiated")
+
+    def test_follower_starts_at_the_end_and_keeps_no_offsets(self):
+        self.assertEqual(self.follower.consume(), 0)
+        self.write_elsewhere("In Transit")
+        self.assertEqual(self.follower.consume(), 1)
+        self.assertFalse(ConsumerOffset.objects.using("default").filter(consumer="entity-cache:test").exists())
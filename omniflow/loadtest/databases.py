@@ -0,0 +1,63 @@
+# loadtest/databases.py
+import os
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.db import connections
+
+
+def _copy_sqlite(src: Path, dst: Path) -> None:
+    # The backup API gives a consistent copy even if the dev server is writing.
+    with sqlite3.connect(str(src)) as source, sqlite3.connect(str(dst)) as target:
+        source.backup(target)
+
+
+def use_scratch_databases(source_dir: Optional[str] = None) -> Path:
+    """
+    Copy every configured SQLite database into a temporary directory and point
+    this process (and, through DATABASE_DIR, any MCP server it spawns) at the
+    copies, so a load test can write freely.
+
+    `source_dir` holds files named like the configured ones (db.sqlite3,
+    db_shopcore.sqlite3, ...); by default the configured files are copied.
+    """
+    scratch = Path(tempfile.mkdtemp(prefix="omniflow-loadtest-"))
+    for alias in connections:
+        conn = connections[alias]
+        src = Path(conn.settings_dict["NAME"])
+        if source_dir:
+            src = Path(source_dir) / src.name
+        if not src.exists():
+            raise FileNotFoundError(f"No database file for {alias!r} at {src}")
+        dst = scratch / src.name
+        _copy_sqlite(src, dst)
+        conn.close()
+        conn.settings_dict["NAME"] = str(dst)
+    os.environ["DATABASE_DIR"] = str(scratch)
+    return scratch
+
+
+def row_counts() -> Dict[str, int]:
+    """Rows per domain table, recorded with each run so results are comparable."""
+    from omniflow.caredesk.models import Ticket
+    from omniflow.payguard.models import Transaction, Wallet
+    from omniflow.shipstream.models import Shipment, TrackingEvent
+    from omniflow.shopcore.models import Order, User
+
+    return {
+        "users": User.objects.using("shopcore").count(),
+        "orders": Order.objects.using("shopcore").count(),
+        "shipments": Shipment.objects.using("shipstream").count(),
+        "tracking_events": TrackingEvent.objects.using("shipstream").count(),
+        "wallets": Wallet.objects.using("payguard").count(),
+        "transactions": Transaction.objects.using("payguard").count(),
+        "tickets": Ticket.objects.using("caredesk").count(),
+    }
+
+
+def drop_scratch_databases(scratch: Path) -> None:
+    connections.close_all()
+    shutil.rmtree(scratch, ignore_errors=True)
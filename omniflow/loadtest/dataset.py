@@ -0,0 +1,386 @@
+# loadtest/dataset.py
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from django.db import models
+from django.db.models import Max
+from django.utils import timezone
+
+from omniflow.caredesk.models import Ticket, TicketMessage
+from omniflow.core.db.bulk import BulkLoader
+from omniflow.payguard.models import PaymentMethod, Transaction, Wallet
+from omniflow.shipstream.models import ExchangeShipment, NdrEvent, ReverseShipment, Shipment, TrackingEvent, Warehouse
+from omniflow.shopcore.models import Order, Product, User
+
+FIRST_NAMES = np.array([
+    "Aarav", "Aditi", "Arjun", "Ananya", "Diya", "Ishaan", "Kabir", "Kavya", "Meera", "Neha",
+    "Nikhil", "Priya", "Rahul", "Riya", "Rohan", "Saanvi", "Sameer", "Sneha", "Tanvi", "Vikram",
+    "Alex", "Emma", "James", "Lucas", "Maria", "Noah", "Olivia", "Sofia", "Liam", "Zara",
+])
+LAST_NAMES = np.array([
+    "Sharma", "Verma", "Iyer", "Patel", "Reddy", "Nair", "Gupta", "Mehta", "Khan", "Singh",
+    "Das", "Bose", "Joshi", "Kapoor", "Rao", "Smith", "Garcia", "Müller", "Rossi", "Silva",
+])
+PRODUCT_ADJECTIVES = np.array([
+    "Gaming", "Wireless", "Smart", "Portable", "Ultra", "Pro", "Compact", "Ergonomic", "4K", "Noise-Cancelling",
+])
+PRODUCT_NOUNS = np.array([
+    ("Monitor", "Electronics"), ("Headphones", "Electronics"), ("Keyboard", "Electronics"),
+    ("Mouse", "Electronics"), ("Speaker", "Electronics"), ("Watch", "Wearables"),
+    ("Backpack", "Accessories"), ("Desk Lamp", "Home"), ("Blender", "Kitchen"),
+    ("Running Shoes", "Footwear"), ("Office Chair", "Furniture"), ("Camera", "Electronics"),
+])
+
+# Order lifecycle: (order status, shipment status or "" if not shipped, tracking events, weight).
+LIFECYCLE = [
+    ("Processing", "", 0, 0.06),
+    ("Cancelled", "", 0, 0.03),
+    ("Dispatched", "Dispatched", 1, 0.06),
+    ("In Transit", "In Transit", 2, 0.12),
+    ("Delivered", "Delivered", 4, 0.66),
+    ("Returned", "Delivered", 4, 0.05),
+    ("RTO", "RTO_Initiated", 3, 0.02),
+]
+EVENT_STEPS = np.array(["Created", "In Transit", "Out for Delivery", "Delivered"])
+RTO_STEPS = np.array(["Created", "In Transit", "RTO_Initiated"])
+
+RETURN_REASONS = np.array(["Damaged in Transit", "Wrong Item", "Size Issue", "Not as Described", "Changed Mind"])
+NDR_ISSUES = np.array(["Customer Not Available", "Address Incomplete", "Customer Refused", "COD Amount Mismatch"])
+TICKET_ISSUES = np.array(["Delivery Delay", "Damaged Item", "Refund Status", "Wrong Item", "Payment Issue"])
+TICKET_STATUSES = np.array(["Open", "In Progress", "Resolved"])
+PROVIDERS = np.array(["VISA", "MASTERCARD", "RUPAY", "UPI"])
+
+
+@dataclass
+class DatasetSpec:
+    """How much to generate; users and products default to ratios of `orders`."""
+
+    orders: int
+    users: int = 0
+    products: int = 0
+    warehouses: int = 40
+    seed: int = 42
+    as_of: date = field(default_factory=date.today)
+    ticket_rate: float = 0.04
+    wallet_rate: float = 0.85
+    batch_size: int = 5000
+    chunk_orders: int = 200_000
+
+    def __post_init__(self):
+        self.users = self.users or max(1, self.orders // 4)
+        self.products = self.products or min(5000, max(20, self.orders // 200))
+
+
+def _next_id(model: type, using: str) -> int:
+    return (model.objects.using(using).aggregate(m=Max("id"))["m"] or 0) + 1
+
+
+def _next_order_id() -> int:
+    """
+    First order id whose FWD-/REV-/NDR-/EXC- numbers are all free: the seed
+    fixtures use numbers (FWD-1020, REV-9000) with no matching order row.
+    """
+    highest = _next_id(Order, "shopcore") - 1
+    for model, column in (
+        (Shipment, "tracking_number"),
+        (ReverseShipment, "reverse_number"),
+        (NdrEvent, "ndr_number"),
+        (ExchangeShipment, "exchange_number"),
+    ):
+        for number in model.objects.using("shipstream").values_list(column, flat=True).iterator():
+            suffix = str(number).rpartition("-")[2]
+            if suffix.isdigit():
+                highest = max(highest, int(suffix))
+    return highest + 1
+
+
+class DatasetGenerator:
+    """
+    Writes a consistent synthetic dataset across the four domain databases.
+
+    Every column is drawn as a NumPy array from one seeded generator, so the
+    same spec produces the same rows. Rows are appended after the highest
+    existing ids and tracking numbers keep the `FWD-<order_id>` convention the
+    gateway relies on, so generated data sits next to the seed fixtures.
+    Users (and everything that hangs off them) are written in chunks of about
+    `chunk_orders` orders, one transaction per database per chunk.
+    """
+
+    def __init__(self, spec: DatasetSpec, emit_events: bool = False, progress: Optional[Callable[[str], None]] = None):
+        self.spec = spec
+        self.rng = np.random.default_rng(spec.seed)
+        self.emit_events = emit_events
+        self.progress = progress or (lambda message: None)
+        self.counts: Dict[str, int] = {}
+        # First and last generated order id, for projecting just the new rows.
+        self.order_range = (0, -1)
+
+    # ---------------- writing ----------------
+
+    def _loader(self, alias: str) -> BulkLoader:
+        return BulkLoader(alias, batch_size=self.spec.batch_size, emit_events=self.emit_events)
+
+    def _write(self, loader: BulkLoader, model: type, rows: List[models.Model]) -> None:
+        loader.insert(model, rows)
+        self.counts[model._meta.label] = self.counts.get(model._meta.label, 0) + len(rows)
+
+    # ---------------- reference data ----------------
+
+    def _products(self) -> np.ndarray:
+        n = self.spec.products
+        first = _next_id(Product, "shopcore")
+        ids = np.arange(first, first + n)
+        adjective = PRODUCT_ADJECTIVES[self.rng.integers(0, len(PRODUCT_ADJECTIVES), n)]
+        noun = self.rng.integers(0, len(PRODUCT_NOUNS), n)
+        # Log-normal prices: most items are cheap, a few are very expensive.
+        prices = np.round(np.clip(self.rng.lognormal(7.5, 1.0, n), 99, 250_000), 2)
+        rows = [
+            Product(id=int(i), name=f"{a} {PRODUCT_NOUNS[k][0]} {i}", category=PRODUCT_NOUNS[k][1], price=Decimal(f"{p:.2f}"))
+            for i, a, k, p in zip(ids.tolist(), adjective.tolist(), noun.tolist(), prices.tolist())
+        ]
+        with self._loader("shopcore") as loader:
+            self._write(loader, Product, rows)
+        self._prices = dict(zip(ids.tolist(), prices.tolist()))
+        return ids
+
+    def _warehouses(self) -> np.ndarray:
+        n = self.spec.warehouses
+        first = _next_id(Warehouse, "shipstream")
+        ids = np.arange(first, first + n)
+        rows = [
+            Warehouse(id=int(i), location=f"Hub {i}", manager_name=f"Manager {i}")
+            for i in ids.tolist()
+        ]
+        with self._loader("shipstream") as loader:
+            self._write(loader, Warehouse, rows)
+        return ids
+
+    # ---------------- main loop ----------------
+
+    def run(self) -> Dict[str, int]:
+        spec = self.spec
+        started = time.perf_counter()
+        product_ids = self._products()
+        warehouse_ids = self._warehouses()
+        # Zipf-like popularity so a few products dominate, as in real catalogs.
+        popularity = 1.0 / np.arange(1, len(product_ids) + 1) ** 1.1
+        popularity /= popularity.sum()
+        self.rng.shuffle(popularity)
+
+        self._ids = {
+            "user": _next_id(User, "shopcore"),
+            "order": _next_order_id(),
+            "shipment": _next_id(Shipment, "shipstream"),
+            "event": _next_id(TrackingEvent, "shipstream"),
+            "wallet": _next_id(Wallet, "payguard"),
+            "method": _next_id(PaymentMethod, "payguard"),
+            "transaction": _next_id(Transaction, "payguard"),
+            "ticket": _next_id(Ticket, "caredesk"),
+            "message": _next_id(TicketMessage, "caredesk"),
+        }
+
+        first_order = self._ids["order"]
+        orders_per_user = spec.orders / spec.users
+        users_per_chunk = max(1, int(spec.chunk_orders / orders_per_user))
+        written_users = written_orders = 0
+        while written_users < spec.users:
+            users = min(users_per_chunk, spec.users - written_users)
+            # The last chunk takes whatever is left so the order total is exact.
+            orders = (
+                spec.orders - written_orders
+                if written_users + users >= spec.users
+                else int(round(users * orders_per_user))
+            )
+            self._chunk(users, orders, product_ids, popularity, warehouse_ids)
+            written_users += users
+            written_orders += orders
+            self.progress(f"{written_users}/{spec.users} users, {written_orders}/{spec.orders} orders")
+
+        self.order_range = (first_order, self._ids["order"] - 1)
+        self.counts["elapsed_s"] = round(time.perf_counter() - started, 1)
+        return self.counts
+
+    def _take(self, key: str, n: int) -> np.ndarray:
+        first = self._ids[key]
+        self._ids[key] = first + n
+        return np.arange(first, first + n)
+
+    def _chunk(self, n_users: int, n_orders: int, product_ids, popularity, warehouse_ids) -> None:
+        rng = self.rng
+        as_of = self.spec.as_of
+        tz = timezone.get_current_timezone()
+
+        # ---------------- shopcore ----------------
+        user_ids = self._take("user", n_users)
+        names = np.char.add(np.char.add(FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n_users)], " "),
+                            LAST_NAMES[rng.integers(0, len(LAST_NAMES), n_users)])
+        premium = rng.random(n_users) < 0.15
+        name_by_user = dict(zip(user_ids.tolist(), names.tolist()))
+
+        per_user = rng.multinomial(n_orders, np.full(n_users, 1.0 / n_users))
+        order_ids = self._take("order", n_orders)
+        order_user = np.repeat(user_ids, per_user)
+        order_product = rng.choice(product_ids, size=n_orders, p=popularity)
+        age_days = rng.integers(0, 365, n_orders)
+        lifecycle = rng.choice(len(LIFECYCLE), size=n_orders, p=[w for *_, w in LIFECYCLE])
+        # Recent orders are still moving; old ones have settled.
+        recent = age_days < 7
+        lifecycle = np.where(recent & (lifecycle >= 4), rng.choice([2, 3], size=n_orders), lifecycle)
+        order_status = np.array([s for s, *_ in LIFECYCLE])[lifecycle]
+        order_dates = [as_of - timedelta(days=int(d)) for d in age_days.tolist()]
+
+        with self._loader("shopcore") as loader:
+            self._write(loader, User, [
+                User(id=u, name=n, email=f"user{u}@synthetic.omniflow.test", premium_status=p)
+                for u, n, p in zip(user_ids.tolist(), names.tolist(), premium.tolist())
+            ])
+            self._write(loader, Order, [
+                Order(id=o, user_id=u, product_id=p, order_date=d, status=s)
+                for o, u, p, d, s in zip(order_ids.tolist(), order_user.tolist(), order_product.tolist(), order_dates, order_status.tolist())
+            ])
+
+        # ---------------- shipstream ----------------
+        shipped = np.array([bool(s) for _, s, *_ in LIFECYCLE])[lifecycle]
+        s_idx = np.flatnonzero(shipped)
+        shipment_ids = self._take("shipment", len(s_idx))
+        s_order = order_ids[s_idx]
+        s_status = np.array([s for _, s, *_ in LIFECYCLE])[lifecycle[s_idx]]
+        s_ship_lag = rng.integers(0, 3, len(s_idx))
+        s_transit = rng.integers(2, 8, len(s_idx))
+        s_dates = [order_dates[i] + timedelta(days=int(lag)) for i, lag in zip(s_idx.tolist(), s_ship_lag.tolist())]
+        prices = self._prices
+
+        shipments = [
+            Shipment(
+                id=sid, order_id=oid, tracking_number=f"FWD-{oid}", shipment_date=sd,
+                estimated_arrival=sd + timedelta(days=int(t)), customer_name=name_by_user[uid], status=st,
+                amount=Decimal(f"{prices[pid]:.2f}"),
+            )
+            for sid, oid, sd, t, uid, pid, st in zip(
+                shipment_ids.tolist(), s_order.tolist(), s_dates, s_transit.tolist(),
+                order_user[s_idx].tolist(), order_product[s_idx].tolist(), s_status.tolist(),
+            )
+        ]
+
+        # Tracking events: a fixed timeline per status, one hub per step.
+        n_events = np.array([n for _, _, n, _ in LIFECYCLE])[lifecycle[s_idx]]
+        e_ship = np.repeat(np.arange(len(s_idx)), n_events)
+        e_step = np.arange(len(e_ship)) - np.repeat(np.cumsum(n_events) - n_events, n_events)
+        e_rto = s_status[e_ship] == "RTO_Initiated"
+        e_label = np.where(e_rto, RTO_STEPS[np.minimum(e_step, len(RTO_STEPS) - 1)], EVENT_STEPS[e_step])
+        e_hours = e_step * 20 + rng.integers(0, 12, len(e_ship))
+        e_warehouse = rng.choice(warehouse_ids, size=len(e_ship))
+        event_ids = self._take("event", len(e_ship))
+        midnight = {d: datetime.combine(d, datetime.min.time(), tzinfo=tz) for d in set(s_dates)}
+        events = [
+            TrackingEvent(
+                id=eid, shipment_id=int(shipment_ids[i]), warehouse_id=w, status_update=label,
+                timestamp=midnight[s_dates[i]] + timedelta(hours=h),
+            )
+            for eid, i, w, label, h in zip(event_ids.tolist(), e_ship.tolist(), e_warehouse.tolist(), e_label.tolist(), e_hours.tolist())
+        ]
+
+        returned = np.flatnonzero(order_status == "Returned")
+        reverse = [
+            ReverseShipment(
+                reverse_number=f"REV-{oid}", original_shipment_id=f"FWD-{oid}",
+                return_date=order_dates[i] + timedelta(days=10), reason=reason, refund_status=refund,
+            )
+            for i, oid, reason, refund in zip(
+                returned.tolist(), order_ids[returned].tolist(),
+                RETURN_REASONS[rng.integers(0, len(RETURN_REASONS), len(returned))].tolist(),
+                np.where(rng.random(len(returned)) < 0.7, "Processed", "Pending").tolist(),
+            )
+        ]
+        ndr_idx = s_idx[rng.random(len(s_idx)) < 0.02]
+        ndrs = [
+            NdrEvent(
+                ndr_number=f"NDR-{oid}", original_shipment_id=f"FWD-{oid}", ndr_date=order_dates[i] + timedelta(days=3),
+                issue=issue, attempts=int(a), final_outcome=outcome,
+            )
+            for i, oid, issue, a, outcome in zip(
+                ndr_idx.tolist(), order_ids[ndr_idx].tolist(),
+                NDR_ISSUES[rng.integers(0, len(NDR_ISSUES), len(ndr_idx))].tolist(),
+                rng.integers(1, 4, len(ndr_idx)).tolist(),
+                np.where(rng.random(len(ndr_idx)) < 0.8, "Delivered", "RTO").tolist(),
+            )
+        ]
+        exc_idx = returned[rng.random(len(returned)) < 0.2]
+        exchanges = [
+            ExchangeShipment(
+                exchange_number=f"EXC-{oid}", original_shipment_id=f"FWD-{oid}",
+                exchange_date=order_dates[i] + timedelta(days=12), new_item=f"Replacement for product {pid}", status="Exchanged",
+            )
+            for i, oid, pid in zip(exc_idx.tolist(), order_ids[exc_idx].tolist(), order_product[exc_idx].tolist())
+        ]
+
+        with self._loader("shipstream") as loader:
+            self._write(loader, Shipment, shipments)
+            self._write(loader, TrackingEvent, events)
+            self._write(loader, ReverseShipment, reverse)
+            self._write(loader, NdrEvent, ndrs)
+            self._write(loader, ExchangeShipment, exchanges)
+
+        # ---------------- payguard ----------------
+        has_wallet = rng.random(n_users) < self.spec.wallet_rate
+        w_users = user_ids[has_wallet]
+        wallet_ids = self._take("wallet", len(w_users))
+        wallet_by_user = dict(zip(w_users.tolist(), wallet_ids.tolist()))
+        balances = np.round(rng.gamma(2.0, 1500.0, len(w_users)), 2)
+
+        m_count = 1 + (rng.random(len(wallet_ids)) < 0.3)
+        m_wallet = np.repeat(wallet_ids, m_count)
+        method_ids = self._take("method", len(m_wallet))
+        m_expiry = rng.integers(30, 1500, len(m_wallet))
+        m_provider = PROVIDERS[rng.integers(0, len(PROVIDERS), len(m_wallet))]
+
+        # A debit for every paid order, and a refund credit for returns.
+        paid = np.flatnonzero(np.isin(order_user, w_users) & (order_status != "Cancelled") & (order_status != "Processing"))
+        refunded = paid[order_status[paid] == "Returned"]
+        tx_orders = np.concatenate([paid, refunded])
+        tx_types = np.array(["debit"] * len(paid) + ["credit"] * len(refunded))
+        tx_ids = self._take("transaction", len(tx_orders))
+
+        with self._loader("payguard") as loader:
+            self._write(loader, Wallet, [
+                Wallet(id=w, user_id=u, balance=Decimal(f"{b:.2f}"), currency="INR")
+                for w, u, b in zip(wallet_ids.tolist(), w_users.tolist(), balances.tolist())
+            ])
+            self._write(loader, PaymentMethod, [
+                PaymentMethod(id=m, wallet_id=w, provider=p, expiry_date=as_of + timedelta(days=int(e)))
+                for m, w, p, e in zip(method_ids.tolist(), m_wallet.tolist(), m_provider.tolist(), m_expiry.tolist())
+            ])
+            self._write(loader, Transaction, [
+                Transaction(
+                    id=t, wallet_id=wallet_by_user[int(order_user[i])], order_id=int(order_ids[i]),
+                    amount=Decimal(f"{prices[int(order_product[i])]:.2f}"), type=kind,
+                )
+                for t, i, kind in zip(tx_ids.tolist(), tx_orders.tolist(), tx_types.tolist())
+            ])
+
+        # ---------------- caredesk ----------------
+        # Orders that went wrong raise tickets more often.
+        troubled = np.isin(order_status, ["In Transit", "Returned", "RTO"])
+        t_idx = np.flatnonzero(rng.random(n_orders) < np.where(troubled, self.spec.ticket_rate * 3, self.spec.ticket_rate))
+        ticket_ids = self._take("ticket", len(t_idx))
+        t_issue = TICKET_ISSUES[rng.integers(0, len(TICKET_ISSUES), len(t_idx))]
+        t_status = TICKET_STATUSES[rng.choice(len(TICKET_STATUSES), size=len(t_idx), p=[0.35, 0.15, 0.5])]
+        message_ids = self._take("message", 2 * len(t_idx))
+
+        with self._loader("caredesk") as loader:
+            self._write(loader, Ticket, [
+                Ticket(id=t, user_id=int(order_user[i]), reference_id=str(int(order_ids[i])), issue_type=issue, status=st)
+                for t, i, issue, st in zip(ticket_ids.tolist(), t_idx.tolist(), t_issue.tolist(), t_status.tolist())
+            ])
+            self._write(loader, TicketMessage, [
+                TicketMessage(
+                    id=int(message_ids[2 * n + k]), ticket_id=t, sender=sender,
+                    content=(f"{issue} on order {int(order_ids[i])}." if sender == "User" else "We are looking into this."),
+                )
+                for n, (t, i, issue) in enumerate(zip(ticket_ids.tolist(), t_idx.tolist(), t_issue.tolist()))
+                for k, sender in enumerate(("User", "Agent"))
+            ])
@@ -0,0 +1,101 @@
+# loadtest/fake_llm.py
+import asyncio
+import hashlib
+import sys
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+def _text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(getattr(m, "content", "") or "") for m in messages)
+
+
+class FakeChatOpenAI(BaseChatModel):
+    """
+    Deterministic stand-in for `ChatOpenAI`.
+
+    Every call sleeps `latency_ms` plus a jitter derived from the prompt (so a
+    replayed request always costs the same) and answers with plain text and
+    no tool calls; agents therefore finish after one model turn. Token usage
+    is estimated at four characters per token so the token metrics move.
+    """
+
+    model_name: str = "fake-gpt-4o-mini"
+    latency_ms: float = 300.0
+    jitter_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-openai"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _delay(self, prompt: str) -> float:
+        if not self.jitter_ms:
+            return self.latency_ms / 1000
+        digest = int.from_bytes(hashlib.blake2b(prompt.encode(), digest_size=4).digest(), "big")
+        return (self.latency_ms + (digest / 0xFFFFFFFF) * self.jitter_ms) / 1000
+
+    def _result(self, prompt: str) -> ChatResult:
+        digest = hashlib.blake2b(prompt.encode(), digest_size=4).hexdigest()
+        content = f"Here is what I found for your request (ref {digest})."
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": max(1, len(prompt) // 4),
+                "output_tokens": max(1, len(content) // 4),
+                "total_tokens": max(1, len(prompt) // 4) + max(1, len(content) // 4),
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt = _text(messages)
+        time.sleep(self._delay(prompt))
+        return self._result(prompt)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt = _text(messages)
+        await asyncio.sleep(self._delay(prompt))
+        return self._result(prompt)
+
+
+_AGENT_MODULES = (
+    "omniflow.agents.langchain_based_agents.base",
+    "omniflow.agents.langchain_based_agents.shopcore_agent",
+    "omniflow.agents.langchain_based_agents.shipstream_agent",
+    "omniflow.agents.langchain_based_agents.payguard_agent",
+    "omniflow.agents.langchain_based_agents.caredesk_agent",
+    "omniflow.agents.langchain_based_agents.vision_agent",
+    "api_gateway.views",
+)
+
+
+def install_fake_llm(latency_ms: float = 300.0, jitter_ms: float = 0.0) -> FakeChatOpenAI:
+    """Swap every `ChatOpenAI` the gateway and supervisor use for a `FakeChatOpenAI`."""
+    import importlib
+
+    llm = FakeChatOpenAI(latency_ms=latency_ms, jitter_ms=jitter_ms)
+
+    def get_llm():
+        return llm
+
+    for name in _AGENT_MODULES:
+        module = sys.modules.get(name) or importlib.import_module(name)
+        if hasattr(module, "get_llm"):
+            module.get_llm = get_llm
+
+    from omniflow.core.orchestration import supervisor_graph as sg
+
+    sg.RESPONSE_SYNTH_LLM = llm
+    # The agents were built with the real model when the graph was imported.
+    sg.SHOPCORE_AGENT = sg.build_shopcore_agent()
+    sg.SHIPSTREAM_AGENT = sg.build_shipstream_agent()
+    sg.PAYGUARD_AGENT = sg.build_payguard_agent()
+    sg.CAREDESK_AGENT = sg.build_caredesk_agent()
+    return llm
@@ -0,0 +1,201 @@
+# loadtest/runner.py
+import asyncio
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional
+
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+
+from .scenarios import Conversation
+
+QUERY_PATH = "/api/query/"
+WS_PATH = "/ws/query/"
+
+
+@dataclass
+class Sample:
+    scenario: str
+    transport: str
+    step: int
+    latency_ms: float
+    ok: bool
+    error: Optional[str] = None
+    # Milliseconds per "kind:name" span (graph node, tool, db alias, llm model)
+    spans: Dict[str, float] = field(default_factory=dict)
+
+
+def _spans(result: Optional[dict]) -> Dict[str, float]:
+    out: Dict[str, float] = defaultdict(float)
+    for entry in (result or {}).get("decision_trace") or []:
+        if isinstance(entry, dict) and entry.get("agent") == "Trace":
+            out[f"{entry['kind']}:{entry['name']}"] += float(entry.get("duration_ms") or 0.0)
+    return dict(out)
+
+
+class _HttpSession:
+    """One browser: keeps the Django session cookie across a conversation's steps."""
+
+    def __init__(self, application, timeout: float):
+        self.application = application
+        self.timeout = timeout
+        self.cookies: Dict[str, str] = {}
+
+    async def post(self, payload: dict) -> tuple:
+        body = json.dumps(payload).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"host", b"localhost"),
+        ]
+        if self.cookies:
+            cookie = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            headers.append((b"cookie", cookie.encode()))
+        communicator = HttpCommunicator(self.application, "POST", QUERY_PATH, body=body, headers=headers)
+        response = await communicator.get_response(timeout=self.timeout)
+        for name, value in response["headers"]:
+            if name.lower() == b"set-cookie":
+                jar = SimpleCookie()
+                jar.load(value.decode())
+                self.cookies.update({k: m.value for k, m in jar.items()})
+        return response["status"], response["body"]
+
+
+async def _http_conversation(application, conversation: Conversation, timeout: float) -> List[Sample]:
+    session = _HttpSession(application, timeout)
+    samples = []
+    for n, step in enumerate(conversation.steps):
+        started = time.perf_counter()
+        try:
+            status, body = await session.post(step.payload)
+            data = json.loads(body or b"{}")
+            result = data.get("response") if isinstance(data, dict) else None
+            ok = status == 200 and isinstance(result, dict)
+            error = None if ok else f"HTTP {status}"
+        except Exception as e:
+            result, ok, error = None, False, type(e).__name__
+        samples.append(Sample(
+            conversation.scenario, "http", n, (time.perf_counter() - started) * 1000, ok, error, _spans(result),
+        ))
+    return samples
+
+
+async def _ws_conversation(application, conversation: Conversation, timeout: float) -> List[Sample]:
+    communicator = WebsocketCommunicator(application, WS_PATH, headers=[(b"host", b"localhost")])
+    connected, _ = await communicator.connect(timeout=timeout)
+    if not connected:
+        return [Sample(conversation.scenario, "ws", 0, 0.0, False, "connect refused")]
+    samples = []
+    try:
+        for n, step in enumerate(conversation.steps):
+            if step.http_only:
+                continue
+            started = time.perf_counter()
+            result, error = None, None
+            try:
+                await communicator.send_json_to(step.payload)
+                while True:
+                    message = await communicator.receive_json_from(timeout=timeout)
+                    if message.get("type") == "final":
+                        result = message.get("response")
+                        break
+                    if message.get("type") == "error":
+                        error = str(message.get("error"))[:200]
+                        break
+            except Exception as e:
+                error = type(e).__name__
+            samples.append(Sample(
+                conversation.scenario, "ws", n, (time.perf_counter() - started) * 1000,
+                error is None and isinstance(result, dict), error, _spans(result),
+            ))
+    finally:
+        await communicator.disconnect()
+    return samples
+
+
+async def replay(application, transport: str, conversations: List[Conversation], concurrency: int, timeout: float = 120.0) -> dict:
+    """Replay `conversations` with at most `concurrency` in flight; returns samples and wall time."""
+    run = _http_conversation if transport == "http" else _ws_conversation
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(conversation: Conversation) -> List[Sample]:
+        async with semaphore:
+            return await run(application, conversation, timeout)
+
+    started = time.perf_counter()
+    batches = await asyncio.gather(*[one(c) for c in conversations])
+    wall = time.perf_counter() - started
+    return {"samples": [s for batch in batches for s in batch], "wall_s": wall}
+
+
+# ---------------- reporting ----------------
+
+def _percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, max(0, int(round(p * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[rank], 2)
+
+
+def _distribution(values: List[float]) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 2) if values else None,
+        "p50": _percentile(values, 0.50),
+        "p95": _percentile(values, 0.95),
+        "p99": _percentile(values, 0.99),
+        "max": round(values[-1], 2) if values else None,
+    }
+
+
+def summarize(samples: List[Sample], wall_s: float) -> dict:
+    by_intent: Dict[str, List[Sample]] = defaultdict(list)
+    spans: Dict[str, List[float]] = defaultdict(list)
+    for s in samples:
+        by_intent[s.scenario].append(s)
+        for key, ms in s.spans.items():
+            spans[key].append(ms)
+
+    errors: Dict[str, int] = defaultdict(int)
+    for s in samples:
+        if not s.ok:
+            errors[s.error or "error"] += 1
+
+    return {
+        "requests": len(samples),
+        "errors": sum(errors.values()),
+        "error_kinds": dict(errors),
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(len(samples) / wall_s, 2) if wall_s else None,
+        "latency_ms": _distribution([s.latency_ms for s in samples]),
+        "intents": {
+            name: {
+                **_distribution([s.latency_ms for s in group]),
+                "errors": sum(1 for s in group if not s.ok),
+            }
+            for name, group in sorted(by_intent.items())
+        },
+        # Per request: time spent in each node / tool / DB alias / LLM model.
+        "spans_ms": {key: _distribution(values) for key, values in sorted(spans.items())},
+    }
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    """p95 changes per transport and intent against an earlier results file."""
+    lines = []
+    for transport, summary in current.get("transports", {}).items():
+        base = (baseline.get("transports") or {}).get(transport)
+        if not base:
+            continue
+        for intent, stats in summary["intents"].items():
+            before = (base.get("intents") or {}).get(intent, {}).get("p95")
+            after = stats.get("p95")
+            if before and after:
+                lines.append(f"{transport:<5}{intent:<15} p95 {before:>9.1f} -> {after:>9.1f} ms ({(after - before) / before:+.1%})")
+        before, after = base.get("throughput_rps"), summary.get("throughput_rps")
+        if before and after:
+            lines.append(f"{transport:<5}{'throughput':<15} {before:>13.1f} -> {after:>9.1f} req/s ({(after - before) / before:+.1%})")
+    return lines
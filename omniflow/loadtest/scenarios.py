@@ -0,0 +1,138 @@
+# loadtest/scenarios.py
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from omniflow.payguard.models import Wallet
+from omniflow.shipstream.models import Shipment
+from omniflow.shopcore.models import Order, User
+
+# Intent mix of a typical hour of traffic (weights, not percentages).
+DEFAULT_MIX = {
+    "tracking": 40,
+    "wallet": 20,
+    "paid_amount": 15,
+    "complex_query": 15,
+    "return_flow": 10,
+}
+
+# Rows sampled per scenario when building the workload; enough variety that
+# the entity caches see realistic hit ratios without loading whole tables.
+_SAMPLE = 500
+
+
+@dataclass
+class Step:
+    payload: dict
+    # Session-only steps (return confirmation) need the HTTP session cookie.
+    http_only: bool = False
+
+
+@dataclass
+class Conversation:
+    scenario: str
+    user_email: str
+    steps: List[Step] = field(default_factory=list)
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown scenario {name!r} (known: {', '.join(DEFAULT_MIX)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class WorkloadBuilder:
+    """Builds conversations from rows that exist in the databases under test."""
+
+    def __init__(self, seed: int = 42):
+        self.rng = random.Random(seed)
+        self._emails = dict(
+            User.objects.using("shopcore").exclude(email=None).exclude(email="").values_list("id", "email")[: _SAMPLE * 4]
+        )
+        self._orders = [
+            row for row in Order.objects.using("shopcore")
+            .filter(user_id__in=list(self._emails))
+            .exclude(product=None)
+            .values_list("id", "user_id", "product__name")
+            .order_by("id")[:_SAMPLE]
+        ]
+        order_users = {order_id: user_id for order_id, user_id, _ in self._orders}
+        self._shipments = [
+            (tracking, order_users[order_id])
+            for tracking, order_id in Shipment.objects.using("shipstream")
+            .filter(order_id__in=list(order_users), tracking_number__istartswith="FWD-")
+            .values_list("tracking_number", "order_id")[:_SAMPLE]
+        ]
+        self._wallet_users = [
+            user_id for user_id in Wallet.objects.using("payguard")
+            .filter(user_id__in=list(self._emails))
+            .values_list("user_id", flat=True)[:_SAMPLE]
+        ]
+
+    def available(self) -> Dict[str, bool]:
+        return {
+            "tracking": bool(self._shipments),
+            "wallet": bool(self._wallet_users),
+            "paid_amount": bool(self._orders),
+            "complex_query": bool(self._orders),
+            "return_flow": bool(self._shipments),
+        }
+
+    def build(self, count: int, mix: Dict[str, int]) -> List[Conversation]:
+        available = self.available()
+        mix = {name: weight for name, weight in mix.items() if weight > 0 and available.get(name)}
+        if not mix:
+            raise ValueError("None of the requested scenarios has matching rows (is the database seeded?)")
+        names = list(mix)
+        weights = [mix[n] for n in names]
+        return [getattr(self, f"_{name}")() for name in self.rng.choices(names, weights=weights, k=count)]
+
+    # ---------------- scenarios ----------------
+
+    def _tracking(self) -> Conversation:
+        tracking, user_id = self.rng.choice(self._shipments)
+        email = self._emails[user_id]
+        query = self.rng.choice([
+            f"Where is my package {tracking}?",
+            f"track {tracking}",
+            f"Has {tracking} been delivered yet?",
+        ])
+        return Conversation("tracking", email, [Step({"query": query, "user_email": email})])
+
+    def _wallet(self) -> Conversation:
+        email = self._emails[self.rng.choice(self._wallet_users)]
+        query = self.rng.choice(["What is my wallet balance?", "How much balance is in my wallet?"])
+        return Conversation("wallet", email, [Step({"query": query, "user_email": email})])
+
+    def _paid_amount(self) -> Conversation:
+        order_id, user_id, product = self.rng.choice(self._orders)
+        email = self._emails[user_id]
+        query = self.rng.choice([
+            f"How much did I pay for order {order_id}?",
+            f'How much did I pay for the "{product}"?',
+        ])
+        return Conversation("paid_amount", email, [Step({"query": query, "user_email": email})])
+
+    def _complex_query(self) -> Conversation:
+        _, user_id, product = self.rng.choice(self._orders)
+        email = self._emails[user_id]
+        query = (
+            f'I ordered a "{product}" last week but it hasn\'t arrived yet. '
+            "I also opened a support ticket. What is going on?"
+        )
+        return Conversation("complex_query", email, [Step({"query": query, "user_email": email})])
+
+    def _return_flow(self) -> Conversation:
+        tracking, user_id = self.rng.choice(self._shipments)
+        email = self._emails[user_id]
+        return Conversation("return_flow", email, [
+            Step({"query": f"I want to return {tracking}", "user_email": email}),
+            Step({"query": "confirm_return", "tracking_number": tracking, "user_email": email}, http_only=True),
+        ])
@@ -0,0 +1,7 @@
+"""
+Local stand-ins for the MCP services the agents call.
+
+Each module is a stdio MCP server over the domain databases and can be run
+on its own (`python -m omniflow.mcp_servers.user_service`). `harness.py`
+registers them with the agents' MCP client as local subprocesses.
+"""
@@ -0,0 +1,43 @@
+# mcp_servers/common.py
+import asyncio
+import os
+import sys
+from functools import partial
+from pathlib import Path
+
+try:
+    from mcp.server.mcpserver import MCPServer
+except ImportError:  # mcp < 2
+    from mcp.server.fastmcp import FastMCP as MCPServer
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent  # omniflow/ (holds backend/)
+REPO_DIR = PROJECT_DIR.parent
+
+
+def setup_django() -> None:
+    """Make the Django project importable and configured in a server subprocess."""
+    for path in (str(REPO_DIR), str(PROJECT_DIR)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+
+def create_server(name: str) -> MCPServer:
+    setup_django()
+    return MCPServer(name)
+
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Run ORM work off the server's event loop. Worker threads keep their DB
+    connections between calls, so a warm server does not reconnect per call.
+    """
+    return await asyncio.to_thread(partial(fn, *args, **kwargs))
+
+
+def serve(server: MCPServer) -> None:
+    server.run()
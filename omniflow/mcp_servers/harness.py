@@ -0,0 +1,49 @@
+# mcp_servers/harness.py
+import os
+import sys
+from typing import Iterable, Optional
+
+from omniflow.mcp_servers.common import PROJECT_DIR, REPO_DIR
+
+LOCAL_SERVERS = (
+    "user_service",
+    "product_service",
+    "order_service",
+    "tracking_service",
+    "logistics_service",
+    "payment_service",
+    "support_service",
+    "knowledge_service",
+    "vision_service",
+)
+
+
+def server_command(name: str) -> list:
+    if name not in LOCAL_SERVERS:
+        raise ValueError(f"Unknown local MCP server: {name}")
+    return [sys.executable, "-m", f"omniflow.mcp_servers.{name}"]
+
+
+def server_env() -> dict:
+    """
+    The MCP stdio client only forwards a minimal environment by default;
+    servers need the project on sys.path and the same Django settings and
+    database configuration as the parent process.
+    """
+    env = dict(os.environ)
+    paths = [str(REPO_DIR), str(PROJECT_DIR)]
+    if env.get("PYTHONPATH"):
+        paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    return env
+
+
+def register_local_servers(manager, names: Optional[Iterable[str]] = None) -> list:
+    """Register in-repo MCP servers with `manager`; they are spawned on first use."""
+    env = server_env()
+    registered = []
+    for name in names or LOCAL_SERVERS:
+        manager.register_server(name, server_command(name), env=env)
+        registered.append(name)
+    return registered
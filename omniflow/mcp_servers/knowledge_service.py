@@ -0,0 +1,16 @@
+# mcp_servers/knowledge_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("knowledge_service")
+
+from omniflow.caredesk import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def search(query: str, limit: int = 5) -> dict:
+    """Search past support conversations for similar issues."""
+    return await run_db(services.search_messages, query, limit)
+
+
+if __name__ == "__main__":
+    serve(server)
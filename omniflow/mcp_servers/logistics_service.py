@@ -0,0 +1,28 @@
+# mcp_servers/logistics_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("logistics_service")
+
+from omniflow.shipstream import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def get_return_status(tracking_number: str) -> dict:
+    """Whether a return has been created for a shipment."""
+    return await run_db(services.return_status, tracking_number)
+
+
+@server.tool()
+async def check_return_eligibility(tracking_number: str) -> dict:
+    """Whether a shipment can be returned."""
+    return await run_db(services.return_eligibility, tracking_number)
+
+
+@server.tool()
+async def initiate_return(tracking_number: str) -> dict:
+    """Create the reverse shipment for a delivered shipment."""
+    return await run_db(services.initiate_return, tracking_number)
+
+
+if __name__ == "__main__":
+    serve(server)
@@ -0,0 +1,16 @@
+# mcp_servers/order_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("order_service")
+
+from omniflow.shopcore import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def get_order(user_id: int, product_id: int) -> dict:
+    """Latest order for a user and product."""
+    return await run_db(services.order_summary, user_id, product_id)
+
+
+if __name__ == "__main__":
+    serve(server)
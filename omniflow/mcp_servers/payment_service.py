@@ -0,0 +1,22 @@
+# mcp_servers/payment_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("payment_service")
+
+from omniflow.payguard import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def get_wallet(user_id: int) -> dict:
+    """Wallet balance for a user."""
+    return await run_db(services.wallet_summary, user_id)
+
+
+@server.tool()
+async def get_transactions(order_id: int) -> dict:
+    """Wallet transactions for an order."""
+    return await run_db(services.order_transactions, order_id)
+
+
+if __name__ == "__main__":
+    serve(server)
@@ -0,0 +1,16 @@
+# mcp_servers/product_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("product_service")
+
+from omniflow.shopcore import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def get_product(name: str) -> dict:
+    """Look up a ShopCore product by (partial) name."""
+    return await run_db(services.product_summary, (name or "").strip())
+
+
+if __name__ == "__main__":
+    serve(server)
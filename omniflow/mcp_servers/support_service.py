@@ -0,0 +1,40 @@
+# mcp_servers/support_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("support_service")
+
+from omniflow.caredesk import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def get_ticket(user_id: int) -> dict:
+    """Latest support ticket and its messages for a user."""
+    return await run_db(services.ticket_with_messages, user_id)
+
+
+@server.tool()
+async def get_ticket_status(user_id: int, order_id: int | None = None) -> dict:
+    """Latest ticket status for a user, optionally scoped to an order."""
+    return await run_db(services.latest_ticket_status, user_id, order_id)
+
+
+@server.tool()
+async def create_ticket(user_id: int, issue_type: str, description: str) -> dict:
+    """Open a support ticket."""
+    return await run_db(services.create_ticket, user_id, issue_type, description)
+
+
+@server.tool()
+async def add_message(ticket_id: int, sender: str, content: str) -> dict:
+    """Append a message to a support ticket."""
+    return await run_db(services.add_message, ticket_id, sender, content)
+
+
+@server.tool()
+async def escalate_ticket(ticket_id: int, reason: str) -> dict:
+    """Mark a support ticket as escalated."""
+    return await run_db(services.escalate_ticket, ticket_id, reason)
+
+
+if __name__ == "__main__":
+    serve(server)
@@ -0,0 +1,22 @@
+# mcp_servers/tracking_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("tracking_service")
+
+from omniflow.shipstream import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def get_tracking(tracking_number: str) -> dict:
+    """Shipment status and ETA by tracking number."""
+    return await run_db(services.shipment_summary, (tracking_number or "").strip().upper())
+
+
+@server.tool()
+async def get_order_tracking(order_id: int) -> dict:
+    """Latest shipment and tracking events for a ShopCore order."""
+    return await run_db(services.tracking_for_order, order_id)
+
+
+if __name__ == "__main__":
+    serve(server)
@@ -0,0 +1,16 @@
+# mcp_servers/user_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("user_service")
+
+from omniflow.shopcore import services  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def get_user(email: str) -> dict:
+    """Look up a ShopCore user by email."""
+    return await run_db(services.user_summary, (email or "").strip())
+
+
+if __name__ == "__main__":
+    serve(server)
@@ -0,0 +1,35 @@
+# mcp_servers/vision_service.py
+from omniflow.mcp_servers.common import create_server, run_db, serve
+
+server = create_server("vision_service")
+
+from omniflow.core.vision import service as vision  # noqa: E402  (needs django.setup())
+
+
+@server.tool()
+async def analyze_image(image_data: str, query: str = "") -> dict:
+    """Describe an image and check it is usable as return proof."""
+    return await run_db(vision.analyze_image, image_data, query)
+
+
+@server.tool()
+async def identify_product(image_data: str) -> dict:
+    """Identify the catalog product shown in an image."""
+    return await run_db(vision.identify_product, image_data)
+
+
+
+@server.tool()
+async def analyze_images(images: list[str], query: str = "") -> list[dict]:
+    """Analyze several images in parallel on the vision worker pool, preserving order."""
+    return await vision.analyze_images_batch(images, query)
+
+
+@server.tool()
+async def identify_products(images: list[str]) -> list[dict]:
+    """Identify the catalog products in several images in parallel, preserving order."""
+    return await vision.identify_products_batch(images)
+
+
+if __name__ == "__main__":
+    serve(server)
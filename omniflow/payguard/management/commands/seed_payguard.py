@@ -3,8 +3,9 @@ from decimal import Decimal
 import random
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
 
+from omniflow.core.db.bulk import BulkLoader, chunked
+from omniflow.customer360 import projector
 from omniflow.payguard.models import Wallet, PaymentMethod, Transaction
 from omniflow.shopcore.models import User, Order
 
@@ -28,59 +29,64 @@ class Command(BaseCommand):
         providers = ["VISA", "MASTERCARD", "UPI"]
         currencies = ["INR"]
 
-        created_wallets = 0
-        created_methods = 0
-        created_tx = 0
-
-        with transaction.atomic(using="payguard"):
+        today = date.today()
+        # `users` are the lowest ids, so a range scan filtered in memory
+        # replaces an IN list that would exceed SQLite's parameter limit.
+        selected = set(users)
+        with BulkLoader("payguard") as loader:
+            wallets = {}
+            for wallet in Wallet.objects.using("payguard").filter(user_id__lte=users[-1]).order_by("-id"):
+                if wallet.user_id in selected:
+                    wallets[wallet.user_id] = wallet  # first wallet per user wins, as with .first()
+            new_wallets = loader.insert(Wallet, [
+                Wallet(user_id=int(uid), balance=Decimal("0.00"), currency=random.choice(currencies))
+                for uid in users
+                if uid not in wallets
+            ])
+            wallets.update({w.user_id: w for w in new_wallets})
+            created_wallets = len(new_wallets)
+
+            with_methods = loader.existing(PaymentMethod, "wallet_id", [w.id for w in wallets.values()])
+            created_methods = len(loader.insert(PaymentMethod, [
+                PaymentMethod(wallet_id=wallets[uid].id, provider=random.choice(providers), expiry_date=today + timedelta(days=365 * 2))
+                for uid in users
+                if wallets[uid].id not in with_methods
+            ]))
+
+            # Up to tx_per_wallet orders per user, in one streamed query.
+            order_ids = {uid: [] for uid in users}
+            orders = Order.objects.using("shopcore").filter(user_id__lte=users[-1]).order_by("id").values_list("id", "user_id")
+            for oid, uid in orders.iterator(chunk_size=10000):
+                if uid in selected and len(order_ids[uid]) < tx_per_wallet:
+                    order_ids[uid].append(oid)
+            orderless = [uid for uid in users if not order_ids[uid]]
+            if orderless:
+                with BulkLoader("shopcore") as shop:
+                    for o in shop.insert(Order, [
+                        Order(user_id=int(uid), product_id=1, order_date=today, status="PAID")
+                        for uid in orderless
+                        for _ in range(tx_per_wallet)
+                    ]):
+                        order_ids[o.user_id].append(o.id)
+
+            transactions = []
             for uid in users:
-                wallet = Wallet.objects.using("payguard").filter(user_id=int(uid)).first()
-                if not wallet:
-                    wallet = Wallet.objects.using("payguard").create(
-                        user_id=int(uid),
-                        balance=Decimal("0.00"),
-                        currency=random.choice(currencies),
-                    )
-                    created_wallets += 1
-
-                if not PaymentMethod.objects.using("payguard").filter(wallet_id=wallet.id).exists():
-                    PaymentMethod.objects.using("payguard").create(
-                        wallet=wallet,
-                        provider=random.choice(providers),
-                        expiry_date=date.today() + timedelta(days=365 * 2),
-                    )
-                    created_methods += 1
-
-                order_ids = list(Order.objects.using("shopcore").filter(user_id=int(uid)).values_list("id", flat=True)[:tx_per_wallet])
-                if not order_ids:
-                    with transaction.atomic(using="shopcore"):
-                        for _ in range(tx_per_wallet):
-                            o = Order.objects.using("shopcore").create(
-                                user_id=int(uid),
-                                product_id=1,
-                                order_date=date.today(),
-                                status="PAID",
-                            )
-                            order_ids.append(o.id)
-
+                wallet = wallets[uid]
                 for i in range(tx_per_wallet):
-                    order_id = int(order_ids[i % len(order_ids)])
+                    order_id = int(order_ids[uid][i % len(order_ids[uid])])
                     amount = Decimal(str(random.choice([199, 299, 499, 899, 1200, 1800])))
                     tx_type = random.choice(["Debit", "Refund"])
                     if tx_type == "Debit":
                         wallet.balance = (wallet.balance or Decimal("0.00")) + amount
                     else:
                         wallet.balance = (wallet.balance or Decimal("0.00")) - amount
+                    transactions.append(Transaction(wallet_id=wallet.id, order_id=order_id, amount=amount, type=tx_type))
+            created_tx = len(loader.insert(Transaction, transactions))
+            loader.update(Wallet, [wallets[uid] for uid in users], ["balance"])
 
-                    Transaction.objects.using("payguard").create(
-                        wallet=wallet,
-                        order_id=order_id,
-                        amount=amount,
-                        type=tx_type,
-                    )
-                    created_tx += 1
-
-                wallet.save(using="payguard")
+        # Bulk writes skip the signals that keep customer360 current.
+        for batch in chunked(sorted({t.order_id for t in transactions}), 500):
+            projector.refresh_orders(batch)
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -1,5 +1,7 @@
 from django.db import models
 
+from omniflow.events.models import OutboxEventBase
+
 
 class Wallet(models.Model):
     
@@ -51,3 +53,7 @@ class Transaction(models.Model):
 
     def __str__(self):
         return f"{self.type} - {self.amount}"
+
+
+class OutboxEvent(OutboxEventBase):
+    """Change log for the payguard database (see `omniflow.events`)."""
@@ -1,9 +1,100 @@
-from .models import Wallet, Transaction
+from omniflow.core.cache.entity import register_entity_cache
+from omniflow.core.cache.identity import identity_load
+
+from .models import PaymentMethod, Wallet, Transaction
+
+
+def _normalize_user_id(user_id):
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+
+wallets_by_user = register_entity_cache(
+    "payguard.wallet",
+    Wallet,
+    loader=lambda user_id: Wallet.objects.using("payguard").filter(user_id=user_id).first(),
+    key_for=lambda wallet: wallet.user_id,
+    normalize=_normalize_user_id,
+)
 
 
 def get_wallet_by_user_id(user_id: int):
-    return Wallet.objects.filter(user_id=user_id).first()
+    return wallets_by_user.get(user_id)
 
 
 def get_transactions_for_order(order_id: int):
-    return Transaction.objects.filter(order_id=order_id).order_by("-timestamp")
\ No newline at end of file
+    return Transaction.objects.filter(order_id=order_id).order_by("-timestamp")
+
+
+def get_debit_for_order(order_id: int):
+    """Latest debit charged for an order, memoized for the current turn."""
+    return identity_load(
+        Transaction, "debit_for_order", int(order_id),
+        lambda: (
+            Transaction.objects.using("payguard")
+            .filter(order_id=order_id, type__iexact="Debit")
+            .order_by("-timestamp")
+            .first()
+        ),
+    )
+
+
+# Dict payloads shared by the PayGuard agent's DB fallbacks and the local
+# payment MCP server.
+
+def wallet_summary(user_id: int) -> dict:
+    wallet = get_wallet_by_user_id(user_id)
+    if not wallet:
+        return {}
+    return {
+        "wallet_id": wallet.id,
+        "user_id": wallet.user_id,
+        "balance": str(wallet.balance),
+        "currency": wallet.currency,
+    }
+
+
+def order_transactions(order_id: int) -> dict:
+    return {
+        "transactions": [
+            {
+                "id": tx.id,
+                "wallet_id": tx.wallet_id,
+                "order_id": tx.order_id,
+                "amount": str(tx.amount),
+                "type": tx.type,
+                "timestamp": str(tx.timestamp),
+            }
+            for tx in get_transactions_for_order(order_id)
+        ]
+    }
+
+
+def payment_methods(user_id=None, wallet_id=None, limit: int = 20) -> dict:
+    """Payment methods for `wallet_id`, or for the user's wallet when only `user_id` is given."""
+    if wallet_id is None and user_id is not None:
+        wallet = get_wallet_by_user_id(user_id)
+        wallet_id = wallet.id if wallet else None
+
+    if wallet_id is None:
+        return {"payment_methods": []}
+
+    methods = (
+        PaymentMethod.objects.using("payguard")
+        .filter(wallet_id=int(wallet_id))
+        .order_by("id")[: max(1, int(limit))]
+    )
+    return {
+        "wallet_id": int(wallet_id),
+        "payment_methods": [
+            {
+                "method_id": m.id,
+                "wallet_id": m.wallet_id,
+                "provider": m.provider,
+                "expiry_date": str(m.expiry_date),
+            }
+            for m in methods
+        ],
+    }
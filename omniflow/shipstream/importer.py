@@ -0,0 +1,341 @@
+# shipstream/importer.py
+"""
+Streaming import of shipment data files.
+
+Two input formats are accepted:
+
+* JSON shaped like `sql_files/dummy_shipment_data.json`:
+  `{"forward_shipments": {"FWD-1001": {...}}, "reverse_shipments": {...}, ...}`
+* NDJSON, one record per line, e.g.
+  `{"section": "forward_shipments", "tracking_number": "FWD-1001", "date": "2023-10-01", ...}`;
+  `section` may be left out when the whole file is one section.
+
+Records are parsed incrementally, validated, and upserted in fixed-size
+batches, one transaction per batch. After every committed batch the
+position is written to a checkpoint file so an interrupted import can
+resume where it stopped.
+"""
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.utils.dateparse import parse_date
+
+from omniflow.core.db.bulk import BulkLoader, chunked
+from omniflow.customer360 import projector
+from omniflow.utils.jsonstream import iter_members, iter_ndjson
+
+from .models import ExchangeShipment, NdrEvent, ReverseShipment, Shipment
+
+# Section name -> field holding the record's key in NDJSON input.
+SECTIONS = {
+    "forward_shipments": "tracking_number",
+    "reverse_shipments": "reverse_number",
+    "ndr_shipments": "ndr_number",
+    "exchange_shipments": "exchange_number",
+}
+
+
+class RecordError(ValueError):
+    """A record that cannot be imported; the message is the reject reason."""
+
+
+def detect_format(path: Path) -> str:
+    return "ndjson" if path.suffix.lower() in (".ndjson", ".jsonl") else "json"
+
+
+def iter_records(
+    path: Path,
+    fmt: Optional[str] = None,
+    section: str = "forward_shipments",
+    start: int = 0,
+) -> Iterator[Tuple[str, str, dict, int]]:
+    """
+    Yield `(section, key, record, position)` from a JSON or NDJSON file.
+
+    `position` is the byte offset after the record for NDJSON and the
+    record ordinal for JSON; `start` is where to resume (a byte offset for
+    NDJSON; JSON records before ordinal `start` are parsed and skipped).
+    """
+    fmt = fmt or detect_format(path)
+    with path.open("rb") as fp:
+        if fmt == "ndjson":
+            for line_number, row, offset in iter_ndjson(fp, offset=start):
+                if not isinstance(row, dict):
+                    yield "", f"line {line_number}", row, offset
+                    continue
+                name = row.pop("section", None) or section
+                key = row.pop(SECTIONS.get(name, "key"), None) or row.pop("key", None)
+                yield name, key, row, offset
+            return
+        ordinal = 0
+        for path_, row, _ in iter_members(fp, depth=2):
+            if len(path_) != 2:
+                continue  # top-level scalars (metadata) are not records
+            ordinal += 1
+            if ordinal > start:
+                yield path_[0], path_[1], row, ordinal
+
+
+def _text(row: dict, name: str, max_length: int) -> str:
+    value = row.get(name)
+    value = "" if value is None else str(value).strip()
+    if len(value) > max_length:
+        raise RecordError(f"{name} longer than {max_length}")
+    return value
+
+
+def _date(row: dict, name: str, required: bool = False):
+    value = row.get(name)
+    if not value:
+        if required:
+            raise RecordError(f"missing {name}")
+        return None
+    try:
+        parsed = parse_date(str(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise RecordError(f"invalid {name}")
+    return parsed
+
+
+def _awb(row: dict) -> str:
+    awb = _text(row, "original_awb", 50)
+    if not awb:
+        raise RecordError("missing original_awb")
+    return awb
+
+
+def _key(key, max_length: int = 50) -> str:
+    key = "" if key is None else str(key).strip()
+    if not key:
+        raise RecordError("missing key")
+    if len(key) > max_length:
+        raise RecordError("key too long")
+    return key
+
+
+def derive_order_id(tracking_number: str) -> Optional[int]:
+    # FWD-1012 -> 1012
+    try:
+        return int(tracking_number.split("-")[-1])
+    except Exception:
+        return None
+
+
+def build_forward(key, row: dict) -> Shipment:
+    tracking_number = _key(key)
+    shipment_date = _date(row, "date")
+    amount = row.get("amount")
+    try:
+        amount_decimal = Decimal(str(amount)) if amount is not None else Decimal("0.00")
+    except InvalidOperation:
+        raise RecordError("invalid amount")
+    if not amount_decimal.is_finite() or abs(amount_decimal) >= Decimal("1e10"):
+        raise RecordError("invalid amount")
+    return Shipment(
+        tracking_number=tracking_number,
+        order_id=derive_order_id(tracking_number),
+        shipment_date=shipment_date,
+        estimated_arrival=shipment_date + timedelta(days=4) if shipment_date else None,
+        customer_name=_text(row, "customer", 100),
+        status=_text(row, "status", 50),
+        amount=amount_decimal.quantize(Decimal("0.01")),
+        notes=_text(row, "notes", 100_000),
+    )
+
+
+def build_reverse(key, row: dict) -> ReverseShipment:
+    return ReverseShipment(
+        reverse_number=_key(key),
+        original_shipment_id=_awb(row),
+        return_date=_date(row, "return_date", required=True),
+        reason=_text(row, "reason", 200),
+        refund_status=_text(row, "refund_status", 50),
+    )
+
+
+def build_ndr(key, row: dict) -> NdrEvent:
+    attempts = row.get("attempts")
+    try:
+        attempts_int = int(attempts) if attempts is not None else 1
+    except (TypeError, ValueError):
+        raise RecordError("invalid attempts")
+    return NdrEvent(
+        ndr_number=_key(key),
+        original_shipment_id=_awb(row),
+        ndr_date=_date(row, "ndr_date", required=True),
+        issue=_text(row, "issue", 200),
+        attempts=attempts_int,
+        final_outcome=_text(row, "final_outcome", 50),
+    )
+
+
+def build_exchange(key, row: dict) -> ExchangeShipment:
+    return ExchangeShipment(
+        exchange_number=_key(key),
+        original_shipment_id=_awb(row),
+        exchange_date=_date(row, "exchange_date", required=True),
+        new_item=_text(row, "new_item", 200),
+        status=_text(row, "status", 50),
+    )
+
+
+BUILDERS: Dict[str, Callable[[str, dict], object]] = {
+    "forward_shipments": build_forward,
+    "reverse_shipments": build_reverse,
+    "ndr_shipments": build_ndr,
+    "exchange_shipments": build_exchange,
+}
+
+
+class Checkpoint:
+    """Import position for one source file, rewritten atomically after each batch."""
+
+    def __init__(self, path: Path, source: Path):
+        self.path = path
+        stat = source.stat()
+        self.identity = {"source": str(source.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def load(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        state = json.loads(self.path.read_text())
+        if any(state.get(k) != v for k, v in self.identity.items()):
+            raise ValueError(f"Checkpoint {self.path} belongs to a different or modified file")
+        return state
+
+    def save(self, position: int, stats: "ImportStats") -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({**self.identity, "position": position, "records": stats.records, "written": stats.written, "rejected": stats.rejected}))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class ImportStats:
+    records: int = 0
+    written: int = 0
+    rejected: int = 0
+    reasons: Counter = field(default_factory=Counter)
+    examples: List[str] = field(default_factory=list)
+    elapsed_s: float = 0.0
+    # Records already imported by the run this one resumed.
+    resumed_from: int = 0
+
+    @property
+    def rate(self) -> float:
+        return (self.records - self.resumed_from) / self.elapsed_s if self.elapsed_s else 0.0
+
+
+class ShipmentImporter:
+    def __init__(
+        self,
+        batch_size: int = 5000,
+        alias: str = "shipstream",
+        progress: Optional[Callable[[str], None]] = None,
+        max_examples: int = 10,
+        emit_events: bool = True,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.alias = alias
+        self.emit_events = emit_events
+        self.progress = progress
+        self.max_examples = max_examples
+
+    def run(
+        self,
+        path: Path,
+        fmt: Optional[str] = None,
+        section: str = "forward_shipments",
+        checkpoint: Optional[Checkpoint] = None,
+        resume: bool = False,
+    ) -> ImportStats:
+        stats = ImportStats()
+        start = 0
+        if resume and checkpoint:
+            state = checkpoint.load()
+            if state:
+                start = int(state["position"])
+                stats.records, stats.written, stats.rejected = state["records"], state["written"], state["rejected"]
+                stats.resumed_from = stats.records
+                self._report(f"resuming after {stats.records} records")
+
+        total_bytes = path.stat().st_size
+        started = time.perf_counter()
+        pending: Dict[str, list] = {name: [] for name in SECTIONS}
+        size = unsaved = 0
+        position = start
+        for name, key, row, position in iter_records(path, fmt, section, start):
+            stats.records += 1
+            unsaved += 1
+            try:
+                if not isinstance(row, dict):
+                    raise RecordError("record is not an object")
+                if name not in BUILDERS:
+                    raise RecordError(f"unknown section {name!r}")
+                pending[name].append(BUILDERS[name](key, row))
+                size += 1
+            except RecordError as e:
+                stats.rejected += 1
+                stats.reasons[str(e)] += 1
+                if len(stats.examples) < self.max_examples:
+                    stats.examples.append(f"{name}/{key}: {e}")
+            if size >= self.batch_size:
+                stats.written += self._flush(pending)
+                size = unsaved = 0
+                self._checkpoint(checkpoint, position, stats, started, fmt or detect_format(path), total_bytes)
+
+        if unsaved:
+            stats.written += self._flush(pending)
+            self._checkpoint(checkpoint, position, stats, started, fmt or detect_format(path), total_bytes)
+        stats.elapsed_s = round(time.perf_counter() - started, 2)
+        if checkpoint:
+            checkpoint.clear()
+        return stats
+
+    def _report(self, message: str) -> None:
+        if self.progress:
+            self.progress(message)
+
+    def _checkpoint(self, checkpoint, position, stats, started, fmt, total_bytes) -> None:
+        if checkpoint:
+            checkpoint.save(position, stats)
+        stats.elapsed_s = time.perf_counter() - started
+        where = f", {position / total_bytes:.0%} of file" if fmt == "ndjson" and total_bytes else ""
+        self._report(f"{stats.records} records ({stats.rate:,.0f}/s), {stats.written} written, {stats.rejected} rejected{where}")
+
+    def _flush(self, pending: Dict[str, list]) -> int:
+        forward = pending["forward_shipments"]
+        dependants = pending["reverse_shipments"] + pending["ndr_shipments"] + pending["exchange_shipments"]
+        if not forward and not dependants:
+            return 0
+        with BulkLoader(self.alias, batch_size=self.batch_size, emit_events=self.emit_events) as loader:
+            loader.upsert(Shipment, forward, unique_fields=["tracking_number"])
+            # Placeholder forward shipments for AWBs only referenced by returns/NDRs/exchanges;
+            # a forward record later in the file fills them in.
+            referenced = {obj.original_shipment_id for obj in dependants} - {s.tracking_number for s in forward}
+            known = loader.existing(Shipment, "tracking_number", referenced)
+            loader.insert(Shipment, [Shipment(tracking_number=awb) for awb in sorted(referenced - known)], ignore_conflicts=True)
+            loader.upsert(ReverseShipment, pending["reverse_shipments"], unique_fields=["reverse_number"])
+            loader.upsert(NdrEvent, pending["ndr_shipments"], unique_fields=["ndr_number"])
+            loader.upsert(ExchangeShipment, pending["exchange_shipments"], unique_fields=["exchange_number"])
+
+        # Bulk writes skip the signals that keep customer360 current.
+        order_ids = sorted({s.order_id for s in forward if s.order_id is not None})
+        for batch in chunked(order_ids, 500):
+            projector.refresh_orders(batch)
+
+        written = len(forward) + len(dependants)
+        for rows in pending.values():
+            rows.clear()
+        return written
@@ -0,0 +1,144 @@
+# shipstream/linking.py
+"""
+Link shipments to ShopCore orders through customer ownership.
+
+A shipment keeps its order when that order exists. Otherwise (no order, or
+one that was deleted) it is linked to the latest order of the user whose
+name matches `customer_name` exactly, or left unlinked. Everything is
+planned from a handful of streamed queries and applied with `bulk_update`.
+"""
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.db.models import Max
+
+from omniflow.core.db.bulk import BulkLoader, chunked
+from omniflow.customer360 import projector
+from omniflow.shopcore.models import Order, User
+
+from .models import Shipment
+
+# Outcomes per shipment, in the order the summary prints them.
+KEPT = "kept"                      # order_id points at an existing order
+LINKED = "linked"                  # linked to the customer's latest order
+CLEARED = "cleared"                # dangling order_id removed, no replacement found
+NO_USER = "no_user"                # no user with that exact name
+AMBIGUOUS_USER = "ambiguous_user"  # several users share the name; left alone
+NO_ORDER = "no_order"              # the user has no orders
+OUTCOMES = (KEPT, LINKED, CLEARED, NO_USER, AMBIGUOUS_USER, NO_ORDER)
+
+
+@dataclass
+class Assignment:
+    shipment_id: int
+    tracking_number: str
+    old_order_id: Optional[int]
+    new_order_id: Optional[int]
+    outcome: str
+
+    def describe(self) -> str:
+        return f"{self.tracking_number or self.shipment_id}: order {self.old_order_id} -> {self.new_order_id} ({self.outcome})"
+
+
+@dataclass
+class LinkPlan:
+    changes: List[Assignment] = field(default_factory=list)
+    outcomes: Counter = field(default_factory=Counter)
+    scanned: int = 0
+    elapsed_s: float = 0.0
+
+
+def _progress(progress: Optional[Callable[[str], None]], message: str) -> None:
+    if progress:
+        progress(message)
+
+
+def _stream(qs, chunk_size: int) -> Iterator:
+    return qs.iterator(chunk_size=chunk_size)
+
+
+def plan_links(batch_size: int = 10000, progress: Optional[Callable[[str], None]] = None) -> LinkPlan:
+    """
+    Work out every shipment whose `order_id` should change, without writing.
+
+    Reads: all order ids, shipments needing a link, users by name and the
+    latest order per user; each is one streamed query, so the cost grows
+    with table size rather than with round trips.
+    """
+    started = time.perf_counter()
+    plan = LinkPlan()
+
+    order_ids = set(_stream(Order.objects.using("shopcore").values_list("id", flat=True), batch_size))
+    _progress(progress, f"{len(order_ids)} orders loaded")
+
+    pending = []
+    rows = Shipment.objects.using("shipstream").order_by("id").values_list("id", "tracking_number", "order_id", "customer_name")
+    for shipment_id, tracking_number, order_id, customer_name in _stream(rows, batch_size):
+        plan.scanned += 1
+        if order_id and order_id in order_ids:
+            plan.outcomes[KEPT] += 1
+        else:
+            pending.append((shipment_id, tracking_number, order_id, customer_name or ""))
+        if plan.scanned % (batch_size * 10) == 0:
+            _progress(progress, f"{plan.scanned} shipments scanned")
+    _progress(progress, f"{plan.scanned} shipments scanned, {len(pending)} need a link")
+
+    names = {name for *_, name in pending if name}
+    users_by_name: Dict[str, Optional[int]] = {}
+    for user_id, name in _stream(User.objects.using("shopcore").values_list("id", "name"), batch_size):
+        if name in names:
+            # None marks a name shared by several users (User.objects.get would raise).
+            users_by_name[name] = None if name in users_by_name else user_id
+
+    wanted_users = {uid for uid in users_by_name.values() if uid is not None}
+    latest_order: Dict[int, int] = {}
+    latest = Order.objects.using("shopcore").values("user_id").annotate(latest=Max("id")).values_list("user_id", "latest")
+    for user_id, order_id in _stream(latest.order_by(), batch_size):
+        if user_id in wanted_users:
+            latest_order[user_id] = order_id
+
+    for shipment_id, tracking_number, old, name in pending:
+        new, outcome = None, None
+        if name not in users_by_name:
+            outcome = NO_USER
+        elif users_by_name[name] is None:
+            outcome = AMBIGUOUS_USER
+        else:
+            new = latest_order.get(users_by_name[name])
+            outcome = LINKED if new else NO_ORDER
+
+        if outcome == AMBIGUOUS_USER:
+            # Left exactly as it is for someone to resolve by hand.
+            plan.outcomes[outcome] += 1
+            continue
+        if old and not new:
+            outcome = CLEARED
+        plan.outcomes[outcome] += 1
+        if new != old:
+            plan.changes.append(Assignment(shipment_id, tracking_number, old, new, outcome))
+
+    plan.elapsed_s = round(time.perf_counter() - started, 2)
+    return plan
+
+
+def apply_links(plan: LinkPlan, batch_size: int = 5000, progress: Optional[Callable[[str], None]] = None) -> int:
+    """Write `plan.changes` with `bulk_update` and re-project the affected orders."""
+    if not plan.changes:
+        return 0
+    updated = 0
+    with BulkLoader("shipstream", batch_size=batch_size) as loader:
+        for batch in chunked(plan.changes, batch_size):
+            # Full rows, so the outbox events carry the whole shipment as a save() would.
+            shipments = Shipment.objects.using("shipstream").in_bulk([a.shipment_id for a in batch])
+            for a in batch:
+                if a.shipment_id in shipments:
+                    shipments[a.shipment_id].order_id = a.new_order_id
+            updated += loader.update(Shipment, shipments.values(), ["order"])
+            _progress(progress, f"{updated}/{len(plan.changes)} shipments updated")
+
+    touched = sorted({i for a in plan.changes for i in (a.old_order_id, a.new_order_id) if i})
+    for batch in chunked(touched, 500):
+        projector.refresh_orders(batch)
+    return updated
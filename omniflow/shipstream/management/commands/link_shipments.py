@@ -1,45 +1,34 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from omniflow.shipstream.models import Shipment
-from omniflow.shopcore.models import User, Order
+
+from omniflow.shipstream.linking import OUTCOMES, apply_links, plan_links
+
 
 class Command(BaseCommand):
     help = "Link shipments to orders using customer ownership"
 
-    def handle(self, *args, **options):
-        updated = 0
-        skipped = 0
-
-        with transaction.atomic():
-            for shipment in Shipment.objects.using("shipstream").all():
-
-                if shipment.order_id:
-                    try:
-                        Order.objects.using("shopcore").get(id=shipment.order_id)
-                        skipped += 1
-                        continue
-                    except Order.DoesNotExist:
-                        shipment.order_id = None
-                        shipment.save(update_fields=["order"], using="shipstream")
-
-                try:
-                    user = User.objects.using("shopcore").get(name=shipment.customer_name)
-                except User.DoesNotExist:
-                    skipped += 1
-                    continue
-
-                order = (
-                    Order.objects.using("shopcore")
-                    .filter(user=user)
-                    .order_by("-id")
-                    .first()
-                )
-
-                if not order:
-                    skipped += 1
-                    continue
-
-                shipment.order_id = order.id
-                shipment.save(update_fields=["order"], using="shipstream")
-                updated += 1
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Print the changes without writing them")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Shipments per UPDATE batch (default: 5000)")
+        parser.add_argument("--show", type=int, default=20, help="Changes to print (default: 20, 0 for none, -1 for all)")
 
+    def handle(self, *args, **options):
+        report = lambda message: self.stdout.write(f"  {message}")
+        plan = plan_links(batch_size=max(options["batch_size"], 1000), progress=report)
+
+        self.stdout.write(f"Scanned {plan.scanned} shipments in {plan.elapsed_s} s:")
+        for outcome in OUTCOMES:
+            self.stdout.write(f"  {outcome:<16}{plan.outcomes.get(outcome, 0):>10}")
+
+        show = options["show"]
+        shown = plan.changes if show < 0 else plan.changes[:show]
+        for assignment in shown:
+            self.stdout.write(f"  {assignment.describe()}")
+        if len(shown) < len(plan.changes):
+            self.stdout.write(f"  ... and {len(plan.changes) - len(shown)} more")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Dry run: {len(plan.changes)} shipments would change"))
+            return
+
+        updated = apply_links(plan, batch_size=options["batch_size"], progress=report)
+        self.stdout.write(self.style.SUCCESS(f"✅ Linked shipments. updated={updated}"))
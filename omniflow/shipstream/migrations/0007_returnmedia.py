@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipstream', '0006_trackingevent_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReturnMedia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('media_id', models.CharField(max_length=50, unique=True)),
+                ('tracking_number', models.CharField(db_index=True, max_length=50)),
+                ('user_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size_bytes', models.BigIntegerField()),
+                ('mime_type', models.CharField(default='', max_length=100)),
+                ('storage_path', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='returnrequest',
+            name='media_id',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+    ]
@@ -1,6 +1,9 @@
-from django.db import models
 from decimal import Decimal
 
+from django.db import models
+
+from omniflow.events.models import OutboxEventBase
+
 
 class Warehouse(models.Model):
     location = models.CharField(max_length=100)
@@ -41,6 +44,7 @@ class ReturnRequest(models.Model):
     user_email = models.EmailField(null=True, blank=True)
     image_blob = models.BinaryField(null=True, blank=True)
     image_mime_type = models.CharField(max_length=100, default="")
+    media_id = models.CharField(max_length=50, blank=True, default="")
     status = models.CharField(max_length=50, default="Initiated")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -49,6 +53,22 @@ class ReturnRequest(models.Model):
         return self.return_id
 
 
+class ReturnMedia(models.Model):
+    """Return-proof media uploaded out-of-band and referenced by media_id."""
+
+    media_id = models.CharField(max_length=50, unique=True)
+    tracking_number = models.CharField(max_length=50, db_index=True)
+    user_email = models.EmailField(null=True, blank=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size_bytes = models.BigIntegerField()
+    mime_type = models.CharField(max_length=100, default="")
+    storage_path = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.media_id
+
+
 class TrackingEvent(models.Model):
     shipment = models.ForeignKey(
         Shipment,
@@ -120,3 +140,6 @@ class ExchangeShipment(models.Model):
     def __str__(self):
         return self.exchange_number
 
+
+class OutboxEvent(OutboxEventBase):
+    """Change log for the shipstream database (see `omniflow.events`)."""
@@ -1,4 +1,51 @@
-from .models import Shipment, TrackingEvent
+from datetime import date
+
+from django.db import transaction
+
+from omniflow.core.cache.entity import register_entity_cache
+from omniflow.core.cache.identity import identity_load
+
+from .models import ReverseShipment, Shipment, TrackingEvent, Warehouse
+
+
+def normalize_tracking_number(tracking_number) -> str:
+    return (tracking_number or "").strip().upper()
+
+
+shipments_by_tracking = register_entity_cache(
+    "shipstream.shipment",
+    Shipment,
+    loader=lambda tn: Shipment.objects.using("shipstream").filter(tracking_number__iexact=tn).first(),
+    key_for=lambda shipment: shipment.tracking_number,
+    normalize=normalize_tracking_number,
+)
+
+
+def get_shipment_by_tracking_number(tracking_number: str):
+    return shipments_by_tracking.get(tracking_number)
+
+
+def get_reverse_for_shipment(tracking_number: str):
+    tn = normalize_tracking_number(tracking_number)
+    return identity_load(
+        ReverseShipment, "original_awb", tn,
+        lambda: ReverseShipment.objects.using("shipstream").filter(original_shipment__tracking_number=tn).first(),
+    )
+
+
+def get_reverse_shipment(reverse_number: str):
+    rn = normalize_tracking_number(reverse_number)
+    return identity_load(
+        ReverseShipment, "reverse_number", rn,
+        lambda: ReverseShipment.objects.using("shipstream").filter(reverse_number=rn).first(),
+    )
+
+
+def get_latest_shipment_for_order(order_id: int):
+    return identity_load(
+        Shipment, "order_id", int(order_id),
+        lambda: Shipment.objects.using("shipstream").filter(order_id=order_id).order_by("-id").first(),
+    )
 
 
 def get_shipment_by_order_id(order_id: int):
@@ -12,3 +59,198 @@ def get_latest_tracking_event(shipment_id: int):
         .order_by("-timestamp")
         .first()
     )
+
+
+# Dict payloads shared by the ShipStream agent's DB fallbacks and the local
+# tracking/logistics MCP servers, so both paths answer identically.
+
+def shipment_summary(tracking_number: str) -> dict:
+    shipment = get_shipment_by_tracking_number(tracking_number)
+    if not shipment:
+        return {}
+
+    return {
+        "tracking_number": shipment.tracking_number,
+        "current_status": shipment.status,
+        "estimated_arrival": str(shipment.estimated_arrival) if shipment.estimated_arrival else None,
+        "last_updated": str(shipment.shipment_date) if shipment.shipment_date else None,
+        "customer": shipment.customer_name,
+        "amount": str(shipment.amount),
+    }
+
+
+def tracking_for_order(order_id: int) -> dict:
+    shipment = get_latest_shipment_for_order(order_id)
+    if not shipment:
+        return {
+            "found": False,
+            "reason": "shipment_not_found_for_order",
+            "order_id": order_id,
+        }
+
+    events = list(
+        TrackingEvent.objects
+        .using("shipstream")
+        .filter(shipment_id=shipment.id)
+        .order_by("-timestamp")[:10]
+    )
+
+    warehouse_ids = {e.warehouse_id for e in events if getattr(e, "warehouse_id", None) is not None}
+    warehouses = (
+        Warehouse.objects
+        .using("shipstream")
+        .filter(id__in=list(warehouse_ids))
+    )
+    warehouse_map = {w.id: w.location for w in warehouses}
+
+    event_payload = []
+    for e in events:
+        event_payload.append({
+            "timestamp": str(e.timestamp),
+            "status_update": e.status_update,
+            "warehouse_id": e.warehouse_id,
+            "location": warehouse_map.get(e.warehouse_id),
+        })
+
+    current_location = None
+    if event_payload:
+        current_location = event_payload[0].get("location")
+
+    return {
+        "found": True,
+        "order_id": order_id,
+        "shipment_id": shipment.id,
+        "tracking_number": shipment.tracking_number,
+        "shipment_status": shipment.status,
+        "current_location": current_location,
+        "events": event_payload,
+    }
+
+
+def return_status(tracking_number: str) -> dict:
+    reverse = get_reverse_for_shipment(tracking_number)
+
+    if not reverse:
+        return {
+            "message": (
+                f"No return has been created yet for shipment {tracking_number}. "
+                "The shipment is currently being processed."
+            )
+        }
+
+    return {
+        "message": (
+            f"Yes, a return has already been created for {tracking_number}. "
+            f"The return shipment {reverse.reverse_number} was initiated on "
+            f"{reverse.return_date}, and the refund status is "
+            f"'{reverse.refund_status}'."
+        )
+    }
+
+
+def return_eligibility(tracking_number: str) -> dict:
+    tn = normalize_tracking_number(tracking_number)
+    shipment = get_shipment_by_tracking_number(tn)
+
+    if not shipment:
+        return {
+            "eligible": False,
+            "message": f"I couldn't find a shipment with tracking ID {tn}."
+        }
+
+    if shipment.status != "Delivered":
+        return {
+            "eligible": False,
+            "message": (
+                f"Shipment {tn} cannot be returned because "
+                f"its current status is '{shipment.status}'."
+            )
+        }
+
+    return {
+        "eligible": True,
+        "message": (
+            f"Your order {tn} was delivered successfully.\n\n"
+            "Are you sure you want to initiate a return? "
+            "Please reply with **YES** to confirm or **NO** to cancel."
+        )
+    }
+
+
+def initiate_return(tracking_number: str) -> dict:
+    tn = (tracking_number or "").strip().upper()
+
+    with transaction.atomic(using="shipstream"):
+        shipment = (
+            Shipment.objects
+            .using("shipstream")
+            .select_for_update()
+            .filter(tracking_number__iexact=tn)
+            .first()
+        )
+
+        if not shipment:
+            return {
+                "success": False,
+                "message": f"I couldn't find shipment {tn}."
+            }
+
+        existing_reverse = (
+            ReverseShipment.objects
+            .using("shipstream")
+            .filter(original_shipment=shipment)
+            .first()
+        )
+
+        if existing_reverse:
+            return {
+                "success": True,
+                "reverse_number": existing_reverse.reverse_number,
+                "message": (
+                    f"A return has already been initiated for {tn}. "
+                    f"The return shipment ID is {existing_reverse.reverse_number}."
+                )
+            }
+
+        if shipment.status != "Delivered":
+            return {
+                "success": False,
+                "message": (
+                    f"Shipment {tn} cannot be returned because "
+                    f"its current status is '{shipment.status}'."
+                )
+            }
+
+        # 🔄 Update forward shipment
+        shipment.status = "RTO_Initiated"
+        shipment.save(update_fields=["status"])
+
+        # 🔁 Create reverse shipment
+        base_num = shipment.id + 9000
+        reverse_number = f"REV-{base_num}"
+        while (
+            ReverseShipment.objects
+            .using("shipstream")
+            .filter(reverse_number=reverse_number)
+            .exists()
+        ):
+            base_num += 1
+            reverse_number = f"REV-{base_num}"
+
+        reverse = ReverseShipment.objects.using("shipstream").create(
+            reverse_number=reverse_number,
+            original_shipment=shipment,
+            return_date=date.today(),
+            reason="Customer Initiated",
+            refund_status="Pending",
+        )
+
+        return {
+            "success": True,
+            "reverse_number": reverse.reverse_number,
+            "message": (
+                f"Your return has been initiated successfully for {tn}. "
+                f"The return shipment ID is {reverse.reverse_number}. "
+                "Once the item is received, your refund will be processed."
+            )
+        }
@@ -0,0 +1,68 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from omniflow.core.vision.backends import REFERENCE_FILE, PerceptualHashBackend
+from omniflow.core.vision.decode import decode_image
+from omniflow.core.vision.index import ProductImageIndex, default_index_path
+from omniflow.shopcore.models import Product
+
+
+class Command(BaseCommand):
+    help = "Build the memory-mapped product image similarity index used by the vision agent"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            default=None,
+            help="Directory of reference images named <product_id>[_suffix].<ext>. Defaults to VISION_REFERENCE_DIR or <MEDIA_ROOT>/product_images",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Index path without extension (writes <path>.versions/<version>/ and the <path>.current pointer). Defaults to VISION_INDEX_PATH or <MEDIA_ROOT>/product_images/index",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options["source"]) if options.get("source") else PerceptualHashBackend().reference_dir
+        output = Path(options["output"]) if options.get("output") else default_index_path()
+
+        if not source.is_dir():
+            raise FileNotFoundError(f"Reference image directory not found: {source}")
+
+        started = time.perf_counter()
+        files = []
+        for path in sorted(source.iterdir()):
+            m = REFERENCE_FILE.match(path.name)
+            if m:
+                files.append((int(m.group("product_id")), path))
+
+        names = dict(
+            Product.objects.using("shopcore")
+            .filter(id__in={pid for pid, _ in files})
+            .values_list("id", "name")
+        )
+
+        items = []
+        skipped = 0
+        for product_id, path in files:
+            if product_id not in names:
+                self.stdout.write(self.style.WARNING(f"⚠️ Skipping {path.name}: no product {product_id}"))
+                skipped += 1
+                continue
+            try:
+                items.append((product_id, names[product_id], decode_image(path.read_bytes())))
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"⚠️ Skipping {path.name}: {e}"))
+                skipped += 1
+
+        index = ProductImageIndex.build(items)
+        version = index.save(output)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Built product image index. rows={len(index)} "
+            f"products={len({pid for pid, _, _ in items})} skipped={skipped} "
+            f"path={ProductImageIndex.versions_dir(output) / version} in {elapsed:.2f}s"
+        ))
@@ -1,11 +1,11 @@
-import json
 import re
 from pathlib import Path
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import transaction
 
+from omniflow.core.db.bulk import BulkLoader
+from omniflow.shipstream.importer import iter_records
 from omniflow.shopcore.models import User
 
 
@@ -18,6 +18,7 @@ class Command(BaseCommand):
             default=None,
             help="Optional path to dummy_shipment_data.json. Defaults to <BASE_DIR>/sql_files/dummy_shipment_data.json",
         )
+        parser.add_argument("--format", choices=["json", "ndjson"], default=None, help="Input format (default: from the file extension)")
 
     def handle(self, *args, **options):
         json_path = options.get("path")
@@ -29,33 +30,30 @@ class Command(BaseCommand):
         if not data_path.exists():
             raise FileNotFoundError(f"Dummy shipment JSON not found: {data_path}")
 
-        with data_path.open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-
-        forward = payload.get("forward_shipments", {}) or {}
-        names = []
-        for _, row in forward.items():
-            n = (row or {}).get("customer")
+        # Streamed, so only the distinct names are held in memory.
+        names = set()
+        for section, _, row, _ in iter_records(data_path, options.get("format")):
+            if section != "forward_shipments" or not isinstance(row, dict):
+                continue
+            n = row.get("customer")
             if isinstance(n, str) and n.strip():
-                names.append(n.strip())
+                names.add(n.strip())
 
-        unique_names = sorted({n for n in names})
-        created = 0
-        existing = 0
+        unique_names = sorted(names)
 
-        with transaction.atomic(using="shopcore"):
+        with BulkLoader("shopcore") as loader:
+            # Names are matched case-insensitively against every existing user, in one pass.
+            known = {
+                (name or "").lower()
+                for name in User.objects.using("shopcore").values_list("name", flat=True).iterator(chunk_size=10000)
+            }
+            missing = {}
             for name in unique_names:
-                user = User.objects.using("shopcore").filter(name__iexact=name).first()
-                if user:
-                    existing += 1
-                    continue
-
-                User.objects.using("shopcore").create(
-                    name=name,
-                    email=None,
-                    premium_status=False,
-                )
-                created += 1
+                if name.lower() not in known:
+                    missing.setdefault(name.lower(), name)
+            loader.insert(User, [User(name=name, email=None, premium_status=False) for name in missing.values()])
+        created = len(missing)
+        existing = len(unique_names) - created
 
         self.stdout.write(self.style.SUCCESS(f"✅ Seeded ShopCore users. created={created} existing={existing}"))
 
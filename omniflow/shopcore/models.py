@@ -1,5 +1,7 @@
 from django.db import models
 
+from omniflow.events.models import OutboxEventBase
+
 
 class User(models.Model):
     name = models.CharField(max_length=100)
@@ -38,3 +40,6 @@ class Order(models.Model):
     def __str__(self):
         return f"Order {self.id} (User {self.user.name})"
 
+
+class OutboxEvent(OutboxEventBase):
+    """Change log for the shopcore database (see `omniflow.events`)."""
@@ -1,8 +1,42 @@
+from omniflow.core.cache.entity import register_entity_cache
+from omniflow.core.cache.identity import identity_load
+
 from .models import User, Product, Order
 
 
+def normalize_email(email) -> str:
+    return (email or "").strip().lower()
+
+
+users_by_email = register_entity_cache(
+    "shopcore.user",
+    User,
+    loader=lambda email: User.objects.using("shopcore").filter(email__iexact=email).first(),
+    key_for=lambda user: user.email,
+    normalize=normalize_email,
+)
+
+
 def get_user_by_email(email: str):
-    return User.objects.filter(email=email).first()
+    return users_by_email.get(email)
+
+
+def get_order(order_id: int):
+    """Order with its user and product, memoized for the current turn."""
+    return identity_load(
+        Order, "pk", int(order_id),
+        lambda: Order.objects.using("shopcore").select_related("user", "product").filter(id=order_id).first(),
+    )
+
+
+def first_product_matching(product_name: str):
+    """The lowest-id product whose name contains `product_name`: how order lookups resolve a product."""
+    return (
+        Product.objects.using("shopcore")
+        .filter(name__icontains=(product_name or "").strip())
+        .order_by("id")
+        .first()
+    )
 
 
 def get_product_by_name(product_name: str):
@@ -16,3 +50,103 @@ def get_order_for_user_and_product(user_id: int, product_id: int):
         .order_by("-order_date")
         .first()
     )
+
+
+# Dict payloads shared by the ShopCore agent's DB fallbacks and the local
+# user/product/order MCP servers.
+
+def user_summary(email: str) -> dict:
+    user = get_user_by_email(email)
+    if not user:
+        return {}
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "premium_status": user.premium_status,
+    }
+
+
+def product_summary(product_name: str) -> dict:
+    product = get_product_by_name(product_name)
+    if not product:
+        return {}
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": str(product.price),
+    }
+
+
+def order_summary(user_id: int, product_id: int) -> dict:
+    order = get_order_for_user_and_product(user_id, product_id)
+    if not order:
+        return {}
+    return {
+        "id": order.id,
+        "user_id": order.user_id,
+        "product_id": order.product_id,
+        "order_date": str(order.order_date),
+        "status": order.status,
+    }
+
+
+def order_ownership(order_id: int, user_email: str) -> dict:
+    user_email = normalize_email(user_email)
+    if not user_email:
+        return {"valid": False, "reason": "missing_user_email"}
+
+    user = get_user_by_email(user_email)
+    if not user:
+        return {"valid": False, "reason": "user_not_found"}
+
+    order = get_order(order_id)
+    if not order or order.user_id != user.id:
+        return {"valid": False, "reason": "ownership_mismatch"}
+
+    return {
+        "valid": True,
+        "order_id": order.id,
+        "user_id": user.id,
+    }
+
+
+def order_for_user_product(user_email: str, product_name: str) -> dict:
+    """The user's latest order for the first product whose name matches `product_name`."""
+    user_email = normalize_email(user_email)
+    product_name = (product_name or "").strip()
+
+    if not user_email or not product_name:
+        return {"found": False, "reason": "missing_user_or_product"}
+
+    user = get_user_by_email(user_email)
+    if not user:
+        return {"found": False, "reason": "user_not_found"}
+
+    product = first_product_matching(product_name)
+    if not product:
+        return {"found": False, "reason": "product_not_found", "user_id": user.id}
+
+    order = (
+        Order.objects.using("shopcore")
+        .filter(user_id=user.id, product_id=product.id)
+        .order_by("-order_date", "-id")
+        .first()
+    )
+    if not order:
+        return {
+            "found": False,
+            "reason": "order_not_found",
+            "user_id": user.id,
+            "product_id": product.id,
+        }
+
+    return {
+        "found": True,
+        "user_id": user.id,
+        "product_id": product.id,
+        "product_name": product.name,
+        "order_id": order.id,
+        "order_date": str(order.order_date),
+        "order_status": order.status,
+    }
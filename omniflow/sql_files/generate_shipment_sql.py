@@ -2,162 +2,425 @@
 """
 ShipStream Data Import Script
 This script reads the JSON file and generates SQL statements for importing shipment data.
+
+The input is streamed, so exports of any size work in constant memory:
+forward shipments get explicit ids, and NDR / reverse / exchange rows are
+resolved to them through a tracking_number -> id index built on the way
+(forward_shipments must come before the sections that reference them, as
+in dummy_shipment_data.json). Values are validated and escaped for the
+target dialect and written as multi-row INSERTs of --batch-size rows.
+
+    python generate_shipment_sql.py                                  # MySQL SQL, as before
+    python generate_shipment_sql.py --dialect sqlite --batch-size 1000 --output shipstream.sqlite.sql
+    python generate_shipment_sql.py --format csv --output csv/      # CSV + import.sqlite for sqlite3 .import
 """
 
-import json
+import argparse
+import csv
 import os
-from datetime import datetime
-
-def generate_sql_from_json():
-    """Generate SQL statements from JSON data"""
-    
-    # Read JSON data
-    json_file = os.path.join(os.path.dirname(__file__), 'dummy_shipment_data.json')
-    
-    with open(json_file, 'r') as f:
-        data = json.load(f)
-    
-    sql_statements = []
-    
-    # Add header
-    sql_statements.append("-- =====================================================")
-    sql_statements.append("-- ShipStream Data Import from JSON")
-    sql_statements.append(f"-- Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    sql_statements.append("-- =====================================================")
-    sql_statements.append("")
-    
-    # Forward shipments
-    if 'forward_shipments' in data:
-        sql_statements.append("-- Insert forward shipments")
-        sql_statements.append("INSERT INTO shipments (order_id, tracking_number, estimated_arrival, customer_name, shipment_date, status, amount, notes) VALUES")
-        
-        forward_values = []
-        for i, (tracking_number, shipment_data) in enumerate(data['forward_shipments'].items()):
-            order_id = i + 1
-            customer_name = shipment_data['customer']
-            shipment_date = shipment_data['date']
-            status = shipment_data['status']
-            amount = shipment_data['amount']
-            notes = shipment_data.get('notes', 'NULL')
-            
-            # Calculate estimated arrival (5 days after shipment date)
-            estimated_arrival = shipment_date  # Simplified for demo
-            
-            notes_value = f"'{notes}'" if notes != 'NULL' else 'NULL'
-            value = f"({order_id}, '{tracking_number}', '{estimated_arrival}', '{customer_name}', '{shipment_date}', '{status}', {amount}, {notes_value})"
-            forward_values.append(value)
-        
-        sql_statements.append(",\n".join(forward_values) + ";")
-        sql_statements.append("")
-    
-    # NDR shipments
-    if 'ndr_shipments' in data:
-        sql_statements.append("-- Insert NDR events")
-        sql_statements.append("INSERT INTO ndr_events (shipment_id, ndr_number, ndr_date, issue, attempts, final_outcome) VALUES")
-        
-        ndr_values = []
-        for i, (ndr_number, ndr_data) in enumerate(data['ndr_shipments'].items()):
-            original_awb = ndr_data['original_awb']
-            ndr_date = ndr_data['ndr_date']
-            issue = ndr_data['issue']
-            attempts = ndr_data['attempts']
-            final_outcome = ndr_data['final_outcome']
-            
-            # Find shipment_id based on tracking number (simplified)
-            shipment_id = hash(original_awb) % 20 + 1  # Simplified mapping
-            
-            value = f"({shipment_id}, '{ndr_number}', '{ndr_date}', '{issue}', {attempts}, '{final_outcome}')"
-            ndr_values.append(value)
-        
-        sql_statements.append(",\n".join(ndr_values) + ";")
-        sql_statements.append("")
-    
-    # Reverse shipments
-    if 'reverse_shipments' in data:
-        sql_statements.append("-- Insert reverse shipments")
-        sql_statements.append("INSERT INTO reverse_shipments (original_shipment_id, reverse_number, return_date, reason, refund_status) VALUES")
-        
-        reverse_values = []
-        for i, (reverse_number, reverse_data) in enumerate(data['reverse_shipments'].items()):
-            original_awb = reverse_data['original_awb']
-            return_date = reverse_data['return_date']
-            reason = reverse_data['reason']
-            refund_status = reverse_data['refund_status']
-            
-            # Find shipment_id based on tracking number (simplified)
-            shipment_id = hash(original_awb) % 20 + 1  # Simplified mapping
-            
-            value = f"({shipment_id}, '{reverse_number}', '{return_date}', '{reason}', '{refund_status}')"
-            reverse_values.append(value)
-        
-        sql_statements.append(",\n".join(reverse_values) + ";")
-        sql_statements.append("")
-    
-    # Exchange shipments
-    if 'exchange_shipments' in data:
-        sql_statements.append("-- Insert exchange shipments")
-        sql_statements.append("INSERT INTO exchange_shipments (original_shipment_id, exchange_number, exchange_date, new_item, status) VALUES")
-        
-        exchange_values = []
-        for i, (exchange_number, exchange_data) in enumerate(data['exchange_shipments'].items()):
-            original_awb = exchange_data['original_awb']
-            exchange_date = exchange_data['exchange_date']
-            new_item = exchange_data['new_item']
-            status = exchange_data['status']
-            
-            # Find shipment_id based on tracking number (simplified)
-            shipment_id = hash(original_awb) % 20 + 1  # Simplified mapping
-            
-            value = f"({shipment_id}, '{exchange_number}', '{exchange_date}', '{new_item}', '{status}')"
-            exchange_values.append(value)
-        
-        sql_statements.append(",\n".join(exchange_values) + ";")
-        sql_statements.append("")
-    
-    # Add summary queries
-    sql_statements.append("-- =====================================================")
-    sql_statements.append("-- Summary Queries")
-    sql_statements.append("-- =====================================================")
-    sql_statements.append("")
-    sql_statements.append("-- Total shipments by status")
-    sql_statements.append("SELECT status, COUNT(*) as count FROM shipments GROUP BY status;")
-    sql_statements.append("")
-    sql_statements.append("-- NDR events by outcome")
-    sql_statements.append("SELECT final_outcome, COUNT(*) as count FROM ndr_events GROUP BY final_outcome;")
-    sql_statements.append("")
-    sql_statements.append("-- Reverse shipments by refund status")
-    sql_statements.append("SELECT refund_status, COUNT(*) as count FROM reverse_shipments GROUP BY refund_status;")
-    sql_statements.append("")
-    sql_statements.append("-- Exchange shipments by status")
-    sql_statements.append("SELECT status, COUNT(*) as count FROM exchange_shipments GROUP BY status;")
-    
-    return "\n".join(sql_statements)
-
-def main():
+import sys
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+# Reuse the incremental JSON reader from the application package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from omniflow.utils.jsonstream import iter_members  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Section -> (table, columns). Forward rows carry their own id; the others
+# reference it through `original_awb`.
+TABLES = {
+    "forward_shipments": (
+        "shipments",
+        ["id", "order_id", "tracking_number", "estimated_arrival", "customer_name", "shipment_date", "status", "amount", "notes"],
+    ),
+    "ndr_shipments": (
+        "ndr_events",
+        ["shipment_id", "ndr_number", "ndr_date", "issue", "attempts", "final_outcome"],
+    ),
+    "reverse_shipments": (
+        "reverse_shipments",
+        ["original_shipment_id", "reverse_number", "return_date", "reason", "refund_status"],
+    ),
+    "exchange_shipments": (
+        "exchange_shipments",
+        ["original_shipment_id", "exchange_number", "exchange_date", "new_item", "status"],
+    ),
+}
+
+HEADINGS = {
+    "forward_shipments": "forward shipments",
+    "ndr_shipments": "NDR events",
+    "reverse_shipments": "reverse shipments",
+    "exchange_shipments": "exchange shipments",
+}
+
+# SQLite version of the shipstream.sql tables this script fills (shipstream.sql
+# itself is MySQL-only), so the sqlite output works against an empty database.
+SQLITE_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS shipments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL,
+    tracking_number VARCHAR(50) NOT NULL UNIQUE,
+    estimated_arrival DATE NOT NULL,
+    customer_name VARCHAR(100) NOT NULL,
+    customer_phone VARCHAR(20),
+    customer_email VARCHAR(100),
+    shipping_address TEXT,
+    shipment_date DATE NOT NULL,
+    status VARCHAR(30) NOT NULL DEFAULT 'Pending',
+    amount DECIMAL(10, 2) NOT NULL,
+    weight DECIMAL(8, 2),
+    dimensions VARCHAR(50),
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_shipments_order_id ON shipments (order_id);
+CREATE INDEX IF NOT EXISTS idx_shipments_status ON shipments (status);
+
+CREATE TABLE IF NOT EXISTS ndr_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shipment_id INTEGER NOT NULL REFERENCES shipments (id) ON DELETE CASCADE,
+    ndr_number VARCHAR(50) NOT NULL UNIQUE,
+    ndr_date DATE NOT NULL,
+    issue VARCHAR(200) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    final_outcome VARCHAR(50) NOT NULL,
+    resolution_details TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_ndr_events_shipment_id ON ndr_events (shipment_id);
+
+CREATE TABLE IF NOT EXISTS reverse_shipments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    original_shipment_id INTEGER NOT NULL REFERENCES shipments (id) ON DELETE CASCADE,
+    reverse_number VARCHAR(50) NOT NULL UNIQUE,
+    return_date DATE NOT NULL,
+    reason VARCHAR(200) NOT NULL,
+    refund_status VARCHAR(50) NOT NULL,
+    refund_amount DECIMAL(10, 2),
+    refund_reference VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_reverse_shipments_original_shipment_id ON reverse_shipments (original_shipment_id);
+
+CREATE TABLE IF NOT EXISTS exchange_shipments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    original_shipment_id INTEGER NOT NULL REFERENCES shipments (id) ON DELETE CASCADE,
+    exchange_number VARCHAR(50) NOT NULL UNIQUE,
+    exchange_date DATE NOT NULL,
+    new_item VARCHAR(200) NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    exchange_reason VARCHAR(200),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_exchange_shipments_original_shipment_id ON exchange_shipments (original_shipment_id);
+"""
+
+# Imported columns that may be NULL. sqlite3's .import has no NULL marker
+# (.nullvalue only affects output), so the CSV script maps "" back to NULL.
+NULLABLE = {
+    "shipments": ["notes"],
+}
+
+SUMMARY_QUERIES = [
+    ("Total shipments by status", "SELECT status, COUNT(*) as count FROM shipments GROUP BY status;"),
+    ("NDR events by outcome", "SELECT final_outcome, COUNT(*) as count FROM ndr_events GROUP BY final_outcome;"),
+    ("Reverse shipments by refund status", "SELECT refund_status, COUNT(*) as count FROM reverse_shipments GROUP BY refund_status;"),
+    ("Exchange shipments by status", "SELECT status, COUNT(*) as count FROM exchange_shipments GROUP BY status;"),
+]
+
+
+class RecordError(ValueError):
+    pass
+
+
+# ---------------- validation ----------------
+
+def _text(record, name, max_length, required=True):
+    value = record.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise RecordError(f"missing {name}")
+        return None
+    value = str(value)
+    if "\x00" in value:
+        raise RecordError(f"NUL byte in {name}")
+    if len(value) > max_length:
+        raise RecordError(f"{name} longer than {max_length}")
+    return value
+
+
+def _date(record, name):
+    value = record.get(name)
+    try:
+        return date.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        raise RecordError(f"invalid {name}: {value!r}")
+
+
+def _decimal(record, name):
+    try:
+        value = Decimal(str(record.get(name)))
+    except InvalidOperation:
+        raise RecordError(f"invalid {name}: {record.get(name)!r}")
+    # DECIMAL(10, 2) in shipstream.sql
+    if not value.is_finite() or abs(value) >= Decimal("1e8"):
+        raise RecordError(f"invalid {name}: {record.get(name)!r}")
+    return value.quantize(Decimal("0.01"))
+
+
+def _int(record, name, default=None):
+    value = record.get(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RecordError(f"invalid {name}: {value!r}")
+
+
+def _key(key):
+    if not key or len(key) > 50 or "\x00" in key:
+        raise RecordError(f"invalid key {key!r}")
+    return key
+
+
+class Converter:
+    """Turns records into rows, assigning shipment ids and resolving AWBs to them."""
+
+    def __init__(self, start_id=1):
+        self.next_id = start_id
+        self.ordinal = 0
+        self.shipment_ids = {}
+
+    def _shipment_id(self, record):
+        awb = _text(record, "original_awb", 50)
+        if awb not in self.shipment_ids:
+            raise RecordError(f"unknown original_awb {awb!r}")
+        return self.shipment_ids[awb]
+
+    def row(self, section, key, record):
+        key = _key(key)
+        if section == "forward_shipments":
+            if key in self.shipment_ids:
+                raise RecordError("duplicate tracking number")
+            shipment_date = _date(record, "date")
+            row = [
+                self.next_id,
+                self.ordinal + 1,  # order_id: position in the file, as the demo data expects
+                key,
+                shipment_date,  # estimated_arrival: simplified for demo
+                _text(record, "customer", 100),
+                shipment_date,
+                _text(record, "status", 30),
+                _decimal(record, "amount"),
+                _text(record, "notes", 65535, required=False),
+            ]
+            self.shipment_ids[key] = self.next_id
+            self.next_id += 1
+            self.ordinal += 1
+            return row
+        if section == "ndr_shipments":
+            return [
+                self._shipment_id(record), key, _date(record, "ndr_date"), _text(record, "issue", 200),
+                _int(record, "attempts", 1), _text(record, "final_outcome", 50),
+            ]
+        if section == "reverse_shipments":
+            return [
+                self._shipment_id(record), key, _date(record, "return_date"), _text(record, "reason", 200),
+                _text(record, "refund_status", 50),
+            ]
+        return [
+            self._shipment_id(record), key, _date(record, "exchange_date"), _text(record, "new_item", 200),
+            _text(record, "status", 50),
+        ]
+
+
+# ---------------- output ----------------
+
+def sql_literal(value, dialect):
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, Decimal)):
+        return str(value)
+    if isinstance(value, date):
+        return f"'{value.isoformat()}'"
+    text = str(value)
+    if dialect == "mysql":
+        # MySQL treats backslash as an escape character inside string literals.
+        text = text.replace("\\", "\\\\")
+    return "'" + text.replace("'", "''") + "'"
+
+
+class SqlWriter:
+    def __init__(self, fp, dialect, batch_size):
+        self.fp = fp
+        self.dialect = dialect
+        self.batch_size = batch_size
+        self.table = None
+        self.columns = None
+        self.rows = []
+
+    def header(self):
+        self.fp.write("-- =====================================================\n")
+        self.fp.write("-- ShipStream Data Import from JSON\n")
+        self.fp.write(f"-- Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        self.fp.write("-- =====================================================\n\n")
+        if self.dialect == "sqlite":
+            self.fp.write("BEGIN;\n\n")
+            self.fp.write(SQLITE_SCHEMA + "\n")
+
+    def start(self, section):
+        self.flush()
+        self.table, self.columns = TABLES[section]
+        self.fp.write(f"-- Insert {HEADINGS[section]}\n")
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        self.fp.write(f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES\n")
+        self.fp.write(",\n".join(
+            "(" + ", ".join(sql_literal(v, self.dialect) for v in row) + ")" for row in self.rows
+        ))
+        self.fp.write(";\n\n")
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        if self.dialect == "sqlite":
+            self.fp.write("COMMIT;\n\n")
+        self.fp.write("-- =====================================================\n")
+        self.fp.write("-- Summary Queries\n")
+        self.fp.write("-- =====================================================\n")
+        for title, query in SUMMARY_QUERIES:
+            self.fp.write(f"\n-- {title}\n{query}\n")
+
+
+class CsvWriter:
+    """One CSV per table plus an `import.sqlite` script for the sqlite3 shell."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.files = {}
+        self.writer = None
+
+    def header(self):
+        pass
+
+    def start(self, section):
+        table, columns = TABLES[section]
+        if table not in self.files:
+            fp = open(self.directory / f"{table}.csv", "w", newline="", encoding="utf-8")
+            writer = csv.writer(fp)
+            writer.writerow(columns)
+            self.files[table] = (fp, writer, columns)
+        self.writer = self.files[table][1]
+
+    def add(self, row):
+        # NULL is written as "" and restored by import.sqlite.
+        self.writer.writerow(["" if v is None else v.isoformat() if isinstance(v, date) else v for v in row])
+
+    def close(self):
+        # Create the real tables first: on an empty database .import would
+        # build them from the header row, all TEXT and without constraints.
+        # Into an existing table it maps columns by position, so each CSV goes
+        # through a staging table named after its header instead.
+        lines = [".bail on", "BEGIN;", SQLITE_SCHEMA]
+        for table, (fp, _, columns) in self.files.items():
+            fp.close()
+            staging = f"_import_{table}"
+            values = [f"NULLIF({c}, '')" if c in NULLABLE.get(table, ()) else c for c in columns]
+            lines += [
+                f"DROP TABLE IF EXISTS {staging};",
+                f".import --csv {table}.csv {staging}",
+                f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(values)} FROM {staging};",
+                f"DROP TABLE {staging};",
+            ]
+        lines.append("COMMIT;")
+        (self.directory / "import.sqlite").write_text("\n".join(lines) + "\n")
+
+
+# ---------------- driver ----------------
+
+def generate(input_path, writer, start_id=1, errors=sys.stderr):
+    """Stream `input_path` into `writer`; returns (rows per section, rejected records)."""
+    converter = Converter(start_id)
+    counts = {section: 0 for section in TABLES}
+    rejected = 0
+    current = None
+    writer.header()
+    with open(input_path, "rb") as fp:
+        for path, record, _ in iter_members(fp, depth=2):
+            if len(path) != 2 or path[0] not in TABLES:
+                continue
+            section, key = path
+            try:
+                if not isinstance(record, dict):
+                    raise RecordError("record is not an object")
+                row = converter.row(section, key, record)
+            except RecordError as e:
+                rejected += 1
+                print(f"⚠️  skipped {section}/{key}: {e}", file=errors)
+                continue
+            if section != current:
+                writer.start(section)
+                current = section
+            writer.add(row)
+            counts[section] += 1
+    writer.close()
+    return counts, rejected
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate ShipStream SQL (or CSV) from shipment JSON")
+    parser.add_argument("--input", default=os.path.join(HERE, "dummy_shipment_data.json"))
+    parser.add_argument("--output", default=None, help="SQL file, or directory for --format csv")
+    parser.add_argument("--format", choices=["sql", "csv"], default="sql")
+    parser.add_argument("--dialect", choices=["mysql", "sqlite"], default="mysql", help="String escaping rules (default: mysql)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per INSERT statement (default: 500)")
+    parser.add_argument("--start-id", type=int, default=1, help="First shipments.id to assign (default: 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to generate SQL file"""
-    
+    args = parse_args(argv)
     try:
-        sql_content = generate_sql_from_json()
-        
-        # Write to SQL file
-        output_file = os.path.join(os.path.dirname(__file__), 'shipstream_data_from_json.sql')
-        
-        with open(output_file, 'w') as f:
-            f.write(sql_content)
-        
-        print(f"✅ SQL file generated successfully: {output_file}")
-        lines_count = len(sql_content.split('\n'))
-        print(f"📊 Generated {lines_count} lines of SQL statements")
-        
-        # Print summary
-        print("\n📋 Summary of generated data:")
-        print("- Forward shipments: 20")
-        print("- NDR events: 8")
-        print("- Reverse shipments: 5")
-        print("- Exchange shipments: 3")
-        
-    except Exception as e:
+        if args.format == "csv":
+            output = args.output or os.path.join(HERE, "shipstream_csv")
+            writer = CsvWriter(output)
+            counts, rejected = generate(args.input, writer, args.start_id)
+        else:
+            output = args.output or os.path.join(HERE, "shipstream_data_from_json.sql")
+            with open(output, "w", encoding="utf-8") as fp:
+                counts, rejected = generate(args.input, SqlWriter(fp, args.dialect, max(1, args.batch_size)), args.start_id)
+    except (OSError, ValueError) as e:
         print(f"❌ Error generating SQL: {e}")
+        return 1
+
+    print(f"✅ {'CSV files' if args.format == 'csv' else 'SQL file'} generated successfully: {output}")
+
+    # Print summary
+    print("\n📋 Summary of generated data:")
+    print(f"- Forward shipments: {counts['forward_shipments']}")
+    print(f"- NDR events: {counts['ndr_shipments']}")
+    print(f"- Reverse shipments: {counts['reverse_shipments']}")
+    print(f"- Exchange shipments: {counts['exchange_shipments']}")
+    if rejected:
+        print(f"- Skipped records: {rejected}")
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
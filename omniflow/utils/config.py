@@ -19,6 +19,71 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = Field(default="",env="OPENAI_API_KEY")
     SECRET_KEY: str = Field(default="",env='SECRET_KEY')
 
+    # Return-proof frame ingest (image_frames)
+    RETURN_FRAMES_MAX_COUNT: int = Field(default=8, env="RETURN_FRAMES_MAX_COUNT")
+    RETURN_FRAMES_MAX_SIDE: int = Field(default=768, env="RETURN_FRAMES_MAX_SIDE")
+    RETURN_FRAMES_FORMAT: str = Field(default="WEBP", env="RETURN_FRAMES_FORMAT")
+    RETURN_FRAMES_QUALITY: int = Field(default=75, env="RETURN_FRAMES_QUALITY")
+    RETURN_FRAMES_DUPLICATE_DISTANCE: int = Field(default=6, env="RETURN_FRAMES_DUPLICATE_DISTANCE")
+    MEDIA_PROCESS_WORKERS: int = Field(default=2, env="MEDIA_PROCESS_WORKERS")
+    RETURN_MEDIA_MAX_BYTES: int = Field(default=50 * 1024 * 1024, env="RETURN_MEDIA_MAX_BYTES")
+
+    # Vision subsystem
+    VISION_BACKEND: str = Field(default="index", env="VISION_BACKEND")
+    VISION_REFERENCE_DIR: str = Field(default="", env="VISION_REFERENCE_DIR")
+    VISION_MATCH_MAX_DISTANCE: int = Field(default=12, env="VISION_MATCH_MAX_DISTANCE")
+    VISION_INDEX_PATH: str = Field(default="", env="VISION_INDEX_PATH")
+    VISION_INDEX_MIN_SCORE: float = Field(default=0.85, env="VISION_INDEX_MIN_SCORE")
+    VISION_CACHE_SIZE: int = Field(default=256, env="VISION_CACHE_SIZE")
+    VISION_WORKERS: int = Field(default=4, env="VISION_WORKERS")
+
+    # MCP client pool
+    MCP_ENABLED: bool = Field(default=False, env="MCP_ENABLED")
+    MCP_POOL_SIZE: int = Field(default=2, env="MCP_POOL_SIZE")
+    MCP_SESSION_MAX_INFLIGHT: int = Field(default=8, env="MCP_SESSION_MAX_INFLIGHT")
+    MCP_CALL_TIMEOUT: float = Field(default=5.0, env="MCP_CALL_TIMEOUT")
+    MCP_CONNECT_TIMEOUT: float = Field(default=10.0, env="MCP_CONNECT_TIMEOUT")
+    MCP_PING_INTERVAL: float = Field(default=30.0, env="MCP_PING_INTERVAL")
+    MCP_BREAKER_FAILURE_THRESHOLD: int = Field(default=3, env="MCP_BREAKER_FAILURE_THRESHOLD")
+    MCP_BREAKER_RESET_TIMEOUT: float = Field(default=30.0, env="MCP_BREAKER_RESET_TIMEOUT")
+    MCP_CAPABILITY_TTL: float = Field(default=60.0, env="MCP_CAPABILITY_TTL")
+
+    # Domain entity read-through cache
+    ENTITY_CACHE_ENABLED: bool = Field(default=True, env="ENTITY_CACHE_ENABLED")
+    ENTITY_CACHE_SIZE: int = Field(default=1024, env="ENTITY_CACHE_SIZE")
+    ENTITY_CACHE_TTL: float = Field(default=30.0, env="ENTITY_CACHE_TTL")
+    ENTITY_CACHE_REDIS_URL: str = Field(default="", env="ENTITY_CACHE_REDIS_URL")
+    ENTITY_CACHE_SHARED_TTL: float = Field(default=300.0, env="ENTITY_CACHE_SHARED_TTL")
+    ENTITY_CACHE_FOLLOW_OUTBOX: bool = Field(default=True, env="ENTITY_CACHE_FOLLOW_OUTBOX")
+
+    # Customer-360 projection (denormalized per-order rows in the default DB)
+    CUSTOMER360_ENABLED: bool = Field(default=True, env="CUSTOMER360_ENABLED")
+
+    # Per-domain change-data-capture outbox
+    OUTBOX_ENABLED: bool = Field(default=True, env="OUTBOX_ENABLED")
+    OUTBOX_BATCH_SIZE: int = Field(default=500, env="OUTBOX_BATCH_SIZE")
+    OUTBOX_POLL_INTERVAL: float = Field(default=1.0, env="OUTBOX_POLL_INTERVAL")
+
+    # Per-database executors for ORM work ("shopcore=8,caredesk=2" overrides the default size)
+    DB_EXECUTOR_WORKERS: int = Field(default=4, env="DB_EXECUTOR_WORKERS")
+    DB_EXECUTOR_SIZES: str = Field(default="", env="DB_EXECUTOR_SIZES")
+    SQLITE_TIMEOUT: float = Field(default=20.0, env="SQLITE_TIMEOUT")
+    DATABASE_DIR: str = Field(default="", env="DATABASE_DIR")
+
+    # Latency spans for graph nodes, tools, DB queries and LLM calls
+    TRACE_ENABLED: bool = Field(default=False, env="TRACE_ENABLED")
+    TRACE_DEBUG: bool = Field(default=False, env="TRACE_DEBUG")
+    TRACE_OTEL: bool = Field(default=False, env="TRACE_OTEL")
+    METRICS_ENABLED: bool = Field(default=True, env="METRICS_ENABLED")
+
+    # Default token budget for FACTS_JSON in synthesis prompts (per-intent budgets in core/orchestration/facts.py)
+    FACTS_TOKEN_BUDGET: int = Field(default=300, env="FACTS_TOKEN_BUDGET")
+
+    # Logging ("json" or "text"); LOG_SAMPLE_RATE keeps that share of hot-path info lines
+    LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
+    LOG_FORMAT: str = Field(default="json", env="LOG_FORMAT")
+    LOG_SAMPLE_RATE: float = Field(default=1.0, env="LOG_SAMPLE_RATE")
+
 
 # Create global settings instance
 settings = Settings()
@@ -0,0 +1,130 @@
+# utils/jsonstream.py
+"""
+Incremental JSON readers for files too large to `json.load`.
+
+`iter_members` walks the containers of one JSON document down to a fixed
+depth and decodes only the values found there, so memory is bounded by the
+largest single record rather than the file. `iter_ndjson` reads one JSON
+object per line. Both read bytes and report how far into the file they are.
+"""
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, Tuple
+
+_WHITESPACE = " \t\n\r"
+# Characters that can continue a number (or literal) past where raw_decode stopped.
+_NUMBER_TAIL = "0123456789.eE+-"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, fp: BinaryIO, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decode = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk_size)
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.decode.decode(b"", final=True)
+        else:
+            # Drop what has been consumed so the buffer stays around one chunk.
+            self.buf = self.buf[self.pos:] + self.decode.decode(data)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> str:
+        ch = self.peek()
+        if ch not in expected:
+            raise ValueError(f"Expected one of {expected!r} at byte ~{self.bytes_read}, found {ch or 'end of file'!r}")
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise ValueError(f"Invalid JSON near byte ~{self.bytes_read}: {e.msg}") from e
+            # A number cut at the buffer edge ("12" of "12.5") decodes fine;
+            # make sure the character after it is really a delimiter.
+            if (end == len(self.buf) or self.buf[end] in _NUMBER_TAIL) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _walk(reader: _Reader, depth: int, path: tuple) -> Iterator[Tuple[tuple, Any]]:
+    ch = reader.peek()
+    if depth == 0 or ch not in "{[":
+        yield path, reader.value()
+        return
+    reader.take(ch)
+    close = "}" if ch == "{" else "]"
+    if reader.peek() == close:
+        reader.take(close)
+        return
+    index = 0
+    while True:
+        if ch == "{":
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError(f"Object key must be a string at byte ~{reader.bytes_read}")
+            reader.take(":")
+        else:
+            key = index
+        yield from _walk(reader, depth - 1, path + (key,))
+        index += 1
+        if reader.take("," + close) == close:
+            return
+
+
+def iter_members(fp: BinaryIO, depth: int = 1, chunk_size: int = 1 << 16) -> Iterator[Tuple[tuple, Any, int]]:
+    """
+    Yield `(path, value, bytes_read)` for every value `depth` containers
+    below the root of the JSON document in `fp` (opened in binary mode).
+
+    For `{"forward_shipments": {"FWD-1": {...}}}` and depth 2 the paths are
+    `("forward_shipments", "FWD-1")`; list members get integer indices.
+    Scalars found above `depth` are yielded at their own, shorter path.
+    """
+    reader = _Reader(fp, chunk_size)
+    for path, value in _walk(reader, depth, ()):
+        yield path, value, reader.bytes_read
+    if reader.peek():
+        raise ValueError(f"Unexpected data after the JSON document at byte ~{reader.bytes_read}")
+
+
+def iter_ndjson(fp: BinaryIO, offset: int = 0) -> Iterator[Tuple[int, Any, int]]:
+    """
+    Yield `(line_number, object, next_offset)` for each non-blank line of
+    `fp` (binary mode), starting at byte `offset` (lines are counted from
+    there). `next_offset` is where the following line starts, for resuming
+    with `offset=`.
+    """
+    fp.seek(offset)
+    position = offset
+    for line_number, line in enumerate(fp, start=1):
+        position += len(line)
+        if line.strip():
+            yield line_number, json.loads(line), position
@@ -1,13 +1,126 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from omniflow.utils.config import settings
 
 LOG_FORMAT = (
-    "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+    "%(asctime)s | %(levelname)s | %(name)s | %(request_id)s | %(message)s"
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=LOG_FORMAT,
-)
+# Set per HTTP request / WebSocket message; copied into executor threads and
+# asyncio tasks along with the rest of the context.
+request_id_var: ContextVar[Optional[str]] = ContextVar("omniflow_request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "sampled"}
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def bind_request_id(request_id: Optional[str] = None) -> Iterator[str]:
+    """Tag every log line written inside the block with `request_id`."""
+    request_id = request_id or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        yield request_id
+    finally:
+        request_id_var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Adds the request id and drops a share of hot-path lines.
+
+    Lines logged with `extra={"sampled": True}` below WARNING are kept with
+    probability LOG_SAMPLE_RATE, so their volume does not grow with traffic.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False) and record.levelno < logging.WARNING:
+            if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+                return False
+            record.sample_rate = self.sample_rate
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", "-")
+        if request_id != "-":
+            out["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            out["exc_info"] = record.exc_text
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() folds the traceback into the message text; keep it
+    # separate so the JSON formatter can put it in its own field.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def _configure() -> None:
+    root = logging.getLogger()
+    if getattr(root, "_omniflow_configured", False):
+        return
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(LOG_FORMAT))
+
+    # Callers only enqueue; a listener thread formats and writes, so a slow
+    # stdout never stalls the event loop.
+    log_queue: queue.Queue = queue.Queue(-1)
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(ContextFilter(settings.LOG_SAMPLE_RATE))
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root._omniflow_configured = True
+
+
+_configure()
 
 # Reduce noise from underlying HTTP/OpenAI client retries.
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -15,4 +128,4 @@ logging.getLogger("openai").setLevel(logging.WARNING)
 logging.getLogger("openai._base_client").setLevel(logging.WARNING)
 
 def get_logger(name: str):
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)